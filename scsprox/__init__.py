@@ -1,3 +1,24 @@
-from . import examples
+""" Prox operators of CVXPY problems, evaluated with a cached SCS factorization.
+
+CVXPY, SCS, `scsprox.examples` and the asyncio wrappers are imported
+on first use, not on `import scsprox`, so processes which only load and
+evaluate saved proxes start quickly.
+"""
 from .prox_obj import Prox
-from .cvxpy_prox import CVXPYProx
\ No newline at end of file
+from .cvxpy_prox import CVXPYProx
+from .pool import ProxPool, prox_map
+from .fused import FusedProx
+
+# loaded when first asked for: `examples` imports CVXPY, `asyncprox` asyncio
+_lazy = {'examples': ('.examples', None),
+         'AsyncProx': ('.asyncprox', 'AsyncProx'),
+         'ProxBusy': ('.asyncprox', 'ProxBusy'),
+         'aprox': ('.asyncprox', 'aprox')}
+
+def __getattr__(name):
+    if name in _lazy:
+        import importlib
+        module, attr = _lazy[name]
+        module = importlib.import_module(module, __name__)
+        return module if attr is None else getattr(module, attr)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
@@ -0,0 +1,230 @@
+""" Global-consensus ADMM over a list of prox operators.
+
+Solves
+
+    min sum_i f_i(x_i)  s.t.  x_i = z restricted to the variables of f_i
+
+where each f_i is given by its prox operator, such as a `Prox` object.
+Operators share variables by name (the keys of their `x_vars`).
+
+All of the ADMM bookkeeping is done on flat vectors: the global
+variable `z` lays out every variable name once, and the local copies
+of all operators are concatenated into one vector, so the z-update is a
+single weighted `np.bincount`.
+
+Changing rho is cheap for `Prox` objects: rho only enters the stuffed
+problem through `__tau` in `c`, so the cached factorization is reused,
+and adaptive rho costs nothing extra per iteration.
+"""
+from time import perf_counter
+
+import numpy as np
+from collections import OrderedDict
+
+from .scs_mapping import dict_to_flat, flat_to_dict
+
+
+def _zero_elem(prox):
+    z = prox.zero_elem
+    # `Prox.zero_elem` is a property, but the generic interface allows a method
+    if callable(z):
+        z = z()
+    return z
+
+def _layout(sizes):
+    layout = OrderedDict()
+    start = 0
+    for k in sorted(sizes):
+        layout[k] = slice(start, start+sizes[k])
+        start += sizes[k]
+    return layout
+
+def _sizes(x0):
+    return {k: np.size(x0[k]) for k in x0}
+
+
+class Anderson(object):
+    """ Type-II Anderson acceleration of a fixed-point iteration w = T(w),
+    with memory `m`.
+    """
+
+    def __init__(self, m):
+        self.m = m
+        self.reset()
+
+    def reset(self):
+        self._w = None
+        self._g = None
+        self._dw = []
+        self._dg = []
+
+    def step(self, w, Tw):
+        """ Given the current point `w` and its image `Tw`, return the next point.
+        """
+        g = Tw - w
+
+        if self._w is not None:
+            self._dw.append(w - self._w)
+            self._dg.append(g - self._g)
+            if len(self._dw) > self.m:
+                self._dw.pop(0)
+                self._dg.pop(0)
+
+        self._w, self._g = w, g
+
+        if not self._dw:
+            return Tw
+
+        DW = np.column_stack(self._dw)
+        DG = np.column_stack(self._dg)
+        gamma = np.linalg.lstsq(DG, g, rcond=None)[0]
+
+        return Tw - np.dot(DW + DG, gamma)
+
+
+def consensus(proxes, rho=1.0, max_iters=100, eps_abs=1e-4, eps_rel=1e-3,
+              alpha=1.0, adaptive_rho=True, mu=10.0, rho_factor=2.0,
+              anderson=0, z0=None):
+    """ Run global-consensus ADMM over the prox operators in `proxes`.
+
+    Parameters
+    ----------
+    proxes: list
+        Prox operators, called as `prox(x0, rho)`, with `x0` a dict.
+        Each must provide `zero_elem`, which gives its variable names and sizes.
+    rho: float
+        Initial ADMM penalty.
+    max_iters: int
+    eps_abs, eps_rel: float
+        Absolute and relative stopping tolerances on the primal and dual residuals.
+    alpha: float
+        Over-relaxation parameter, typically in [1.0, 1.8].
+    adaptive_rho: bool
+        Use residual balancing: scale rho by `rho_factor` whenever the primal
+        and dual residuals differ by more than a factor of `mu`.
+    anderson: int
+        Memory for Anderson acceleration of the (z, u) iteration. 0 turns it off.
+        Accelerated steps that increase the fixed-point residual are rejected.
+    z0: dict
+        Optional starting point for the global variable.
+
+    Returns
+    -------
+    z: dict
+        The consensus solution, keyed by variable name.
+    info: dict
+        'r_norm', 's_norm', 'rho' and 'time' arrays, one entry per iteration,
+        along with 'iters' and 'converged'.
+    """
+    locals_ = [_layout(_sizes(_zero_elem(prox))) for prox in proxes]
+
+    sizes = {}
+    for layout in locals_:
+        for k, s in layout.items():
+            n = s.stop - s.start
+            if sizes.setdefault(k, n) != n:
+                raise ValueError('Variable {} has inconsistent sizes.'.format(k))
+    glob = _layout(sizes)
+
+    # G maps the concatenated local copies to the global variable
+    G = np.concatenate([np.arange(glob[k].start, glob[k].stop)
+                        for layout in locals_ for k in layout]).astype(np.int64)
+    offsets = np.cumsum([0] + [sum(sl.stop - sl.start for sl in layout.values())
+                               for layout in locals_])
+    parts = [slice(offsets[i], offsets[i+1]) for i in range(len(proxes))]
+
+    N, L = sum(sizes.values()), len(G)
+    counts = np.bincount(G, minlength=N).astype(np.float64)
+
+    z = np.zeros(N)
+    if z0:
+        dict_to_flat(z0, glob, out=z)
+    U = np.zeros(L)
+    X = np.zeros(L)
+
+    def step(z, U, rho):
+        """ One ADMM iteration: the map (z, U) -> (z+, U+).
+        """
+        V = z[G] - U
+        for prox, layout, part in zip(proxes, locals_, parts):
+            if hasattr(prox, 'do_flat'):
+                # `Prox.layout` also orders variables by name
+                X[part] = prox.do_flat(V[part], rho)
+            else:
+                x = prox(flat_to_dict(V[part], layout), rho)
+                dict_to_flat(x, layout, out=X[part])
+
+        Xh = alpha*X + (1-alpha)*z[G]
+        z_new = np.bincount(G, weights=Xh + U, minlength=N)/counts
+        U_new = U + Xh - z_new[G]
+
+        return z_new, U_new
+
+    acc = Anderson(anderson) if anderson else None
+    # plain ADMM step from the previous point, kept as a fallback
+    # in case an accelerated point increases the fixed-point residual
+    fallback = None
+    accelerated = False
+    g_prev = np.inf
+
+    hist = dict(r_norm=[], s_norm=[], rho=[], time=[])
+    converged = False
+
+    for it in range(max_iters):
+        start = perf_counter()
+
+        z_new, U_new = step(z, U, rho)
+
+        r = np.linalg.norm(X - z_new[G])
+        s = rho*np.linalg.norm(z_new[G] - z[G])
+
+        eps_pri = np.sqrt(L)*eps_abs + eps_rel*max(np.linalg.norm(X), np.linalg.norm(z_new[G]))
+        eps_dual = np.sqrt(L)*eps_abs + eps_rel*rho*np.linalg.norm(U_new)
+
+        hist['r_norm'].append(r)
+        hist['s_norm'].append(s)
+        hist['rho'].append(rho)
+
+        if r <= eps_pri and s <= eps_dual:
+            z, U = z_new, U_new
+            hist['time'].append(perf_counter() - start)
+            converged = True
+            break
+
+        if acc is not None:
+            w = np.concatenate([z, U])
+            Tw = np.concatenate([z_new, U_new])
+            g = np.linalg.norm(Tw - w)
+
+            if accelerated and g > g_prev:
+                acc.reset()
+                w_next = fallback
+                accelerated = False
+                g_prev = np.inf
+            else:
+                w_next = acc.step(w, Tw)
+                accelerated = w_next is not Tw
+                fallback = Tw
+                g_prev = g
+
+            z_new, U_new = w_next[:N], w_next[N:].copy()
+
+        z, U = z_new, U_new
+
+        if adaptive_rho and (r > mu*s or s > mu*r):
+            scale = rho_factor if r > mu*s else 1.0/rho_factor
+            rho *= scale
+            U /= scale
+            # U is scaled by 1/rho, so the acceleration history is stale
+            if acc is not None:
+                acc.reset()
+                accelerated = False
+                g_prev = np.inf
+
+        hist['time'].append(perf_counter() - start)
+
+    info = {k: np.array(v) for k, v in hist.items()}
+    info['iters'] = len(hist['r_norm'])
+    info['converged'] = converged
+
+    return flat_to_dict(z, glob), info
@@ -0,0 +1,145 @@
+""" asyncio interface to Prox objects.
+
+`AsyncProx` runs each prox evaluation in an executor, so the event loop
+isn't blocked during the SCS solve. Evaluations on one `Prox` are serialized
+with an `asyncio.Lock`, since they share one workspace, `b`, `c` and warm-start.
+Evaluations on different `Prox` objects run concurrently.
+
+Cancelling a pending evaluation before its solve starts is safe, and the
+operator is left untouched. A solve that has started can't be interrupted,
+so cancelling it only drops the result: the operator stays locked until the
+solve finishes, and its warm-start reflects that solve.
+"""
+import asyncio
+import functools
+import weakref
+
+import numpy as np
+
+
+class ProxBusy(RuntimeError):
+    """ Raised when too many evaluations are already queued on one operator.
+    """
+
+
+class AsyncProx(object):
+    """ Awaitable wrapper around a `Prox`.
+
+    Parameters
+    ----------
+    prox: Prox
+    executor: concurrent.futures.Executor, optional
+        Where solves run; defaults to the event loop's default executor.
+    max_pending: int, optional
+        Maximum number of evaluations running or queued on this operator.
+        Beyond it, new evaluations raise `ProxBusy` right away,
+        so callers can shed load instead of queueing without bound.
+    """
+
+    def __init__(self, prox, executor=None, max_pending=None):
+        self.prox = prox
+        self.executor = executor
+        self.max_pending = max_pending
+        self.pending = 0
+        self._lock = None
+        self._loop = None
+
+    def _get_lock(self, loop):
+        # a lock belongs to one event loop
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def _run(self, f, *args, **kwargs):
+        if self.max_pending is not None and self.pending >= self.max_pending:
+            raise ProxBusy('{} evaluations already pending.'.format(self.pending))
+
+        loop = asyncio.get_running_loop()
+        lock = self._get_lock(loop)
+
+        self.pending += 1
+        try:
+            await lock.acquire()
+            try:
+                fut = loop.run_in_executor(self.executor, functools.partial(f, *args, **kwargs))
+            except BaseException:
+                lock.release()
+                raise
+
+            # release when the solve is done, even if we've been cancelled by then
+            fut.add_done_callback(functools.partial(_release, lock))
+            return await asyncio.shield(fut)
+        finally:
+            self.pending -= 1
+
+    async def do(self, x0=None, rho=1.0, **kwargs):
+        """ Awaitable `Prox.do`.
+        """
+        return await self._run(self.prox.do, x0, rho, **kwargs)
+
+    async def do_flat(self, x0=None, rho=1.0, **kwargs):
+        """ Awaitable `Prox.do_flat`.
+        """
+        return await self._run(self.prox.do_flat, x0, rho, **kwargs)
+
+    async def __call__(self, x0=None, rho=1.0, **kwargs):
+        return await self.do(x0, rho, **kwargs)
+
+    @property
+    def info(self):
+        return self.prox.info
+
+    @property
+    def zero_elem(self):
+        return self.prox.zero_elem
+
+
+def _release(lock, fut):
+    lock.release()
+    # don't warn about exceptions nobody is waiting for
+    if not fut.cancelled():
+        fut.exception()
+
+
+_wrappers = weakref.WeakKeyDictionary()
+
+def aprox(prox, **kwargs):
+    """ The `AsyncProx` for `prox`, creating it on first use.
+    Reusing one wrapper per `Prox` means all of its evaluations share a lock.
+    Keyword arguments are as in `AsyncProx`, and only apply on creation.
+    """
+    if isinstance(prox, AsyncProx):
+        return prox
+    ap = _wrappers.get(prox)
+    if ap is None:
+        ap = AsyncProx(prox, **kwargs)
+        _wrappers[prox] = ap
+    return ap
+
+async def gather(proxes, x0s, rho=1.0, flat=False, return_exceptions=False):
+    """ Evaluate many prox operators concurrently.
+
+    Parameters
+    ----------
+    proxes: list of Prox or AsyncProx
+    x0s: list
+        One input per operator: dicts, or flat vectors if `flat=True`.
+    rho: float, list or 1D array
+        A single rho, or one per operator.
+    return_exceptions: bool
+        As in `asyncio.gather`.
+
+    Returns
+    -------
+    list of solutions, in order.
+    """
+    if not isinstance(rho, (list, tuple, np.ndarray)):
+        rho = [rho]*len(proxes)
+
+    aws = []
+    for p, x0, r in zip(proxes, x0s, rho):
+        ap = aprox(p)
+        aws.append(ap.do_flat(x0, r) if flat else ap.do(x0, r))
+
+    return await asyncio.gather(*aws, return_exceptions=return_exceptions)
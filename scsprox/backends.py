@@ -0,0 +1,149 @@
+""" Solver backends for the stuffed prox problem.
+
+A backend stands in for `cyscs.Workspace`, which is the default:
+
+- construction does the setup, `backend(data, **settings)`, with SCS data
+  `A`, `b`, `c` and cone `dims`, and the `Prox` settings (`eps`, `max_iters`, `verbose`)
+- `solve(new_bc=None, warm_start=None, **settings)` updates `b` and `c` from `new_bc`,
+  warm-starts from an earlier solution (a dict with `x`, `y`, `s`) if the solver can,
+  solves, and returns a dict with `x`, `y`, `s` and `info`, in SCS's conventions
+- `info` is the info dict of the most recent solve, with at least
+  `iter`, `status`, `setupTime` and `solveTime` (in milliseconds)
+
+All backends take the same stuffed data, so they share the indmap/solmap
+machinery, warm-start strategies, memoization and statistics of `Prox`.
+Solver packages are imported when a backend is first built.
+
+- 'cyscs': CySCS, which caches the factorization across solves.
+- 'scs': plain SCS, which sets up and factors on every solve.
+  Mostly useful as a reference.
+- 'ecos': the ECOS interior-point solver. It refactors on every solve and can't
+  be warm-started, but is much more accurate, and often faster on small problems.
+  Supports zero, linear and second-order cones. `eps` is not passed on, since
+  ECOS's own tolerances are much tighter than SCS's defaults.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+
+def _num(v):
+    return np.nan if v is None else float(v)
+
+def _empty_info():
+    return dict(iter=0, status='Unsolved', statusVal=0, setupTime=0.0, solveTime=0.0,
+                resPri=np.nan, resDual=np.nan, relGap=np.nan)
+
+
+class ScsBackend(object):
+    """ Plain SCS, called through `scs.solve`.
+    """
+
+    def __init__(self, data, **settings):
+        import scs
+        self._scs = scs
+        self.data = dict(A=data['A'], b=data['b'], c=data['c'])
+        self.dims = data['dims']
+        self.settings = dict(settings)
+        self._info = _empty_info()
+
+    @property
+    def info(self):
+        return dict(self._info)
+
+    def solve(self, new_bc=None, warm_start=None, **settings):
+        if new_bc is not None:
+            self.data.update(new_bc)
+
+        data = dict(self.data)
+        if warm_start is not None:
+            for k in 'x', 'y', 's':
+                data[k] = warm_start[k]
+
+        sol = self._scs.solve(data, self.dims, **dict(self.settings, **settings))
+        self._info = sol['info']
+        return sol
+
+
+_ecos_status = {0: 'Solved', 10: 'Solved/Inaccurate', 1: 'Infeasible', 11: 'Infeasible/Inaccurate',
+                2: 'Unbounded', 12: 'Unbounded/Inaccurate', -1: 'Solved/Inaccurate'}
+
+class EcosBackend(object):
+    """ ECOS, on the same conic data: the zero cone rows become equality
+    constraints, and the linear and second-order cone rows the conic ones.
+    """
+
+    def __init__(self, data, **settings):
+        import ecos
+        self._ecos = ecos
+
+        dims = data['dims']
+        for k in 's', 'ep', 'ed', 'p':
+            if dims.get(k):
+                raise ValueError('The ecos backend supports only zero, linear '
+                                 'and second-order cones.')
+
+        self.f = int(dims.get('f', 0) or 0)
+        A = sp.csr_matrix(data['A'])
+        self._Aeq = A[:self.f].tocsc()
+        self._G = A[self.f:].tocsc()
+        self._dims = dict(l=int(dims.get('l', 0) or 0), q=[int(q) for q in dims.get('q', [])])
+
+        self.data = dict(b=data['b'], c=data['c'])
+        self.settings = dict(settings)
+        self._info = _empty_info()
+
+    @property
+    def info(self):
+        return dict(self._info)
+
+    def _options(self, settings):
+        settings = dict(self.settings, **settings)
+        return dict(verbose=bool(settings.get('verbose', False)),
+                    max_iters=int(settings.get('max_iters', 100)))
+
+    def solve(self, new_bc=None, warm_start=None, **settings):
+        """ `warm_start` is ignored; ECOS can't be warm-started.
+        """
+        if new_bc is not None:
+            self.data.update(new_bc)
+        b, c = self.data['b'], self.data['c']
+
+        args = [c, self._G, b[self.f:], self._dims]
+        if self.f:
+            args += [self._Aeq, b[:self.f]]
+        sol = self._ecos.solve(*args, **self._options(settings))
+
+        info = sol['info']
+        timing = info.get('timing', {})
+        flag = info['exitFlag']
+        self._info = dict(iter=info['iter'],
+                          status=_ecos_status.get(flag, 'Failure'),
+                          statusVal=flag,
+                          setupTime=timing.get('tsetup', 0.0)*1e3,
+                          solveTime=timing.get('tsolve', 0.0)*1e3,
+                          resPri=_num(info.get('pres')),
+                          resDual=_num(info.get('dres')),
+                          relGap=_num(info.get('relgap')))
+
+        y = np.concatenate([np.ravel(sol['y']), sol['z']])
+        s = np.concatenate([np.zeros(self.f), sol['s']])
+        return dict(x=sol['x'], y=y, s=s, info=self.info)
+
+
+def _cyscs(data, **settings):
+    import cyscs
+    return cyscs.Workspace(data, data['dims'], **settings)
+
+backends = {'cyscs': _cyscs, 'scs': ScsBackend, 'ecos': EcosBackend}
+
+def register_backend(name, factory):
+    """ Make `factory(data, **settings)` available as `Prox(..., backend=name)`.
+    """
+    backends[name] = factory
+
+def make_backend(name, data, **settings):
+    """ Set up backend `name` on the stuffed SCS `data`.
+    """
+    if name not in backends:
+        raise ValueError('Unknown backend: {}. Choose from {}.'.format(name, sorted(backends)))
+    return backends[name](data, **settings)
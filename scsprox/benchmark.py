@@ -0,0 +1,384 @@
+""" Benchmarks of prox setup cost and per-call latency across problem sizes.
+
+Each case builds `examples.example_blocks(m, n, k)` and measures
+
+- 'cvxpy_time': forming and stuffing the prox problem with CVXPY
+- 'scs_setup_time': CySCS workspace setup, including the factorization
+- cold and warm `Prox.do` latency (median seconds) and mean iterations,
+  where warm calls are at small perturbations of the previous point
+- 'iter_saved': mean iterations saved by warm-starting
+- 'peak_rss_mb': peak resident memory of the process running the case
+
+By default, each case runs in a fresh process, so the peak RSS is the case's own.
+
+Run from the command line with
+
+    python -m scsprox.benchmark --out bench.json
+    python -m scsprox.benchmark --out new.json --compare bench.json
+    python -m scsprox.benchmark --quick --backends cyscs,scs,ecos
+    python -m scsprox.benchmark --quick --prox-terms
+
+which writes the results as JSON and, with `--compare`, reports cases
+that got slower than the baseline. With `--backends`, each case is instead
+solved with each of the named solver backends (see `bench_backends`),
+and with `--prox-terms`, with the epigraph and quadratic prox terms
+(see `bench_prox_terms`).
+"""
+import argparse
+import datetime
+import json
+import multiprocessing as mp
+import platform
+import sys
+from time import perf_counter
+
+import numpy as np
+
+# sweep of (m, n, k): rows and columns of each block, and the number of blocks
+default_sizes = [(m, n, k) for m in (50, 200, 1000)
+                           for n in (10, 50)
+                           for k in (1, 4)]
+quick_sizes = [(20, 5, 1), (50, 10, 2)]
+
+# results compared by `compare`, where larger is worse
+_timed_keys = 'cvxpy_time', 'scs_setup_time', 'cold_time', 'warm_time'
+
+
+def peak_rss_mb():
+    """ Peak resident set size of this process in MB.
+    Falls back to the current RSS where `resource` isn't available.
+    """
+    try:
+        import resource
+    except ImportError:
+        import os
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss/float(2**20)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    if sys.platform == 'darwin':
+        return peak/float(2**20)
+    return peak/float(2**10)
+
+
+def _version():
+    try:
+        from importlib.metadata import version
+        return version('scsprox')
+    except Exception:
+        return None
+
+
+def bench_case(m, n, k, calls=20, seed=0, **settings):
+    """ Benchmark one problem size. Returns a dict of results.
+    """
+    from .examples import example_blocks
+    from .prox_obj import Prox
+
+    prob, x_vars = example_blocks(m, n, k, seed)
+    prox = Prox(prob, x_vars, method='scs', **settings)
+
+    info = prox.info
+    result = dict(m=m, n=n, k=k, calls=calls,
+                  num_vars=len(x_vars),
+                  size=len(prox.dict_to_flat(prox.zero_elem)),
+                  cvxpy_time=info['cvxpy_time'],
+                  scs_setup_time=info['outer_scs_setup_time'])
+
+    np.random.seed(seed)
+    x0 = np.random.randn(calls, result['size'])
+
+    def timed(f, *args):
+        start = perf_counter()
+        f(*args)
+        return perf_counter() - start, prox.info['iter']
+
+    def call(x):
+        try:
+            prox.do_flat(x, 1.0)
+        except RuntimeError:
+            # slow cases may not converge in max_iters; still count them
+            pass
+
+    cold = []
+    for i in range(calls):
+        prox.reset_warm_start()
+        cold.append(timed(call, x0[i]))
+
+    warm = []
+    prox.reset_warm_start()
+    call(x0[0])
+    x = x0[0].copy()
+    for i in range(calls):
+        x += 1e-2*x0[i]
+        warm.append(timed(call, x))
+
+    cold, warm = np.array(cold), np.array(warm)
+    result.update(cold_time=float(np.median(cold[:, 0])),
+                  warm_time=float(np.median(warm[:, 0])),
+                  cold_iter=float(np.mean(cold[:, 1])),
+                  warm_iter=float(np.mean(warm[:, 1])))
+    result['iter_saved'] = result['cold_iter'] - result['warm_iter']
+    result['peak_rss_mb'] = peak_rss_mb()
+
+    return result
+
+def _bench_case(args):
+    (m, n, k), calls, settings = args
+    return bench_case(m, n, k, calls, **settings)
+
+def run(sizes=None, calls=20, isolate=True, **settings):
+    """ Benchmark each `(m, n, k)` in `sizes`.
+
+    Returns a dict with 'meta' (versions and platform) and 'results',
+    a list of dicts from `bench_case`.
+    """
+    if sizes is None:
+        sizes = default_sizes
+
+    args = [(size, calls, settings) for size in sizes]
+    if isolate:
+        pool = mp.Pool(1, maxtasksperchild=1)
+        try:
+            results = pool.map(_bench_case, args, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_bench_case(a) for a in args]
+
+    meta = dict(scsprox=_version(),
+                numpy=np.__version__,
+                python=platform.python_version(),
+                platform=platform.platform(),
+                date=datetime.datetime.now().isoformat(),
+                calls=calls,
+                settings=settings)
+
+    return dict(meta=meta, results=results)
+
+def compare(new, old, tol=1.2):
+    """ Cases in `new` with a timing more than `tol` times the one in `old`.
+
+    Returns a list of `(m, n, k, key, old_value, new_value)` tuples.
+    """
+    baseline = {(r['m'], r['n'], r['k']): r for r in old['results']}
+
+    worse = []
+    for r in new['results']:
+        b = baseline.get((r['m'], r['n'], r['k']))
+        if b is None:
+            continue
+        for key in _timed_keys:
+            if r[key] > tol*b[key]:
+                worse.append((r['m'], r['n'], r['k'], key, b[key], r[key]))
+
+    return worse
+
+
+def bench_backends(m, n, k, backends=('cyscs', 'scs', 'ecos'), calls=20, seed=0,
+                   **settings):
+    """ Compare solver backends on one problem size, stuffed once.
+
+    Returns a list of dicts, one per backend, with the setup time, the median
+    warm call time, mean iterations, and 'max_diff', the largest difference
+    from the first backend's solutions. Backends whose solver isn't
+    installed are reported with 'error' set.
+    """
+    from .examples import example_blocks
+    from .prox_obj import Prox
+    from .scsprox import stuffed_prox
+    from .scs_mapping import var_shapes
+
+    prob, x_vars = example_blocks(m, n, k, seed)
+    data, indmap, solmap = stuffed_prox(prob, x_vars)
+
+    np.random.seed(seed)
+    X0 = None
+    ref = None
+    results = []
+    for name in backends:
+        res = dict(m=m, n=n, k=k, backend=name, error=None)
+        results.append(res)
+        try:
+            prox = Prox._from_data(dict(data, b=data['b'].copy(), c=data['c'].copy()),
+                                   indmap, solmap, shapes=var_shapes(x_vars),
+                                   backend=name, **settings)
+        except ImportError as e:
+            res['error'] = str(e)
+            continue
+
+        if X0 is None:
+            X0 = np.random.randn(calls, len(prox.dict_to_flat(prox.zero_elem)))
+            X0 = np.cumsum(1e-2*X0, axis=0)
+
+        X = np.empty_like(X0)
+        times, iters = [], []
+        for i in range(calls):
+            start = perf_counter()
+            try:
+                X[i] = prox.do_flat(X0[i], 1.0)
+            except RuntimeError:
+                X[i] = np.nan
+            times.append(perf_counter() - start)
+            iters.append(prox.info['iter'])
+
+        if ref is None:
+            ref = X
+        res.update(setup_time=prox.info['outer_scs_setup_time'],
+                   time=float(np.median(times)),
+                   iter=float(np.mean(iters)),
+                   max_diff=float(np.nanmax(np.abs(X - ref))))
+
+    return results
+
+
+def bench_prox_terms(m, n, k, calls=20, rhos=(1.0,), seed=0, **settings):
+    """ Compare the epigraph and quadratic prox terms on one problem size.
+
+    Calls cycle through `rhos`; with more than one value, the quadratic form
+    sets up a solver (and factorization) for each.
+
+    Returns a list of two dicts, for 'epigraph' (with CySCS) and 'quadratic'
+    (with SCS 3), with the rows and columns of the SCS problem, the setup time,
+    the time of the first call, which includes the quadratic form's solver setup,
+    the median time and mean iterations of the later, warm-started, calls,
+    and 'max_diff', the largest difference from the epigraph solutions.
+    If a solver isn't installed, 'error' is set.
+    """
+    from .examples import example_blocks
+    from .prox_obj import Prox
+
+    prob, x_vars = example_blocks(m, n, k, seed)
+
+    np.random.seed(seed)
+    X0 = None
+    ref = None
+    results = []
+    for term in 'epigraph', 'quadratic':
+        res = dict(m=m, n=n, k=k, prox_term=term, error=None)
+        results.append(res)
+        try:
+            prox = Prox(prob, x_vars, method='scs', prox_term=term, **settings)
+        except ImportError as e:
+            res['error'] = str(e)
+            continue
+
+        if X0 is None:
+            X0 = np.random.randn(calls, len(prox.dict_to_flat(prox.zero_elem)))
+            X0 = np.cumsum(1e-2*X0, axis=0)
+
+        X = np.empty_like(X0)
+        times, iters = [], []
+        for i in range(calls):
+            start = perf_counter()
+            try:
+                X[i] = prox.do_flat(X0[i], rhos[i % len(rhos)])
+            except RuntimeError:
+                X[i] = np.nan
+            times.append(perf_counter() - start)
+            iters.append(prox.info['iter'])
+
+        if ref is None:
+            ref = X
+        res.update(rows=int(prox._A.shape[0]), cols=int(prox._A.shape[1]),
+                   setup_time=prox.info['outer_scs_setup_time'],
+                   first_time=times[0],
+                   time=float(np.median(times[1:] or times)),
+                   iter=float(np.mean(iters[1:] or iters)),
+                   max_diff=float(np.nanmax(np.abs(X - ref))))
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark scsprox setup and prox latency.')
+    parser.add_argument('--out', help='write JSON results to this file')
+    parser.add_argument('--compare', help='baseline JSON results to compare against')
+    parser.add_argument('--tol', type=float, default=1.2,
+                        help='report timings more than this factor above the baseline')
+    parser.add_argument('--calls', type=int, default=20)
+    parser.add_argument('--quick', action='store_true', help='only run a few small cases')
+    parser.add_argument('--size', action='append', metavar='M,N,K',
+                        help='a case to run; may be repeated')
+    parser.add_argument('--no-isolate', action='store_true',
+                        help='run all cases in this process')
+    parser.add_argument('--backends', metavar='NAME,NAME,...',
+                        help='compare these solver backends instead, e.g. cyscs,scs,ecos')
+    parser.add_argument('--prox-terms', action='store_true',
+                        help='compare the epigraph and quadratic prox terms instead')
+    parser.add_argument('--rho', action='append', type=float,
+                        help='with --prox-terms, a rho to cycle through; may be repeated')
+    args = parser.parse_args(argv)
+
+    if args.size:
+        sizes = [tuple(int(v) for v in s.split(',')) for s in args.size]
+    else:
+        sizes = quick_sizes if args.quick else default_sizes
+
+    if args.backends:
+        backends = args.backends.split(',')
+        print('{:>6} {:>5} {:>3} {:>8} {:>10} {:>10} {:>8} {:>10}'.format(
+              'm', 'n', 'k', 'backend', 'setup', 'time', 'iter', 'max diff'))
+        res = []
+        for m, n, k in sizes:
+            for r in bench_backends(m, n, k, backends, calls=args.calls):
+                res.append(r)
+                if r['error']:
+                    print('{m:>6} {n:>5} {k:>3} {backend:>8} {error}'.format(**r))
+                else:
+                    print('{m:>6} {n:>5} {k:>3} {backend:>8} {setup_time:>10.4f} '
+                          '{time:>10.5f} {iter:>8.1f} {max_diff:>10.2e}'.format(**r))
+        if args.out:
+            with open(args.out, 'w') as f:
+                json.dump(res, f, indent=2)
+        return 0
+
+    if args.prox_terms:
+        rhos = args.rho or [1.0]
+        print('{:>6} {:>5} {:>3} {:>9} {:>6} {:>6} {:>10} {:>10} {:>10} {:>8} {:>10}'.format(
+              'm', 'n', 'k', 'term', 'rows', 'cols', 'setup', 'first', 'time', 'iter',
+              'max diff'))
+        res = []
+        for m, n, k in sizes:
+            for r in bench_prox_terms(m, n, k, calls=args.calls, rhos=rhos):
+                res.append(r)
+                if r['error']:
+                    print('{m:>6} {n:>5} {k:>3} {prox_term:>9} {error}'.format(**r))
+                else:
+                    print('{m:>6} {n:>5} {k:>3} {prox_term:>9} {rows:>6} {cols:>6} '
+                          '{setup_time:>10.4f} {first_time:>10.5f} {time:>10.5f} '
+                          '{iter:>8.1f} {max_diff:>10.2e}'.format(**r))
+        if args.out:
+            with open(args.out, 'w') as f:
+                json.dump(res, f, indent=2)
+        return 0
+
+    res = run(sizes, calls=args.calls, isolate=not args.no_isolate)
+
+    fmt = '{m:>6} {n:>5} {k:>3} {cvxpy_time:>10.4f} {scs_setup_time:>10.4f} ' \
+          '{cold_time:>10.5f} {warm_time:>10.5f} {iter_saved:>8.1f} {peak_rss_mb:>8.1f}'
+    print('{:>6} {:>5} {:>3} {:>10} {:>10} {:>10} {:>10} {:>8} {:>8}'.format(
+          'm', 'n', 'k', 'cvxpy', 'scs setup', 'cold', 'warm', 'saved', 'rss MB'))
+    for r in res['results']:
+        print(fmt.format(**r))
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(res, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        worse = compare(res, old, args.tol)
+        for m, n, k, key, a, b in worse:
+            print('slower: m={} n={} k={} {}: {:.5f} -> {:.5f}'.format(m, n, k, key, a, b))
+        if worse:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,311 @@
+""" Closed-form proxes for simple separable problems, bypassing SCS.
+
+`recognize` inspects a CVXPY problem. If every term of the objective
+and every constraint involves a single prox variable, and each variable's
+part of the problem is one of
+
+- `w1*norm1(x) + w2*sum_squares(x)`, with optional bounds `lo <= x <= hi`
+  (including `x >= 0`), which gives an elementwise soft-threshold, scaling and clipping,
+- `w*norm2(x)`, which gives a block soft-threshold,
+- a sum of `w*sum_squares(A*x - b)` terms, which gives a linear solve, with the
+  factorization cached for each rho,
+
+then the prox can be evaluated with a few vectorized numpy operations.
+
+`ClosedFormWorkspace` stands in for a `cyscs.Workspace`: it reads x0 and tau
+from the same `b`/`c` layout that `restuff` writes, so the rest of `Prox`
+(flat, batch and `out=` paths, warm-starts and info) works unchanged.
+"""
+from time import perf_counter
+
+import numpy as np
+import scipy.linalg as la
+
+
+def _value(expr):
+    """ Numeric value of a constant CVXPY expression as a 1D column-major array.
+    """
+    return np.atleast_1d(np.asarray(expr.value, dtype=np.float64)).ravel(order='F')
+
+def _is_scalar_const(expr):
+    return expr.is_constant() and expr.size == (1, 1)
+
+
+class VarProx(object):
+    """ The part of the problem involving one prox variable of size `n`.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.l1 = 0.0
+        self.l2 = 0.0
+        self.sq = 0.0
+        self.ls = []
+        self.lo = np.full(n, -np.inf)
+        self.hi = np.full(n, np.inf)
+        self._factors = {}
+
+    def check(self):
+        """ Whether the combination of terms has a closed-form prox here.
+        """
+        bounded = np.any(np.isfinite(self.lo)) or np.any(np.isfinite(self.hi))
+        if np.any(self.lo > self.hi):
+            # let SCS report the infeasibility
+            return False
+        if self.ls:
+            return not (self.l1 or self.l2 or bounded)
+        if self.l2:
+            return not (self.l1 or self.sq or bounded)
+        return True
+
+    def prox(self, v, rho, out):
+        """ Write argmin f(x) + rho/2*||x - v||^2 into `out`.
+        """
+        if self.ls:
+            return self._prox_ls(v, rho, out)
+
+        if self.l2:
+            nrm = np.linalg.norm(v)
+            scale = max(0.0, 1.0 - self.l2/(rho*nrm)) if nrm > 0 else 0.0
+            np.multiply(v, scale, out=out)
+            return out
+
+        # soft-threshold, scale, and clip
+        np.multiply(v, rho, out=out)
+        if self.l1:
+            np.abs(out, out=out)
+            out -= self.l1
+            np.maximum(out, 0, out=out)
+            out *= np.sign(v)
+        out /= rho + 2*self.sq
+        np.clip(out, self.lo, self.hi, out=out)
+        return out
+
+    def _prox_ls(self, v, rho, out):
+        # sum_i w_i*||A_i x - b_i||^2 + rho/2*||x - v||^2
+        # => (sum_i 2 w_i A_i'A_i + rho I) x = sum_i 2 w_i A_i'b_i + rho v
+        if rho not in self._factors:
+            H = rho*np.eye(self.n)
+            for w, A, b in self.ls:
+                H += 2*w*A.T.dot(A)
+            if self.sq:
+                H += 2*self.sq*np.eye(self.n)
+            # keep only a few factorizations around
+            if len(self._factors) >= 8:
+                self._factors.clear()
+            self._factors[rho] = la.cho_factor(H)
+
+        rhs = rho*v
+        for w, A, b in self.ls:
+            rhs += 2*w*A.T.dot(b)
+
+        out[:] = la.cho_solve(self._factors[rho], rhs)
+        return out
+
+
+def _terms(expr, weight=1.0):
+    """ Split an objective into `(weight, atom)` terms with nonnegative
+    scalar weights. Returns None on anything else.
+    """
+    from cvxpy.atoms.affine.add_expr import AddExpression
+    from cvxpy.atoms.affine.binary_operators import MulExpression
+
+    if isinstance(expr, AddExpression):
+        terms = []
+        for arg in expr.args:
+            t = _terms(arg, weight)
+            if t is None:
+                return None
+            terms += t
+        return terms
+
+    if isinstance(expr, MulExpression):
+        lh, rh = expr.args
+        if _is_scalar_const(lh):
+            w, arg = float(_value(lh)[0]), rh
+        elif _is_scalar_const(rh):
+            w, arg = float(_value(rh)[0]), lh
+        else:
+            return None
+        if w < 0:
+            return None
+        return _terms(arg, weight*w)
+
+    return [(weight, expr)]
+
+def _prox_var(expr, var_ids):
+    """ The prox variable name if `expr` is exactly one of them, else None.
+    """
+    import cvxpy as cvx
+    if type(expr) is cvx.Variable:
+        return var_ids.get(expr.id)
+    return None
+
+def _affine_coeffs(expr, var):
+    """ `(A, b)` with `expr == A*var - b` up to sign, for affine `expr`
+    depending only on `var`, read off the CVXPY stuffing of `expr == 0`.
+    """
+    import cvxpy as cvx
+
+    prob = cvx.Problem(cvx.Minimize(0), [expr == 0])
+    data = prob.get_problem_data('SCS')
+    off = prob._cached_data['SCS'].sym_data.var_offsets[var.id]
+    n = var.size[0]*var.size[1]
+
+    A = data['A'].tocsc()[:, off:off+n].toarray()
+    return A, np.asarray(data['b'], dtype=np.float64)
+
+def recognize(prob, x_vars):
+    """ Try to split `prob` into closed-form proxes, one per prox variable.
+
+    Returns
+    -------
+    dict or None
+        Maps variable names to `VarProx` objects, or None if the problem
+        isn't recognized.
+    """
+    import cvxpy as cvx
+    from cvxpy.atoms.pnorm import pnorm
+    from cvxpy.atoms.quad_over_lin import quad_over_lin
+    from cvxpy.constraints.leq_constraint import LeqConstraint
+
+    if not isinstance(prob.objective, cvx.Minimize):
+        return None
+
+    # parameter values would be frozen here; leave them to SCS, where
+    # `Prox.set_params` can change them
+    if prob.parameters():
+        return None
+
+    var_ids = {x_vars[k].id: k for k in x_vars}
+    if any(v.id not in var_ids for v in prob.variables()):
+        return None
+
+    specs = {k: VarProx(x_vars[k].size[0]*x_vars[k].size[1]) for k in x_vars}
+
+    terms = _terms(prob.objective.args[0])
+    if terms is None:
+        return None
+
+    for w, atom in terms:
+        if atom.is_constant():
+            continue
+
+        if isinstance(atom, pnorm) and atom.axis is None:
+            k = _prox_var(atom.args[0], var_ids)
+            if k is None:
+                return None
+            if atom.p == 1:
+                specs[k].l1 += w
+            elif atom.p == 2:
+                specs[k].l2 += w
+            else:
+                return None
+
+        elif isinstance(atom, quad_over_lin) and _is_scalar_const(atom.args[1]):
+            arg = atom.args[0]
+            w = w/float(_value(atom.args[1])[0])
+            k = _prox_var(arg, var_ids)
+            if k is not None:
+                specs[k].sq += w
+            else:
+                vs = arg.variables()
+                if not arg.is_affine() or len(vs) != 1:
+                    return None
+                k = var_ids[vs[0].id]
+                A, b = _affine_coeffs(arg, x_vars[k])
+                specs[k].ls.append((w, A, b))
+
+        else:
+            return None
+
+    for con in prob.constraints:
+        # EqConstraint and PSDConstraint subclass LeqConstraint; leave them to SCS
+        if type(con) is not LeqConstraint:
+            return None
+        lh, rh = con.args
+        k_lo, k_hi = _prox_var(rh, var_ids), _prox_var(lh, var_ids)
+        if k_lo is not None and lh.is_constant():
+            np.maximum(specs[k_lo].lo, _value(lh), out=specs[k_lo].lo)
+        elif k_hi is not None and rh.is_constant():
+            np.minimum(specs[k_hi].hi, _value(rh), out=specs[k_hi].hi)
+        else:
+            return None
+
+    if not all(spec.check() for spec in specs.values()):
+        return None
+
+    return specs
+
+
+class ClosedFormWorkspace(object):
+    """ Stands in for `cyscs.Workspace`, evaluating the prox in closed form.
+
+    The prox input is read from `b`, where `restuff` writes `-2*x0`,
+    and tau from `c[0]`. The solution `x` uses the same slices as `b`.
+    """
+
+    def __init__(self, specs, slices):
+        self.specs = specs
+        self.slices = slices
+        self.settings = {}
+
+        n = max(s.stop for s in slices.values())
+        self.data = dict(b=np.zeros(n), c=np.zeros(1))
+        # dual variables don't apply; share one zero vector
+        self._zero = np.zeros(n)
+        self._info = dict(iter=0, status='Solved', statusVal=1,
+                          setupTime=0.0, solveTime=0.0,
+                          resPri=0.0, resDual=0.0, relGap=0.0)
+
+    @property
+    def info(self):
+        return dict(self._info)
+
+    def solve(self, new_bc=None, warm_start=None, **settings):
+        """ Same signature as `cyscs.Workspace.solve`; `warm_start` is ignored.
+        """
+        self.settings.update(settings)
+        if new_bc is not None:
+            self.data.update(new_bc)
+
+        start = perf_counter()
+
+        b = self.data['b']
+        rho = 2*self.data['c'][0]
+        x = np.empty(len(b))
+        for k, s in self.slices.items():
+            v = b[s]*-0.5
+            self.specs[k].prox(v, rho, x[s])
+
+        self._info['solveTime'] = (perf_counter() - start)*1e3
+
+        return dict(x=x, y=self._zero, s=self._zero, info=self.info)
+
+
+def closed_form_prox(prob, x_vars):
+    """ Like `stuffed_prox`, but for the closed-form route.
+
+    Returns
+    -------
+    work, data, indmap, solmap
+        or None if the problem isn't recognized.
+    """
+    specs = recognize(prob, x_vars)
+    if specs is None:
+        return None
+
+    slices = {}
+    start = 0
+    for k in sorted(specs):
+        slices[k] = slice(start, start + specs[k].n)
+        start += specs[k].n
+
+    work = ClosedFormWorkspace(specs, slices)
+    data = dict(A=None, b=work.data['b'], c=work.data['c'], dims=None)
+
+    indmap = dict(slices)
+    indmap['__tau'] = np.array([0])
+    solmap = dict(slices)
+
+    return work, data, indmap, solmap
@@ -0,0 +1,174 @@
+""" Forming the prox problem directly from SCS conic data, without CVXPY.
+
+Given the SCS problem
+
+    min c'x  s.t.  Ax + s = b, s in K,
+
+we add `tau*||x_k - x0_k||^2` for each prox variable `x_k` (a slice of `x`)
+the same way CVXPY does for `form_prox`: with a new epigraph variable `t_k`,
+the term `tau*t_k` in the objective, and the second-order cone constraint
+
+    ||(1 - t_k, 2*(x_k - x0_k))||_2 <= 1 + t_k,
+
+which holds exactly when `t_k >= ||x_k - x0_k||^2`.
+As with CVXPY, x0 enters b as `-2*x0`, so `restuff` works unchanged.
+
+With `diag=True`, each coordinate gets its own `tau_i*(x_i - x0_i)^2`,
+for a diagonal metric; see `diag_prox_rows`.
+"""
+import numpy as np
+import scipy.sparse as sp
+
+
+def _as_slice(s):
+    if isinstance(s, slice):
+        return slice(int(s.start), int(s.stop))
+    start, stop = s
+    return slice(int(start), int(stop))
+
+
+def _shift_rows(rows, inserts):
+    """ New positions of old rows of b, after inserting blocks of rows.
+    `inserts` is a list of `(position, count)` pairs, in old row numbers.
+    """
+    new = np.array(rows, dtype=np.int64)
+    for pos, count in inserts:
+        new[np.asarray(rows) >= pos] += count
+    return new
+
+
+def conic_prox(A, b, c, dims, var_slices, diag=False, pmap=None):
+    """ Form the stuffed prox problem from SCS data.
+
+    Parameters
+    ----------
+    A: scipy sparse matrix or 2D numpy array
+    b, c: 1D numpy arrays
+    dims: dict
+        SCS cone dims, with keys among 'f', 'l', 'q', 's', 'ep', 'ed', 'p'
+    var_slices: dict
+        Maps prox variable names to the `slice` (or `(start, stop)` pair)
+        of `x` they occupy.
+    diag: bool
+        Use a separate tau for each coordinate; see `diag_prox_rows`.
+    pmap: dict
+        Optional map of extra parameters into `b` (see `extra_param_map`).
+        Its 'brows' are updated in place for the inserted rows.
+
+    Returns
+    -------
+    data: dict
+        SCS data `A`, `b`, `c` and `dims` for the prox problem
+    indmap, solmap: dict
+        As from `stuffed_prox`.
+    """
+    A = sp.csc_matrix(A, dtype=np.float64)
+    m, n = A.shape
+    b = np.array(b, dtype=np.float64)
+    c = np.array(c, dtype=np.float64)
+
+    names = sorted(var_slices)
+    solmap = {k: _as_slice(var_slices[k]) for k in names}
+
+    # the new cones go at the end of the second-order cone block
+    f = dims.get('f', 0)
+    split = f + dims.get('l', 0) + int(sum(dims.get('q', [])))
+
+    if diag:
+        E, new_f, P, new_b, cones, indmap, extra = diag_prox_rows(solmap, names, n, f)
+    else:
+        P, new_b, cones, indmap, extra = prox_rows(solmap, names, n, split)
+        E, new_f = None, []
+
+    A = sp.hstack([A, sp.csc_matrix((m, extra))]).tocsr()
+    blocks = [A[:f], E, A[f:split], P, A[split:]]
+    A = sp.vstack([B for B in blocks if B is not None]).tocsc()
+    A.indptr = A.indptr.astype(np.int64)
+    A.indices = A.indices.astype(np.int64)
+
+    b = np.concatenate([b[:f], new_f, b[f:split], new_b, b[split:]])
+    c = np.concatenate([c, np.zeros(extra)])
+
+    if pmap is not None:
+        pmap['brows'] = _shift_rows(pmap['brows'], [(split, len(new_b)), (f, len(new_f))])
+
+    dims = dict(dims)
+    dims['f'] = f + len(new_f)
+    dims['q'] = [int(q) for q in dims.get('q', [])] + cones
+
+    data = dict(A=A, b=b, c=c, dims=dims)
+
+    return data, indmap, solmap
+
+def prox_rows(solmap, names, n, split):
+    """ Rows of `tau*t_k` with `t_k >= ||x_k - x0_k||^2` for each variable,
+    one second-order cone each, placed at row `split`.
+    """
+    rows, cols, vals = [], [], []
+    new_b = []
+    cones = []
+    indmap = {}
+    r = 0
+    for j, k in enumerate(names):
+        s = solmap[k]
+        nk = s.stop - s.start
+        t = n + j
+
+        # s = (1 + t, 1 - t, 2*x - 2*x0) = b - A*x
+        rows += [r, r+1]
+        cols += [t, t]
+        vals += [-1.0, 1.0]
+        rows += range(r+2, r+2+nk)
+        cols += range(s.start, s.stop)
+        vals += [-2.0]*nk
+
+        new_b += [1.0, 1.0] + [0.0]*nk
+        indmap[k] = slice(split+r+2, split+r+2+nk)
+        cones.append(nk+2)
+        r += nk+2
+
+    P = sp.csc_matrix((vals, (rows, cols)), shape=(r, n+len(names)))
+    indmap['__tau'] = np.arange(n, n+len(names))
+
+    return P, new_b, cones, indmap, len(names)
+
+def diag_prox_rows(solmap, names, n, f):
+    """ Rows of `sum_i tau_i*t_i` with `t_i >= (x_i - x0_i)^2` for each coordinate.
+
+    A separate cone per coordinate would put the x0 entries of b in every
+    third row. To keep each x0 a contiguous chunk of b, as `restuff` needs,
+    we add `z = x - x0` as equality rows, stuffed as `2*z - 2*x = -2*x0`,
+    and the 3-dimensional cones `||(1 - t_i, 2*z_i)||_2 <= 1 + t_i`.
+    Only `c` depends on tau, so A and its factorization never change with rho.
+
+    The equality rows go at row `f`, the end of the zero cone block. The new variables
+    are all the `z` (in flat layout order), then all the `t`.
+    """
+    N = sum(solmap[k].stop - solmap[k].start for k in names)
+    z0, t0 = n, n + N
+
+    erows, ecols, evals = [], [], []
+    indmap = {}
+    g = 0
+    for k in names:
+        s = solmap[k]
+        nk = s.stop - s.start
+        erows += 2*list(range(g, g+nk))
+        ecols += list(range(s.start, s.stop)) + list(range(z0+g, z0+g+nk))
+        evals += [-2.0]*nk + [2.0]*nk
+        indmap[k] = slice(f+g, f+g+nk)
+        g += nk
+    E = sp.csc_matrix((evals, (erows, ecols)), shape=(N, n+2*N))
+
+    # s = (1 + t_i, 1 - t_i, 2*z_i) = b - A*x, for each coordinate i
+    i = np.arange(N)
+    rows = np.concatenate([3*i, 3*i+1, 3*i+2])
+    cols = np.concatenate([t0+i, t0+i, z0+i])
+    vals = np.concatenate([-np.ones(N), np.ones(N), -2*np.ones(N)])
+    P = sp.csc_matrix((vals, (rows, cols)), shape=(3*N, n+2*N))
+
+    new_b = np.tile([1.0, 1.0, 0.0], N)
+    indmap['__tau'] = np.arange(t0, t0+N)
+    indmap['__diag'] = True
+
+    return E, np.zeros(N), P, new_b, [3]*N, indmap, 2*N
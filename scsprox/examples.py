@@ -59,4 +59,32 @@ def example_rand(m=10,n=5,seed=0):
         if len(true_sol[k]) == 1:
             true_sol[k] = true_sol[k][0]
 
-    return prob, x_vars, true_sol
\ No newline at end of file
+    return prob, x_vars, true_sol
+
+
+def example_blocks(m=10,n=5,k=2,seed=0):
+    """ `k` copies of the `example_rand` problem, chained together,
+    with variables `x0, y0, x1, y1, ...`. Useful for scaling the number of variables.
+    """
+    assert m > n
+    np.random.seed(seed)
+
+    x_vars = {}
+    obj = 0
+    for i in range(k):
+        A = np.random.randn(m,n)
+        b = np.random.randn(m)
+
+        x = cvx.Variable(n)
+        y = cvx.Variable(m)
+
+        obj += cvx.sum_squares(A*x-b) + cvx.norm(A.T*y - x) + 0.1*cvx.norm(y)
+        if i > 0:
+            obj += cvx.norm(x - x_vars['x{}'.format(i-1)])
+
+        x_vars['x{}'.format(i)] = x
+        x_vars['y{}'.format(i)] = y
+
+    prob = cvx.Problem(cvx.Minimize(obj))
+
+    return prob, x_vars
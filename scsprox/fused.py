@@ -0,0 +1,271 @@
+""" Fusing many small prox operators into one SCS problem.
+
+For tiny proxes, the per-call overhead of Python and of `Workspace.solve`
+dominates the actual work. `FusedProx` stacks the stuffed problems of many
+operators block-diagonally, so that one solve evaluates all of them.
+
+SCS needs the rows of `A` grouped by cone type, in the order
+f, l, q, s, ep, ed, p. The block-diagonal stack is permuted so that
+the rows of each cone type from all the blocks sit together, block by block.
+The columns stay in block order, and `c` is simply concatenated.
+
+The blocks are independent, so the solution is the same as solving each one
+alone. Note, though, that SCS checks convergence on the fused problem as
+a whole, and that a failed or infeasible block fails the whole solve.
+"""
+import threading
+
+import numpy as np
+import scipy.sparse as sp
+
+from .prox_obj import Prox
+from .backends import make_backend
+from .scsprox import stuffed_prox, do_prox_flat
+from .scs_mapping import (flat_layout, flat_index, flat_size, dict_to_flat, flat_to_dict,
+                          var_shapes)
+
+_cones = 'f', 'l', 'q', 's', 'ep', 'ed', 'p'
+_list_cones = 'q', 's', 'p'
+
+
+def cone_rows(dims):
+    """ Number of rows of each cone type in `dims`, in SCS order.
+
+    A PSD cone of size `n` takes `n*(n+1)/2` rows: the packed lower triangle,
+    as stuffed by CVXPY for SCS 1.1 and later.
+    """
+    rows = []
+    for k in _cones:
+        v = dims.get(k)
+        if not v:
+            rows.append(0)
+        elif k in ('f', 'l'):
+            rows.append(int(v))
+        elif k == 'q':
+            rows.append(int(sum(v)))
+        elif k == 's':
+            rows.append(int(sum(n*(n+1)//2 for n in v)))
+        elif k in ('ep', 'ed'):
+            rows.append(3*int(v))
+        else:
+            rows.append(3*len(v))
+    return rows
+
+def stack_blocks(datas):
+    """ Stack SCS problems block-diagonally, with rows in cone order.
+
+    Parameters
+    ----------
+    datas: list of dict
+        SCS data `A`, `b`, `c` and `dims` of each block
+
+    Returns
+    -------
+    data: dict
+        SCS data of the fused problem
+    rowmaps: list of 1D int arrays
+        For each block, the fused rows of its rows.
+    coloffs: list of int
+        For each block, the fused column of its first column.
+    """
+    As = [sp.csc_matrix(d['A']) for d in datas]
+    sections = []
+    row = 0
+    for A, d in zip(As, datas):
+        counts = cone_rows(d['dims'])
+        if sum(counts) != A.shape[0]:
+            msg = 'Cone dims do not match the rows of A.'
+            if d['dims'].get('s'):
+                msg += ' PSD cones must take n*(n+1)/2 rows (the packed lower triangle).'
+            raise ValueError(msg)
+        starts = row + np.cumsum([0] + counts[:-1])
+        sections.append(list(zip(starts, counts)))
+        row += A.shape[0]
+
+    # stacked row perm[i] becomes fused row i
+    perm = np.concatenate([np.arange(start, start+n, dtype=np.int64)
+                           for j in range(len(_cones)) for start, n in
+                           (sec[j] for sec in sections)] + [np.zeros(0, dtype=np.int64)])
+    inv = np.empty_like(perm)
+    inv[perm] = np.arange(len(perm))
+
+    A = sp.block_diag(As, format='csr')[perm].tocsc()
+    A.indptr = A.indptr.astype(np.int64)
+    A.indices = A.indices.astype(np.int64)
+    b = np.concatenate([np.asarray(d['b'], dtype=np.float64) for d in datas])[perm]
+    c = np.concatenate([np.asarray(d['c'], dtype=np.float64) for d in datas])
+
+    dims = {}
+    for k in _cones:
+        if not any(k in d['dims'] for d in datas):
+            continue
+        vals = [d['dims'].get(k) for d in datas]
+        if k in _list_cones:
+            dims[k] = [int(n) for v in vals if v for n in v]
+        else:
+            dims[k] = int(sum(v for v in vals if v))
+
+    rowmaps, coloffs = [], []
+    row = col = 0
+    for A_i in As:
+        m, n = A_i.shape
+        rowmaps.append(inv[row:row+m])
+        coloffs.append(col)
+        row += m
+        col += n
+
+    return dict(A=A, b=b, c=c, dims=dims), rowmaps, coloffs
+
+def _block(p):
+    """ Stuffed data, index maps and shapes of a `Prox` or `(prob, x_vars)` pair.
+    """
+    if isinstance(p, Prox):
+        if p.method != 'scs':
+            raise ValueError('Closed-form proxes can not be fused.')
+        if p.prox_term != 'epigraph':
+            raise ValueError('Only proxes with the epigraph prox term can be fused.')
+        data = dict(A=p._A, b=p._bc['b'], c=p._bc['c'], dims=p._dims)
+        return data, p._indmap, p._solmap, p._shapes
+
+    prob, x_vars = p
+    data, indmap, solmap = stuffed_prox(prob, x_vars)
+    return data, indmap, solmap, var_shapes(x_vars)
+
+
+class FusedProx(object):
+    """ Many prox operators, evaluated together in one SCS solve.
+
+    Parameters
+    ----------
+    proxes: list
+        `Prox` objects (using SCS), or `(prob, x_vars)` pairs as for `Prox`.
+        A `Prox` is copied in with its current `b` and `c`, so its parameter values
+        are the ones at fusion time; later calls on it are independent of the fused operator.
+    backend: str
+        Solver backend, as for `Prox`.
+    settings:
+        SCS settings, as for `Prox`.
+
+    The fused flat vector is the concatenation of each operator's flat vector,
+    laid out as in its `Prox.layout`, in the order given.
+    """
+
+    def __init__(self, proxes, backend='cyscs', **settings):
+        self.settings = Prox.default_settings()
+        self.update_settings(**settings)
+
+        blocks = [_block(p) for p in proxes]
+        data, rowmaps, coloffs = stack_blocks([blk[0] for blk in blocks])
+
+        self._layouts, self._shapes = [], []
+        bidx, xidx, taus = [], [], []
+        self._tau_counts = []
+        for (_, indmap, solmap, shapes), rows, col in zip(blocks, rowmaps, coloffs):
+            layout = flat_layout(solmap)
+            self._layouts.append(layout)
+            self._shapes.append({k: tuple(shapes[k]) for k in solmap})
+            bidx.append(rows[flat_index(indmap, layout)])
+            xidx.append(col + flat_index(solmap, layout))
+            taus.append(col + np.asarray(indmap['__tau'], dtype=np.int64))
+            self._tau_counts.append(len(indmap['__tau']))
+
+        sizes = [flat_size(layout) for layout in self._layouts]
+        self._offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+
+        self._bidx = np.concatenate(bidx)
+        self._xidx = np.concatenate(xidx)
+        self._indmap = {'__tau': np.concatenate(taus)}
+
+        self._A, self._dims = data['A'], data['dims']
+        self._bc = dict(b=data['b'], c=data['c'])
+        self._work = make_backend(backend, data, **self.settings)
+        self._sol_info = self._work.info
+        self._bbuf = np.empty(len(self._bidx))
+        self._warm_start = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._layouts)
+
+    @property
+    def layouts(self):
+        """ The `Prox.layout` of each operator.
+        """
+        return [dict(layout) for layout in self._layouts]
+
+    @property
+    def info(self):
+        with self._lock:
+            info = self._sol_info
+            return dict(scs_setup_time=info['setupTime']*1e-3,
+                        time=info['solveTime']*1e-3,
+                        iter=info['iter'],
+                        status=info['status'])
+
+    def update_settings(self, **settings):
+        for key in settings:
+            if key not in self.settings:
+                raise ValueError('Invalid settings key: {}'.format(key))
+            self.settings[key] = settings[key]
+
+    def split(self, x):
+        """ Split a fused flat vector into one view per operator.
+        """
+        return [x[self._offsets[i]:self._offsets[i+1]] for i in range(len(self))]
+
+    def _rhos(self, rho):
+        """ rho for each tau entry of the fused `c`.
+        """
+        rho = np.asarray(rho, dtype=np.float64)
+        if rho.ndim == 0:
+            return rho
+        if rho.shape != (len(self),):
+            raise ValueError('rho must be a scalar or have one entry per operator.')
+        return np.repeat(rho, self._tau_counts)
+
+    def do_flat(self, x0=None, rho=1.0, out=None, **settings):
+        """ Evaluate all the proxes at the fused flat vector `x0`.
+
+        `rho` is a scalar, or one per operator.
+        Returns the fused flat solution; see `FusedProx.split`.
+        """
+        with self._lock:
+            self.update_settings(**settings)
+            if x0 is None:
+                x0 = np.zeros(len(self._bidx))
+
+            x, scs_sol = do_prox_flat(self._work, self._bc, self._indmap,
+                                      self._bidx, self._xidx, x0, self._rhos(rho),
+                                      warm_start=self._warm_start, out=out, buf=self._bbuf,
+                                      **self.settings)
+
+            self._sol_info = scs_sol['info']
+            self._warm_start = scs_sol
+
+            status = self._sol_info['status']
+            if 'Solved' not in status:
+                raise RuntimeError('Unexpected solver status: {}'.format(status))
+
+            return x
+
+    def do(self, x0s=None, rho=1.0, **settings):
+        """ Evaluate all the proxes at the dicts `x0s`, one per operator.
+        `None` entries (or `x0s=None`) give the zero element.
+
+        Returns a list of solution dicts, one per operator.
+        """
+        x0 = np.zeros(len(self._bidx))
+        if x0s is not None:
+            if len(x0s) != len(self):
+                raise ValueError('Expected {} prox inputs.'.format(len(self)))
+            for v, xi, layout in zip(self.split(x0), x0s, self._layouts):
+                if xi:
+                    dict_to_flat(xi, layout, out=v)
+
+        x = self.do_flat(x0, rho, **settings)
+
+        return [flat_to_dict(v, layout, shapes)
+                for v, layout, shapes in zip(self.split(x), self._layouts, self._shapes)]
+
+    def __call__(self, x0s=None, rho=1.0, **settings):
+        return self.do(x0s, rho, **settings)
@@ -0,0 +1,58 @@
+""" Inexact proxes: solving to a loose, scheduled tolerance.
+
+Inexact ADMM converges as long as the prox errors are summable,
+so early proxes only need to be loose. A schedule maps the number of
+calls made so far, `k`, to the SCS `eps` for the next call.
+In inexact mode, solves that stop early at `max_iters` return
+their last iterate with an accuracy estimate, instead of raising.
+Otherwise, only a solved status is accepted; see `is_solved`.
+"""
+
+
+class geometric(object):
+    """ `eps_k = max(final, start*rate**k)`.
+    """
+
+    def __init__(self, start=1e-1, final=1e-5, rate=0.8):
+        self.start, self.final, self.rate = start, final, rate
+
+    def __call__(self, k):
+        return max(self.final, self.start*self.rate**k)
+
+
+class summable(object):
+    """ `eps_k = max(final, start/(k+1)**power)`, summable for `power > 1`.
+    """
+
+    def __init__(self, start=1e-1, final=1e-5, power=1.5):
+        self.start, self.final, self.power = start, final, power
+
+    def __call__(self, k):
+        return max(self.final, self.start/(k + 1.0)**self.power)
+
+
+def accuracy(info):
+    """ Accuracy estimate of an SCS solution: the largest of the relative
+    primal and dual residuals and the relative duality gap.
+    None if the solver info doesn't have them.
+    """
+    try:
+        return max(info['resPri'], info['resDual'], info['relGap'])
+    except KeyError:
+        return None
+
+def is_fatal(status):
+    """ Statuses which are errors even for an inexact prox: no iterate is useful.
+    """
+    return any(s in status for s in ('Infeasible', 'Unbounded', 'Failure'))
+
+def is_solved(status, inexact=False):
+    """ Whether a prox call with solver `status` returns its solution.
+
+    A strict call needs 'Solved' or 'Solved/Inaccurate'.
+    An inexact call accepts any status which isn't fatal,
+    such as 'Indeterminate', and returns the last iterate.
+    """
+    if inexact:
+        return not is_fatal(status)
+    return 'Solved' in status
@@ -0,0 +1,114 @@
+""" Memoizing prox solutions for repeated inputs.
+
+`MemoWorkspace` wraps a workspace (a `cyscs.Workspace`, or a stand-in like
+`ClosedFormWorkspace`) with the same `solve` signature. The key for each solve
+is a 128-bit BLAKE2 hash of the restuffed prox entries of b and c, that is,
+of `x0` and rho, along with the solve's `eps` and `max_iters`.
+On a hit, the stored SCS solution is returned without calling the wrapped `solve`.
+"""
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ProxMemo(object):
+    """ LRU cache of SCS solutions, bounded by entry count and by bytes.
+
+    Attributes
+    ----------
+    hits, misses, evictions: int
+    nbytes: int
+        Bytes of solution arrays currently held.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=2**26):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        sol = self._entries.get(key)
+        if sol is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return sol
+
+    def put(self, key, sol):
+        size = sum(sol[k].nbytes for k in ('x', 'y', 's'))
+        if size > self.max_bytes or self.max_entries < 1:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old['nbytes']
+
+        sol['nbytes'] = size
+        self._entries[key] = sol
+        self.nbytes += size
+
+        while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self.nbytes -= old['nbytes']
+            self.evictions += 1
+
+    def clear(self):
+        """ Drop all entries. The counters are kept.
+        """
+        self._entries.clear()
+        self.nbytes = 0
+
+    def as_dict(self):
+        return dict(hits=self.hits, misses=self.misses, evictions=self.evictions,
+                    entries=len(self._entries), nbytes=self.nbytes)
+
+
+class MemoWorkspace(object):
+    """ Wraps `work`, answering repeated solves from `memo`.
+
+    Parameters
+    ----------
+    work:
+        Has `solve(new_bc=None, warm_start=None, **settings)`.
+    memo: ProxMemo
+    bidx, tauidx: 1D int arrays
+        Where the prox input and tau sit in b and c.
+    """
+
+    def __init__(self, work, memo, bidx, tauidx):
+        self.work = work
+        self.memo = memo
+        self.bidx, self.tauidx = bidx, tauidx
+        self._buf = np.empty(len(bidx))
+
+    def key(self, bc, settings):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(np.take(bc['b'], self.bidx, out=self._buf))
+        h.update(np.ascontiguousarray(bc['c'][self.tauidx]))
+        # per-call tolerances (as in inexact mode) give different solutions
+        h.update(repr((settings.get('eps'), settings.get('max_iters'))).encode('utf-8'))
+        return h.digest()
+
+    def solve(self, new_bc=None, warm_start=None, **settings):
+        key = self.key(new_bc, settings)
+
+        sol = self.memo.get(key)
+        if sol is not None:
+            # callers may write to views of x; never hand out the stored copy
+            info = dict(sol['info'], iter=0, solveTime=0.0, setupTime=0.0, cached=True)
+            return dict(x=sol['x'].copy(), y=sol['y'], s=sol['s'], info=info)
+
+        sol = self.work.solve(new_bc=new_bc, warm_start=warm_start, **settings)
+        sol['info']['cached'] = False
+        if 'Solved' in sol['info']['status']:
+            self.memo.put(key, dict(x=sol['x'].copy(), y=sol['y'], s=sol['s'],
+                                    info=dict(sol['info'])))
+
+        return sol
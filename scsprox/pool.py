@@ -0,0 +1,330 @@
+""" Process-parallel evaluation of many Prox operators.
+
+Each worker process builds its Prox objects once and keeps them resident,
+so factorizations and warm-starts persist between sweeps.
+Prox inputs and solutions are exchanged through two shared memory
+buffers, in which each operator owns one flat vector laid out as in `Prox.layout`.
+Only the rho values and the solver status are sent through pipes
+on each sweep; array data is never pickled.
+
+`prox_map` is the lighter-weight alternative: it runs Prox objects
+from this process on a thread pool. The SCS solve releases the GIL,
+so this scales across cores when the solves dominate, without the
+cost of processes.
+"""
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .prox_obj import Prox
+from .scs_mapping import dict_to_flat, flat_to_dict
+
+
+def _build(spec, settings):
+    """ `spec` is a `(prob, x_vars)` pair or a function returning one.
+    """
+    if callable(spec):
+        spec = spec()
+    prob, x_vars = spec
+    return Prox(prob, x_vars, **settings)
+
+def _views(buf, offsets, sizes):
+    return [np.ndarray((n,), dtype=np.float64, buffer=buf, offset=8*off)
+            for off, n in zip(offsets, sizes)]
+
+def _error(e):
+    return '{}: {}'.format(type(e).__name__, e)
+
+def _worker(conn, specs, settings):
+    try:
+        proxes = [_build(spec, settings) for spec in specs]
+    except Exception as e:
+        conn.send(('error', _error(e)))
+        return
+    conn.send(('ok', [(p._layout, p._shapes) for p in proxes]))
+
+    _, in_name, out_name, offsets = conn.recv()
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    sizes = [len(p._xidx) for p in proxes]
+    xin = _views(shm_in.buf, offsets, sizes)
+    xout = _views(shm_out.buf, offsets, sizes)
+
+    try:
+        while True:
+            msg = conn.recv()
+            if msg[0] == 'do':
+                rhos = msg[1]
+                info = []
+                for i, prox in enumerate(proxes):
+                    try:
+                        prox.do_flat(xin[i], rhos[i], out=xout[i])
+                        error = None
+                    except Exception as e:
+                        error = _error(e)
+                    info.append(dict(status=prox.info['status'],
+                                     iter=prox.info['iter'],
+                                     error=error))
+                conn.send(info)
+            elif msg[0] == 'reset':
+                for prox in proxes:
+                    prox.reset_warm_start()
+                conn.send(None)
+            elif msg[0] == 'close':
+                break
+    finally:
+        # drop the views before closing the shared memory
+        del xin, xout
+        shm_in.close()
+        shm_out.close()
+
+
+class ProxPool(object):
+    """ Evaluate many Prox operators in parallel worker processes.
+
+    Operators are assigned to workers round-robin and built inside the workers.
+    Each sweep evaluates every operator once.
+
+    Use as a context manager, or call `close()` when done,
+    to stop the workers and free the shared memory.
+
+    Errors raised while building or evaluating an operator in a worker
+    are sent back and raised as a RuntimeError. A worker which dies
+    raises one as well, instead of blocking the pool.
+    """
+
+    def __init__(self, specs, processes=None, timeout=None, **settings):
+        """
+        Parameters
+        ----------
+        specs: list
+            One entry per operator: either a `(prob, x_vars)` pair,
+            or a picklable function with no arguments returning one.
+        processes: int
+            Number of worker processes. Defaults to the number of CPUs.
+        timeout: float
+            Seconds to wait for a worker's reply before raising a RuntimeError.
+            By default, waits as long as the worker is alive.
+        **settings
+            SCS settings passed to each `Prox`.
+        """
+        num = len(specs)
+        self._timeout = timeout
+        self._procs = None
+        if processes is None:
+            processes = mp.cpu_count()
+        processes = max(1, min(processes, num))
+
+        # operator i lives on worker i % processes, at position i // processes
+        self._owner = [(i % processes, i // processes) for i in range(num)]
+        chunks = [specs[w::processes] for w in range(processes)]
+
+        self._conns = []
+        self._procs = []
+        for chunk in chunks:
+            parent, child = mp.Pipe()
+            proc = mp.Process(target=_worker, args=(child, chunk, settings))
+            proc.daemon = True
+            proc.start()
+            # only the worker holds the child end, so recv sees EOF if it dies
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+        try:
+            replies = [self._recv(w) for w in range(processes)]
+            errors = [msg for status, msg in replies if status == 'error']
+            if errors:
+                raise RuntimeError('Building operators failed: ' + '; '.join(errors))
+        except BaseException:
+            self._terminate()
+            raise
+        worker_layouts = [msg for _, msg in replies]
+        self._layouts = [worker_layouts[w][j][0] for w, j in self._owner]
+        self._shapes = [worker_layouts[w][j][1] for w, j in self._owner]
+
+        sizes = [max(s.stop for s in layout.values()) for layout in self._layouts]
+        offsets = list(np.cumsum([0] + sizes[:-1]))
+        total = max(1, sum(sizes))
+
+        self._shm_in = shared_memory.SharedMemory(create=True, size=8*total)
+        self._shm_out = shared_memory.SharedMemory(create=True, size=8*total)
+
+        self.inputs = _views(self._shm_in.buf, offsets, sizes)
+        self.outputs = _views(self._shm_out.buf, offsets, sizes)
+        for x in self.inputs:
+            x[:] = 0.0
+
+        for w, conn in enumerate(self._conns):
+            ops = [i for i in range(num) if self._owner[i][0] == w]
+            conn.send(('attach', self._shm_in.name, self._shm_out.name,
+                       [offsets[i] for i in ops]))
+
+        self.info = [None]*num
+
+    def __len__(self):
+        return len(self._layouts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __call__(self, x0s=None, rho=1.0):
+        return self.do(x0s, rho)
+
+    @property
+    def zero_elems(self):
+        return [flat_to_dict(np.zeros_like(x), layout, shapes)
+                for x, layout, shapes in zip(self.inputs, self._layouts, self._shapes)]
+
+    def sweep(self, rho=1.0):
+        """ Evaluate every operator on the current contents of `ProxPool.inputs`,
+        writing the solutions into `ProxPool.outputs`.
+
+        This is the zero-copy path: write inputs directly into the
+        `inputs` arrays and read solutions from the `outputs` arrays.
+
+        Parameters
+        ----------
+        rho: float or list
+            A single rho for all operators, or one per operator.
+        """
+        rhos = np.broadcast_to(np.asarray(rho, dtype=np.float64), (len(self),))
+
+        for w, conn in enumerate(self._conns):
+            conn.send(('do', [float(rhos[i]) for i in range(len(self))
+                              if self._owner[i][0] == w]))
+
+        worker_info = [self._recv(w) for w in range(len(self._conns))]
+        self.info = [worker_info[w][j] for w, j in self._owner]
+
+        errors = [(i, d['error']) for i, d in enumerate(self.info) if d['error']]
+        if errors:
+            msg = '; '.join('operator {}: {}'.format(i, e) for i, e in errors)
+            raise RuntimeError(msg)
+
+    def do(self, x0s=None, rho=1.0):
+        """ Evaluate every operator on its input dict.
+
+        Parameters
+        ----------
+        x0s: list
+            One `x0` dict per operator. `None` or an empty dict (or `x0s=None`)
+            gives the zero element.
+        rho: float or list
+            A single rho for all operators, or one per operator.
+
+        Returns
+        -------
+        list of dicts
+            The prox of each operator.
+        """
+        if x0s is None:
+            x0s = [None]*len(self)
+
+        for x0, x, layout in zip(x0s, self.inputs, self._layouts):
+            if x0:
+                dict_to_flat(x0, layout, out=x)
+            else:
+                x[:] = 0.0
+
+        self.sweep(rho)
+
+        return [flat_to_dict(x.copy(), layout, shapes)
+                for x, layout, shapes in zip(self.outputs, self._layouts, self._shapes)]
+
+    def reset_warm_start(self):
+        for conn in self._conns:
+            conn.send(('reset',))
+        for w in range(len(self._conns)):
+            self._recv(w)
+
+    def _recv(self, w):
+        """ Reply from worker `w`, raising a RuntimeError if it dies or times out.
+        """
+        conn, proc = self._conns[w], self._procs[w]
+        waited = 0.0
+        while not conn.poll(0.1):
+            waited += 0.1
+            if not proc.is_alive() and not conn.poll():
+                raise RuntimeError('Worker {} exited with code {}.'.format(w, proc.exitcode))
+            if self._timeout is not None and waited >= self._timeout:
+                raise RuntimeError('Worker {} did not reply within {} s.'.format(w, self._timeout))
+        try:
+            return conn.recv()
+        except EOFError:
+            raise RuntimeError('Worker {} exited with code {}.'.format(w, proc.exitcode))
+
+    def _terminate(self):
+        for proc in self._procs:
+            proc.terminate()
+            proc.join()
+        for conn in self._conns:
+            conn.close()
+        self._procs = None
+
+    def close(self):
+        if self._procs is None:
+            return
+
+        for conn, proc in zip(self._conns, self._procs):
+            try:
+                conn.send(('close',))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self._procs:
+            proc.join(self._timeout)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+        for conn in self._conns:
+            conn.close()
+        self._procs = None
+
+        del self.inputs, self.outputs
+        for shm in self._shm_in, self._shm_out:
+            shm.close()
+            shm.unlink()
+
+
+def prox_map(proxes, inputs, rho=1.0, max_workers=None, flat=False, executor=None):
+    """ Evaluate many Prox objects in parallel threads.
+
+    Parameters
+    ----------
+    proxes: list of Prox
+        The same Prox may appear more than once; its calls are serialized.
+    inputs: list
+        One input per prox: dicts (or None), or flat vectors if `flat=True`.
+    rho: float or list
+        A single rho, or one per prox.
+    max_workers: int, optional
+        Size of the thread pool; defaults to that of `ThreadPoolExecutor`.
+    executor: concurrent.futures.Executor, optional
+        Reuse an existing pool instead of creating one on each call.
+
+    Returns
+    -------
+    list of solutions, in order. Exceptions from any prox (such as a bad
+    solver status) are raised after all calls finish.
+    """
+    if not isinstance(rho, (list, tuple, np.ndarray)):
+        rho = [rho]*len(proxes)
+
+    def call(args):
+        prox, x0, r = args
+        return prox.do_flat(x0, r) if flat else prox.do(x0, r)
+
+    args = list(zip(proxes, inputs, rho))
+    if executor is not None:
+        futures = [executor.submit(call, a) for a in args]
+        wait(futures)
+        return [f.result() for f in futures]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(call, a) for a in args]
+    return [f.result() for f in futures]
@@ -1,9 +1,22 @@
+import threading
+from time import perf_counter
 
 import numpy as np
-import cyscs
 
-from .scsprox import stuffed_prox, do_prox_work
+from .scsprox import stuffed_prox, stuffed_quadratic_prox, do_prox_work, do_prox_flat, do_prox_batch
+from .scs_mapping import (flat_layout, flat_index, flat_size, dict_to_flat, flat_to_dict,
+                          var_shapes, default_shapes, restuff_params)
+from .conic import conic_prox
+from .closed_form import closed_form_prox
+from .quadratic import quadratic_prox
+from .storage import save_prox_data, load_prox_data, cache_path
+from .workspace import registry
+from .stats import ProxStats
 from .timer import DictTimer
+from .warm_start import WarmStarter
+from .memo import ProxMemo, MemoWorkspace
+from .inexact import accuracy as sol_accuracy, is_solved
+from .backends import make_backend
 
 _cvxpytime = 'cvxpy_time'
 _outer_setup_time = 'outer_scs_setup_time'
@@ -22,11 +35,30 @@ class Prox(object):
     SCS options can be passed in as key-word arguments to the init
     or the .do() function. This might set the max iters or the solver tolerance.
 
-    Solver info can be seen from the prox.info attribute.
+    Solver info can be seen from the prox.info attribute,
+    and aggregate performance statistics from prox.stats.
+
+    Prox objects are thread-safe: calls on one object (or on objects sharing
+    a workspace) are serialized with a lock. The SCS solve itself runs without
+    the GIL, so calls on different objects run in parallel threads;
+    see `scsprox.pool.prox_map`.
+
+    Simple separable problems (norms, sum of squares, bounds) are recognized
+    and evaluated in closed form instead; see `scsprox.closed_form`.
+
+    With `diag_rho=True`, `rho` may differ for each coordinate,
+    for preconditioned or diagonally scaled methods.
+
+    With `prox_term='quadratic'`, the prox term is a quadratic objective
+    for SCS 3, instead of a second-order cone; see `scsprox.quadratic`.
 
     """
 
-    def __init__(self, prob, x_vars, **settings):
+    _methods = 'auto', 'scs', 'closed_form'
+    _prox_terms = 'epigraph', 'quadratic'
+
+    def __init__(self, prob, x_vars, method='auto', share_work=False, diag_rho=False,
+                 backend='cyscs', prox_term='epigraph', **settings):
         """ Forms the proximal problem, stuffs the appropriate SCS matrices,
         and stores the array/matrix data.
         After initialization, doesn't depend on CVXPY in any way.
@@ -37,38 +69,225 @@ class Prox(object):
         x_vars: dict
             Dict of the CVXPY Variables we want to prox on. Keys give the names
             of the variables as they'll be referred to in the input to the prox
+        share_work: bool
+            Share the CySCS workspace (and its matrix factorization) with
+            other Prox objects whose stuffed A matrix and cone dims are identical.
+            Each Prox still keeps its own b, c and warm-start.
+        diag_rho: bool
+            Allow a separate rho for each coordinate, `sum_i rho_i/2*(x_i - x0_i)^2`.
+            The weights only enter the SCS `c` vector, so changing them keeps
+            the factorization, but the prox problem has one small cone per
+            coordinate instead of one per variable. Uses SCS, never the closed form.
+        backend: str
+            Solver for the stuffed problem: 'cyscs' (the default), 'scs' or 'ecos',
+            or one added with `scsprox.backends.register_backend`.
+            Closed forms are only tried with 'cyscs'.
+        prox_term: str
+            How the prox term enters the SCS problem. 'epigraph' (the default)
+            adds a variable, rows in A and a second-order cone per prox variable.
+            'quadratic' uses the SCS 3 quadratic objective, `P = rho*I` and `-rho*x0` in c,
+            on the original problem's A. Changing rho then refactors, but the
+            factorizations for recent rho values are cached. Solved with SCS 3 directly,
+            so it can't be combined with `backend`, `share_work` or the closed form.
 
         """
         self.settings = self.default_settings()
         self.update_settings(**settings)
 
+        if method not in self._methods:
+            raise ValueError('Invalid method: {}. Choose from {}.'.format(method, self._methods))
+        if diag_rho and method == 'closed_form':
+            raise ValueError('Closed-form proxes need a scalar rho.')
+        if backend != 'cyscs' and method == 'closed_form':
+            raise ValueError('Closed-form proxes have no solver backend.')
+        self._check_prox_term(prox_term, method, share_work, backend)
+
         self._info = {}
         with DictTimer(_cvxpytime, self._info):
-            data, self._indmap, self._solmap = stuffed_prox(prob, x_vars)
+            closed = None
+            if (method != 'scs' and not diag_rho and backend == 'cyscs' and
+                    prox_term == 'epigraph'):
+                closed = closed_form_prox(prob, x_vars)
+                if closed is None and method == 'closed_form':
+                    raise ValueError('Problem has no recognized closed-form prox.')
+
+            if prox_term == 'quadratic':
+                work, data, indmap, solmap, pmap = stuffed_quadratic_prox(
+                    prob, x_vars, with_params=True, diag=diag_rho, **self.settings)
+            elif closed is None:
+                work = None
+                data, indmap, solmap, pmap = stuffed_prox(prob, x_vars, with_params=True,
+                                                          diag=diag_rho)
+            else:
+                work, data, indmap, solmap = closed
+                pmap = None
+
+        self._setup(data, indmap, solmap, share_work, var_shapes(x_vars), work=work, pmap=pmap,
+                    backend=backend)
+
+    @classmethod
+    def _check_prox_term(cls, prox_term, method='auto', share_work=False, backend='cyscs'):
+        if prox_term not in cls._prox_terms:
+            raise ValueError('Invalid prox_term: {}. Choose from {}.'.format(
+                             prox_term, cls._prox_terms))
+        if prox_term != 'quadratic':
+            return
+        if method == 'closed_form':
+            raise ValueError('Closed-form proxes have no prox term.')
+        if share_work or backend != 'cyscs':
+            raise ValueError('The quadratic prox term is solved with SCS 3 directly, '
+                             'without a backend or shared workspace.')
 
-        with DictTimer(_outer_setup_time, self._info):
-            self._work = cyscs.Workspace(data, data['dims'], **self.settings)
+    @property
+    def method(self):
+        """ 'closed_form' or 'scs', the route actually used for this prox.
+        """
+        return 'scs' if self._A is not None else 'closed_form'
+
+    @property
+    def backend(self):
+        """ Name of the solver backend, or None for a closed-form prox.
+        """
+        return self._backend
 
+    @property
+    def prox_term(self):
+        """ 'quadratic' or 'epigraph', how the prox term enters the SCS problem.
+        """
+        return self._prox_term
+
+    @property
+    def diag_rho(self):
+        """ Whether rho can differ for each coordinate.
+        """
+        return self._diag
+
+    def _setup(self, data, indmap, solmap, share_work=False, shapes=None, work=None,
+               pmap=None, backend='cyscs'):
+        """ Build the CySCS workspace and the index maps from stuffed SCS data.
+        Doesn't depend on CVXPY.
+
+        `shapes` maps variable names to shapes, as from `var_shapes`,
+        and defaults to scalars and vectors.
+        `work` is an already-built workspace, such as a `ClosedFormWorkspace`
+        or `QuadraticWorkspace`.
+        `pmap` maps other CVXPY Parameters into b and c; see `extra_param_map`.
+        `backend` names the solver; see `scsprox.backends`.
+        """
+        self._indmap, self._solmap = indmap, solmap
+        self._pmap = pmap
+        self._diag = bool(indmap.get('__diag', False))
+        if shapes is None:
+            shapes = default_shapes(solmap)
+        self._shapes = {k: tuple(shapes[k]) for k in solmap}
+
+        with DictTimer(_outer_setup_time, self._info):
+            if work is not None:
+                self._shared = None
+                self._work = work
+                backend = getattr(work, 'backend', None)
+            elif share_work:
+                if backend != 'cyscs':
+                    raise ValueError('Sharing workspaces needs the cyscs backend.')
+                # keep a reference so the registry entry lives as long as this Prox
+                self._shared = registry.get(data, **self.settings)
+                self._work = self._shared.work
+            else:
+                self._shared = None
+                self._work = make_backend(backend, data, **self.settings)
+        self._backend = backend
+        self._prox_term = getattr(self._work, 'prox_term', 'epigraph')
+
+        # guards b, c, the warm-start and the workspace during calls;
+        # Prox objects sharing a workspace share its lock
+        if self._shared is not None:
+            self._lock = self._shared.lock
+        else:
+            self._lock = threading.RLock()
+
+        # info from this Prox's most recent solve; a shared workspace's
+        # own info may come from another Prox
+        self._sol_info = self._work.info
+
+        # keep A (which CySCS uses during solves anyway) so the prox can be saved
+        self._A = data['A']
+        self._dims = data['dims']
         self._bc = dict(b=data['b'],c=data['c'])
 
+        self._layout = flat_layout(self._solmap)
+        self._bidx = flat_index(self._indmap, self._layout)
+        self._xidx = flat_index(self._solmap, self._layout)
+
+        # scratch space for -2*x0 in `do_flat`
+        self._bbuf = np.empty(len(self._bidx))
+
         self._warm_start = None
 
+        # per-call timing breakdown, and running statistics over calls
+        self._times = {}
+        self.stats = ProxStats()
+
+        self.warm_starter = WarmStarter(self._bidx, self._indmap['__tau'])
+
+        # what prox calls solve with: the workspace, or a memo wrapping it
+        self._memo = None
+        self._solver = self._work
+
+        # inexact mode: a tolerance schedule, and whether the latest call was inexact
+        self._schedule = None
+        self._inexact_k = 0
+        self._inexact = False
+        self._eps = self.settings['eps']
+
         
-    def __call__(self, x0=None, rho=1.0, **settings):
-        return self._do(x0, rho, **settings)
+    def __call__(self, x0=None, rho=1.0, out=None, **settings):
+        return self.do(x0, rho, out=out, **settings)
+
+    def do(self, x0=None, rho=1.0, out=None, accuracy=None, **settings):
+        """ Compute the prox at `x0` with penalty `rho`.
+
+        For a `diag_rho` prox, `rho` may also be a dict of per-variable
+        scalars or arrays (shaped like the variables), or a flat vector
+        laid out as in `Prox.layout`.
+
+        If `out` is given, it should be a dict like `Prox.zero_elem`,
+        and the solution is written into its arrays, and returned.
+        Otherwise, the returned arrays are views into the SCS solution,
+        which are not modified by later calls.
+
+        If `accuracy` is given, this call is inexact: SCS runs with
+        `eps=accuracy`, and if it stops early, its last iterate is returned
+        instead of raising. See `Prox.set_inexact`.
+        """
+        with self._lock:
+            return self._do(x0, rho, out=out, accuracy=accuracy, **settings)
 
     @property
     def info(self):
+        with self._lock:
+            return self._get_info()
+
+    def _get_info(self):
+        # a new dict each time, so one kept by the caller doesn't change under it
         info = {}
         # convert to seconds
-        info[_scs_setup_time] = self._work.info['setupTime']*1e-3
-        info['time'] = self._work.info['solveTime']*1e-3
-        info['iter'] = self._work.info['iter']
-        info['status'] = self._work.info['status']
+        info[_scs_setup_time] = self._sol_info['setupTime']*1e-3
+        info['time'] = self._sol_info['solveTime']*1e-3
+        info['iter'] = self._sol_info['iter']
+        info['status'] = self._sol_info['status']
+        info['cached'] = self._sol_info.get('cached', False)
+        info['eps'] = self._eps
+        info['accuracy'] = sol_accuracy(self._sol_info)
 
         for k in _cvxpytime, _outer_setup_time:
             info[k] = self._info[k]
 
+        if self.warm_starter.strategy == 'previous':
+            info['warm_start'] = 'previous'
+            info['iter_saved'] = 0.0
+        else:
+            info.update(self.warm_starter.last)
+
         return info
 
     @property
@@ -80,17 +299,261 @@ class Prox(object):
         for k in self._solmap:
             s = self._solmap[k] # a slice object
             length = s.stop - s.start
-            if length == 1:
+            if length < 1:
+                raise ValueError('Solmap must contain nonzero slices.')
+            elif self._shapes[k] == ():
                 x0[k] = 0.0
-            elif length > 1:
-                x0[k] = np.zeros(length)
             else:
-                raise ValueError('Solmap must contain nonzero slices.')
+                # matrices are stuffed in column-major order
+                x0[k] = np.zeros(self._shapes[k], order='F')
 
         return x0
 
+    @property
+    def layout(self):
+        """ Mapping of variable names to slices of the flat vector used
+        by `do_flat` and `do_batch`. Variables are ordered by name.
+        """
+        return dict(self._layout)
+
+    def dict_to_flat(self, x):
+        """ Convert a dict of prox variables to a flat vector.
+        """
+        return dict_to_flat(x, self._layout)
+
+    def flat_to_dict(self, x):
+        """ Convert a flat vector to a dict of prox variables.
+        The dict values are views into `x`; matrices are Fortran-ordered views.
+        """
+        return flat_to_dict(x, self._layout, self._shapes)
+
+    def save(self, path):
+        """ Save the stuffed problem data, index maps and settings to
+        the directory `path`, so that `Prox.load` can rebuild the prox
+        without CVXPY.
+        """
+        if self._A is None:
+            raise ValueError('Closed-form proxes have no SCS data to save.')
+        if self._prox_term != 'epigraph':
+            raise ValueError('Only proxes with the epigraph prox term can be saved.')
+        data = dict(A=self._A, b=self._bc['b'], c=self._bc['c'], dims=self._dims)
+        save_prox_data(path, data, self._indmap, self._solmap, self.settings,
+                       shapes=self._shapes, pmap=self._pmap)
+
+    @classmethod
+    def load(cls, path, mmap=True, share_work=False, backend='cyscs', **settings):
+        """ Rebuild a prox saved with `Prox.save`.
+
+        With `mmap=True`, the A matrix is memory-mapped copy-on-write,
+        so processes loading the same file share its pages.
+        Settings given as keyword arguments override the saved ones.
+        `share_work` and `backend` are as in `Prox.__init__`.
+        """
+        data, indmap, solmap, saved, shapes, pmap = load_prox_data(path, mmap=mmap)
+        saved.update(settings)
+
+        return cls._from_data(data, indmap, solmap, share_work, shapes, pmap=pmap,
+                              backend=backend, **saved)
+
+    @classmethod
+    def from_conic(cls, A, b, c, dims, var_slices, shapes=None, share_work=False,
+                   diag_rho=False, backend='cyscs', prox_term='epigraph', **settings):
+        """ Form the prox directly from SCS conic data `(A, b, c, dims)`,
+        without CVXPY.
+
+        Parameters
+        ----------
+        A, b, c, dims:
+            SCS problem data: min c'x s.t. Ax + s = b, s in the cones given by `dims`.
+        var_slices: dict
+            Maps prox variable names to the `slice` (or `(start, stop)` pair)
+            of `x` they occupy.
+        shapes: dict
+            Optional shapes of the variables, e.g. `(m, n)` for a matrix
+            stored in column-major order. Defaults to scalars and vectors.
+        diag_rho, backend, prox_term:
+            As in `Prox`.
+
+        The prox term `tau*||x - x0||^2` is added at the conic level,
+        as described in `scsprox.conic`, or as a quadratic objective,
+        as in `scsprox.quadratic`.
+        """
+        cls._check_prox_term(prox_term, share_work=share_work, backend=backend)
+        if prox_term == 'quadratic':
+            settings = dict(cls.default_settings(), **settings)
+            data = dict(A=A, b=b, c=c, dims=dims)
+            work, data, indmap, solmap = quadratic_prox(data, var_slices, diag=diag_rho,
+                                                        **settings)
+            return cls._from_data(data, indmap, solmap, shapes=shapes, work=work, **settings)
+
+        data, indmap, solmap = conic_prox(A, b, c, dims, var_slices, diag=diag_rho)
+
+        return cls._from_data(data, indmap, solmap, share_work, shapes, backend=backend,
+                              **settings)
+
+    @classmethod
+    def _from_data(cls, data, indmap, solmap, share_work=False, shapes=None, pmap=None,
+                   backend='cyscs', work=None, **settings):
+        """ Build a prox from already-stuffed data, skipping CVXPY.
+        `work` is an already-built workspace, as in `Prox._setup`.
+        """
+        prox = cls.__new__(cls)
+        prox.settings = prox.default_settings()
+        prox.update_settings(**settings)
+
+        prox._info = {_cvxpytime: 0.0}
+        prox._setup(data, indmap, solmap, share_work, shapes, work=work, pmap=pmap,
+                    backend=backend)
+
+        return prox
+
+    @classmethod
+    def cached(cls, cache_dir, key, build, share_work=False, **settings):
+        """ Load a prox from `cache_dir`, or build and save it on a cache miss.
+
+        Parameters
+        ----------
+        cache_dir: str
+            Directory holding the cache entries.
+        key: str or bytes
+            Identifies the problem. Entries are stored under its SHA-256 hash.
+        build: function
+            Called with no arguments on a cache miss; returns `(prob, x_vars)`.
+        """
+        path = cache_path(cache_dir, key)
+        try:
+            return cls.load(path, share_work=share_work, **settings)
+        except IOError:
+            pass
+
+        prob, x_vars = build()
+        prox = cls(prob, x_vars, share_work=share_work, **settings)
+        if prox.method == 'scs' and prox.prox_term == 'epigraph':
+            prox.save(path)
+
+        return prox
+
+    @property
+    def params(self):
+        """ Current values of the other CVXPY Parameters in the problem, by name.
+        """
+        if self._pmap is None:
+            return {}
+        values = self._pmap['values']
+        return flat_to_dict(values.copy(), self._pmap['slices'], self._pmap['shapes'])
+
+    def set_params(self, **values):
+        """ Change the values of CVXPY Parameters in the problem, by name,
+        without re-stuffing or re-factoring.
+
+        Parameters that enter only b and c (e.g., `b` in `norm(A*x - b)`, or a bound)
+        are mapped when the Prox is formed. Values are scalars or arrays
+        shaped like the parameter.
+        Cached solutions are dropped, and extrapolated warm-starts restart.
+        """
+        with self._lock:
+            if self._pmap is None:
+                raise ValueError('This prox has no parameters to set.')
+
+            pm = self._pmap
+            for k, v in values.items():
+                if k not in pm['slices']:
+                    raise ValueError('Unknown parameter: {}. Choose from {}.'.format(
+                                     k, sorted(pm['slices'])))
+                s = pm['slices'][k]
+                v = np.asarray(v, dtype=np.float64)
+                if v.size != s.stop - s.start:
+                    raise ValueError('Parameter {} has {} entries, not {}.'.format(
+                                     k, s.stop - s.start, v.size))
+                pm['values'][s] = v.ravel(order='F')
+
+            restuff_params(self._bc, pm)
+
+            if self._memo is not None:
+                self._memo.clear()
+            self.warm_starter.reset()
+
     def reset_warm_start(self):
-        self._warm_start = None
+        with self._lock:
+            self._warm_start = None
+            self.warm_starter.reset()
+
+    def set_warm_start(self, strategy='previous', history=3, **kwargs):
+        """ Choose how each solve is warm-started.
+
+        Parameters
+        ----------
+        strategy: str
+            'previous' (the default) starts from the last solution.
+            'linear' and 'anderson' extrapolate from the last `history`
+            solutions, which helps when the prox inputs move smoothly, as in ADMM.
+            See `scsprox.warm_start`.
+        history: int
+            Number of past solutions to keep.
+
+        Other keyword arguments go to `WarmStarter`.
+        The iterations saved on the latest call are in `info['iter_saved']`,
+        and the running total in `warm_starter.saved`.
+        """
+        with self._lock:
+            self.warm_starter = WarmStarter(self._bidx, self._indmap['__tau'],
+                                            strategy, history, **kwargs)
+
+    def set_inexact(self, schedule=None):
+        """ Turn on inexact mode, with `schedule(k)` giving the SCS `eps`
+        for the `k`th call from now, e.g. `scsprox.inexact.geometric()`.
+        `schedule=None` turns it off.
+
+        In inexact mode, solves which stop at `max_iters` return their
+        last iterate, and `info['accuracy']` estimates its accuracy,
+        instead of raising a RuntimeError.
+        Infeasible, unbounded and failed solves still raise.
+        A per-call `accuracy` overrides the schedule.
+        """
+        with self._lock:
+            self._schedule = schedule
+            self._inexact_k = 0
+
+    def _call_settings(self, accuracy):
+        """ Settings for one solve, with `eps` from `accuracy` or the schedule.
+        """
+        if accuracy is None and self._schedule is not None:
+            accuracy = self._schedule(self._inexact_k)
+            self._inexact_k += 1
+
+        self._inexact = accuracy is not None
+        if not self._inexact:
+            self._eps = self.settings['eps']
+            return self.settings
+
+        self._eps = accuracy
+        return dict(self.settings, eps=accuracy)
+
+    def enable_memo(self, max_entries=128, max_bytes=2**26):
+        """ Cache solutions, so repeated calls at the same `(x0, rho)`
+        return without solving.
+
+        Entries are keyed by a hash of the restuffed prox input and rho,
+        and evicted least-recently-used first once there are more than
+        `max_entries` of them or they hold more than `max_bytes`.
+        The cache is cleared when `eps` or `max_iters` change.
+        """
+        with self._lock:
+            self._memo = ProxMemo(max_entries, max_bytes)
+            self._solver = MemoWorkspace(self._work, self._memo,
+                                         self._bidx, self._indmap['__tau'])
+
+    def disable_memo(self):
+        with self._lock:
+            self._memo = None
+            self._solver = self._work
+
+    @property
+    def memo(self):
+        """ The `ProxMemo` holding cached solutions and the
+        `hits`, `misses` and `evictions` counters, or None if disabled.
+        """
+        return self._memo
 
     @staticmethod
     def default_settings():
@@ -102,8 +565,12 @@ class Prox(object):
             raise ValueError('Invalid settings dict. Compare with default_settings().')
             
     def update_settings(self, **settings):
+        memo = getattr(self, '_memo', None)
         for key in settings:
             if key in self.settings:
+                if (memo is not None and key in ('eps', 'max_iters') and
+                        settings[key] != self.settings[key]):
+                    memo.clear()
                 self.settings[key] = settings[key]
             else:
                 raise ValueError('Invalid settings key: {}'.format(key))
@@ -111,25 +578,204 @@ class Prox(object):
         self.check_settings()
 
 
-    def _do(self, x0=None, rho=1.0, **settings):
+    def _do(self, x0=None, rho=1.0, out=None, accuracy=None, **settings):
         """ Do the prox computation based on values in `x0`.
         `x0` can be None or an empty dict, in which case, it will prox
         on the 0 element of the appropriate size.
         """
+        start = perf_counter()
         self.update_settings(**settings)
+        settings = self._call_settings(accuracy)
 
         if not x0:
             x0 = self.zero_elem
+        rho = self._rho(rho)
 
-        x, scs_sol = do_prox_work(self._work, self._bc, self._indmap,
-                                  self._solmap, x0, rho,
-                                  warm_start=self._warm_start, **self.settings)
+        warm = self._warm_start is not None
+        x, scs_sol = self._solve(do_prox_work, self._solver, self._bc, self._indmap,
+                                 self._solmap, x0, rho, out=out,
+                                 shapes=self._shapes, times=self._times,
+                                 **settings)
 
-        self._warm_start = dict(x=scs_sol['x'], y=scs_sol['y'], s=scs_sol['s'])
+        self._save_solve(scs_sol)
+        self._record(start, warm)
+
+        self._check_status()
+
+        return x
 
-        if 'Solved' not in self.info['status']:
-            msg = 'Unexpected solver status: {}'.format(self.info['status'])
+    def _rho(self, rho):
+        """ `rho` as a float, or for a `diag_rho` prox, possibly as a flat vector.
+        """
+        if np.ndim(rho) == 0 and not isinstance(rho, dict):
+            return rho
+        if not self._diag:
+            raise ValueError('Per-coordinate rho needs a prox formed with diag_rho=True.')
+
+        n = len(self._bidx)
+        if isinstance(rho, dict):
+            missing = set(self._layout) - set(rho)
+            if missing:
+                raise ValueError('rho is missing variables: {}'.format(sorted(missing)))
+            r = np.empty(n)
+            for k, s in self._layout.items():
+                v = np.asarray(rho[k], dtype=np.float64)
+                r[s] = v.ravel(order='F') if v.ndim else v
+        else:
+            r = np.asarray(rho, dtype=np.float64).ravel(order='F')
+            if len(r) != n:
+                raise ValueError('Flat rho must have length {}.'.format(n))
+
+        if not np.all(r > 0):
+            raise ValueError('rho must be positive.')
+        return r
+
+    def _solve(self, do, *args, **kwargs):
+        """ Call `do_prox_work` or `do_prox_flat` with the warm-start
+        chosen by `self.warm_starter`, redoing extrapolated solves which fail.
+        """
+        starter = self.warm_starter
+        if starter.strategy == 'previous':
+            return do(*args, warm_start=self._warm_start, **kwargs)
+
+        res = do(*args, warm_start=self._guess_warm_start, **kwargs)
+        if starter.rejected(res[1]):
+            res = do(*args, warm_start=self._warm_start, **kwargs)
+        starter.update(res[1])
+
+        return res
+
+    def _guess_warm_start(self, bc):
+        return self.warm_starter.guess(bc, self._warm_start)
+
+    def _save_solve(self, scs_sol):
+        self._sol_info = scs_sol['info']
+
+        # reuse the warm-start dict; the arrays themselves belong to `scs_sol`
+        if self._warm_start is None:
+            self._warm_start = {}
+        for key in 'x', 'y', 's':
+            self._warm_start[key] = scs_sol[key]
+
+    def _record(self, start, warm):
+        info = self._sol_info
+        self.stats.record(self._times, perf_counter() - start,
+                          info['iter'], info['status'], warm)
+
+    def _check_status(self):
+        status = self._sol_info['status']
+        if not is_solved(status, self._inexact):
+            msg = 'Unexpected solver status: {}'.format(status)
             raise RuntimeError(msg)
             #print("Warning: {}".format(msg))
 
+    def do_flat(self, x0=None, rho=1.0, out=None, accuracy=None, **settings):
+        """ Do the prox computation with the input and output as flat vectors,
+        laid out as in `Prox.layout`.
+        This skips building and copying dicts, which matters for large problems.
+
+        `x0` can be None, in which case, it will prox on the 0 element.
+        If `out` is given, the solution is written into it.
+        `accuracy` is as in `Prox.do`.
+        """
+        with self._lock:
+            return self._do_flat(x0, rho, out, accuracy, **settings)
+
+    def _do_flat(self, x0=None, rho=1.0, out=None, accuracy=None, **settings):
+        start = perf_counter()
+        self.update_settings(**settings)
+        settings = self._call_settings(accuracy)
+
+        if x0 is None:
+            x0 = np.zeros(len(self._bidx))
+        rho = self._rho(rho)
+
+        warm = self._warm_start is not None
+        x, scs_sol = self._solve(do_prox_flat, self._solver, self._bc, self._indmap,
+                                 self._bidx, self._xidx, x0, rho,
+                                 out=out, buf=self._bbuf, times=self._times,
+                                 **settings)
+
+        self._save_solve(scs_sol)
+        self._record(start, warm)
+
+        self._check_status()
+
         return x
+
+    def do_batch(self, X0, rho=1.0, accuracy=None, **settings):
+        """ Evaluate the prox at many points, reusing the cached factorization.
+
+        Parameters
+        ----------
+        X0: 2D numpy array or list of dicts
+            Each row (or dict) is one prox input. Rows are flat vectors
+            laid out as in `Prox.layout`. `None` or empty dicts give the zero element.
+        rho: float or 1D array
+            A single rho for all points, or one per point.
+            For a `diag_rho` prox, also a dict as in `Prox.do` for all points,
+            or a 2D array of flat rho vectors: one row per point, or a single row.
+        accuracy: float
+            Optional SCS `eps` for these solves only, as in `Prox.do`.
+
+        Returns
+        -------
+        X: 2D numpy array
+            Stacked solutions, one row per point, laid out as in `Prox.layout`.
+        info: dict
+            Arrays 'iter', 'time', 'status' and 'accuracy', one entry per point,
+            and the 'restuff', 'solve' and 'extract' breakdown in seconds.
+
+        Notes
+        -----
+        Points are solved in order, each warm-started from the previous one,
+        or as chosen by the `Prox.set_warm_start` strategy.
+        Unlike a single prox call, a bad solver status does not raise;
+        check `info['status']`.
+        """
+        with self._lock:
+            return self._do_batch(X0, rho, accuracy, **settings)
+
+    def _do_batch(self, X0, rho=1.0, accuracy=None, **settings):
+        self.update_settings(**settings)
+        settings = self.settings if accuracy is None else dict(self.settings, eps=accuracy)
+
+        if isinstance(X0, np.ndarray):
+            X0 = np.atleast_2d(X0)
+        else:
+            x0s = list(X0)
+            X0 = np.zeros((len(x0s), flat_size(self._layout)))
+            for i, x0 in enumerate(x0s):
+                if x0:
+                    dict_to_flat(x0, self._layout, out=X0[i])
+
+        if X0.shape[1] != len(self._bidx):
+            raise ValueError('Rows of X0 must have length {}.'.format(len(self._bidx)))
+
+        N = X0.shape[0]
+        if isinstance(rho, dict):
+            rhos = np.broadcast_to(self._rho(rho), (N, len(self._bidx)))
+        elif np.ndim(rho) == 2:
+            rhos = np.array([self._rho(r) for r in rho])
+            rhos = np.broadcast_to(rhos, (N, len(self._bidx)))
+        else:
+            rhos = np.broadcast_to(np.asarray(rho, dtype=np.float64), (N,))
+
+        warm = self._warm_start is not None
+        X, info, scs_sol = do_prox_batch(self._solver, self._bc, self._indmap,
+                                         self._bidx, self._xidx, X0, rhos,
+                                         warm_start=self._warm_start,
+                                         starter=self.warm_starter, **settings)
+
+        if scs_sol is not None:
+            self._save_solve(scs_sol)
+
+        # points after the first are warm-started from the one before
+        times = self._times
+        for i in range(X0.shape[0]):
+            for k in 'restuff', 'solve', 'extract':
+                times[k] = info[k][i]
+            total = times['restuff'] + times['solve'] + times['extract']
+            self.stats.record(times, total, int(info['iter'][i]), info['status'][i], warm or i > 0)
+
+        return X, info
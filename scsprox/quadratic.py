@@ -0,0 +1,198 @@
+""" The prox term as a quadratic objective, for SCS 3 and later.
+
+The default prox problem adds `tau*||x - x0||^2` as an epigraph: a new variable,
+extra rows in `A` and a second-order cone for each prox variable.
+SCS 3 accepts a quadratic objective, `min 1/2 x'Px + c'x`, so the prox term can be just
+
+    P = diag(rho) on the prox coordinates,   c = c_0 - rho*x0 there,
+
+with `A`, `b` and the cones of the original problem left as they are.
+
+`QuadraticWorkspace` stands in for `cyscs.Workspace`, like `ClosedFormWorkspace`.
+It keeps `b` and `c` in the same layout the rest of `Prox` restuffs: `-2*x0` in
+extra entries at the end of `b`, and tau at the end of `c`. On each solve, it
+forms the real `b` and `c` from them.
+
+Changing `b` and `c` is a cheap `SCS.update`. `P` can't be updated in place,
+so a new rho means a new SCS solver, and a new factorization.
+Solvers are cached for the most recent few rho values (and tolerance settings),
+so ADMM with a fixed rho, or a few alternating values, factors only once per value.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+
+# SCS 3 status values
+_status = {1: 'Solved', 2: 'Solved/Inaccurate', -1: 'Unbounded', -2: 'Infeasible',
+           -6: 'Unbounded/Inaccurate', -7: 'Infeasible/Inaccurate'}
+
+
+def _cone(dims):
+    """ SCS 3 cone dict from SCS 1/2 dims: the zero cone 'f' is now 'z'.
+    """
+    cone = {('z' if k == 'f' else k): v for k, v in dims.items() if v}
+    return cone
+
+def _info(info):
+    """ SCS 3 info, with the SCS 1/2 keys the rest of `Prox` reads.
+    """
+    gap = info.get('gap', np.nan)
+    scale = 1.0 + abs(info.get('pobj', 0.0)) + abs(info.get('dobj', 0.0))
+    return dict(info,
+                iter=info['iter'],
+                status=_status.get(info['status_val'], 'Failure'),
+                statusVal=info['status_val'],
+                setupTime=info.get('setup_time', 0.0),
+                solveTime=info.get('solve_time', 0.0),
+                resPri=info.get('res_pri', np.nan),
+                resDual=info.get('res_dual', np.nan),
+                relGap=gap/scale)
+
+
+class QuadraticWorkspace(object):
+    """ Stands in for `cyscs.Workspace`, solving the prox with a quadratic
+    objective in SCS 3.
+
+    Parameters
+    ----------
+    A, dims:
+        SCS data of the original problem, without any prox term.
+    b, c: 1D arrays
+        The layout restuffed by `Prox`, from `quadratic_prox`.
+    xidx: 1D int array
+        The prox coordinates of `x`, in flat layout order.
+    settings:
+        `Prox` settings; `eps` sets both SCS 3 tolerances.
+    """
+
+    backend = 'scs'
+    prox_term = 'quadratic'
+    max_solvers = 8
+
+    def __init__(self, A, b, c, dims, xidx, **settings):
+        import scs
+        if not hasattr(scs, 'SCS'):
+            raise ImportError('The quadratic prox term needs SCS 3 or later.')
+        self._scs = scs
+
+        self.A = sp.csc_matrix(A)
+        self.m, self.n = self.A.shape
+        self.cone = _cone(dims)
+        self.xidx = xidx
+        self.data = dict(b=b, c=c)
+        self.settings = dict(settings)
+
+        self._c = np.empty(self.n)
+        self._solvers = OrderedDict()
+        self._info = dict(iter=0, status='Unsolved', statusVal=0, setupTime=0.0, solveTime=0.0)
+
+    @property
+    def info(self):
+        return dict(self._info)
+
+    def _options(self, settings):
+        settings = dict(self.settings, **settings)
+        opts = dict(verbose=bool(settings.get('verbose', False)),
+                    max_iters=int(settings.get('max_iters', 100)))
+        if 'eps' in settings:
+            opts.update(eps_abs=settings['eps'], eps_rel=settings['eps'])
+        return opts
+
+    def _solver(self, rho, b, c, opts):
+        """ The cached SCS solver for `rho` and `opts`, updated to `b` and `c`,
+        or a new one.
+        """
+        key = (np.asarray(rho, dtype=np.float64).tobytes(), tuple(sorted(opts.items())))
+        solver = self._solvers.get(key)
+        if solver is not None:
+            self._solvers.move_to_end(key)
+            solver.update(b=b, c=c)
+            return solver
+
+        diag = np.broadcast_to(rho, (len(self.xidx),))
+        P = sp.csc_matrix((diag, (self.xidx, self.xidx)), shape=(self.n, self.n))
+        data = dict(P=P, A=self.A, b=b.copy(), c=c.copy())
+        solver = self._scs.SCS(data, self.cone, **opts)
+
+        if len(self._solvers) >= self.max_solvers:
+            self._solvers.popitem(last=False)
+        self._solvers[key] = solver
+        return solver
+
+    def solve(self, new_bc=None, warm_start=None, **settings):
+        """ Same signature as `cyscs.Workspace.solve`.
+        """
+        if new_bc is not None:
+            self.data.update(new_bc)
+        bv, cv = self.data['b'], self.data['c']
+
+        b = bv[:self.m]
+        rho = 2*cv[self.n:]
+        if len(rho) == 1:
+            rho = rho[0]
+        # -rho*x0, with -2*x0 in the end of b
+        c = self._c
+        c[:] = cv[:self.n]
+        c[self.xidx] += 0.5*rho*bv[self.m:]
+
+        solver = self._solver(rho, b, c, self._options(settings))
+        if warm_start is None:
+            sol = solver.solve(warm_start=False)
+        else:
+            sol = solver.solve(warm_start=True, x=warm_start['x'], y=warm_start['y'],
+                               s=warm_start['s'])
+
+        self._info = _info(sol['info'])
+        return dict(x=sol['x'], y=sol['y'], s=sol['s'], info=self.info)
+
+
+def quadratic_prox(data, var_slices, diag=False, **settings):
+    """ Like `conic_prox`, but with the prox term as a quadratic objective.
+
+    Parameters
+    ----------
+    data: dict
+        SCS data `A`, `b`, `c` and `dims` of the original problem.
+    var_slices: dict
+        Maps prox variable names to the `slice` (or `(start, stop)` pair)
+        of `x` they occupy.
+    diag: bool
+        A separate rho for each coordinate.
+
+    Returns
+    -------
+    work, data, indmap, solmap
+        As from `closed_form_prox`. `data['b']` and `data['c']` have the
+        restuffed layout, with x0 and tau entries after those of the problem.
+    """
+    A = sp.csc_matrix(data['A'])
+    m, n = A.shape
+    solmap = {}
+    for k, s in var_slices.items():
+        if not isinstance(s, slice):
+            s = slice(*s)
+        solmap[k] = slice(int(s.start), int(s.stop))
+
+    indmap = {}
+    xidx = []
+    start = m
+    for k in sorted(solmap):
+        s = solmap[k]
+        indmap[k] = slice(start, start + s.stop - s.start)
+        start += s.stop - s.start
+        xidx.append(np.arange(s.start, s.stop))
+    xidx = np.concatenate(xidx).astype(np.int64)
+    N = len(xidx)
+
+    b = np.concatenate([np.asarray(data['b'], dtype=np.float64), np.zeros(N)])
+    ntau = N if diag else 1
+    c = np.concatenate([np.asarray(data['c'], dtype=np.float64), np.zeros(ntau)])
+    indmap['__tau'] = np.arange(n, n + ntau)
+    if diag:
+        indmap['__diag'] = True
+
+    work = QuadraticWorkspace(A, b, c, data['dims'], xidx, **settings)
+    data = dict(A=A, b=b, c=c, dims=data['dims'])
+
+    return work, data, indmap, solmap
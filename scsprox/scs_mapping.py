@@ -1,8 +1,13 @@
-import cvxpy as cvx
 import numpy as np
+import scipy.sparse as sp
+from collections import OrderedDict
+
+# CVXPY is imported inside the functions which build CVXPY objects, so that
+# evaluating already-stuffed proxes never imports it
 
 
 def copy_prob(prob):
+    import cvxpy as cvx
     return cvx.Problem(prob.objective, prob.constraints)
 
 def get_scs_data(prob):
@@ -40,6 +45,8 @@ def form_prox(prob, x_vars):
         x0_vars also contains special key '__tau', which corresponds to the regularization parameter
     """
 
+    import cvxpy as cvx
+
     tau = cvx.Parameter(sign="positive")    
     x0_vars = {'__tau':tau}
 
@@ -74,6 +81,32 @@ def rand_param_vals(x0_vars):
             x.value = np.random.randn(*s)
             
             
+def probe_param_vals(x0_vars, probe=True):
+    """ Set the x0 prox input parameters to deterministic values,
+    used to locate the parameters in the SCS stuffing.
+
+    With `probe=False`, sets the baseline: tau to 1 and all x0 entries to 0.
+    With `probe=True`, sets tau to 2 and numbers the x0 entries 1, 2, 3, ...
+    consecutively across the variables (sorted by name, column-major within a variable).
+
+    Modifies the x0_vars in place!
+    """
+    count = 0
+    for k in sorted(x0_vars):
+        x = x0_vars[k]
+
+        if k == '__tau':
+            x.value = 2.0 if probe else 1.0
+        else:
+            n = x.size[0]*x.size[1]
+            if probe:
+                vals = np.arange(count+1, count+n+1, dtype=np.float64)
+            else:
+                vals = np.zeros(n)
+            x.value = vals.reshape(x.size, order='F')
+            count += n
+
+
 def param_map(pxprob, x0_vars):
     """
     get the location for taus and x0 parameter input
@@ -94,51 +127,250 @@ def param_map(pxprob, x0_vars):
     Notes
     -----
     xs get multiplied by -2.
-    expect '__tau' to be an array of random locations to c
-    expect the other elements to be slice objects of continuous chunks
+    '__tau' maps to an array of locations in c
+    the other elements map to slice objects of continuous chunks of b
+
+    b and c are affine in the parameters, so we stuff once with baseline values
+    and once with the deterministic values from `probe_param_vals`.
+    Only the entries which depend on the parameters change, and the
+    changed b entries are -2 times the (unique) entry numbers, which
+    identifies each of them exactly. CVXPY caches the stuffed matrices,
+    so the second pass only re-evaluates the parameters.
     """
-    # set the x0 parameters to random values, and then find those random values in the vectors
-    rand_param_vals(x0_vars)
-    
+    probe_param_vals(x0_vars, probe=False)
+    data0 = get_scs_data(pxprob)
+    b0, c0, A0 = data0['b'].copy(), data0['c'].copy(), data0['A'].copy()
+
+    probe_param_vals(x0_vars, probe=True)
     data = get_scs_data(pxprob)
-    
+
+    if (data['A'] != A0).nnz != 0:
+        raise ValueError('The prox parameters should not appear in the A matrix.')
+
     # tau may be mapped to multiple locations in the c vector
-    taus, = np.where(data['c']==x0_vars['__tau'].value) 
-    
+    taus = np.flatnonzero(data['c'] != c0)
+
     indmap = {'__tau':taus}
-    
-    b = data['b']
-    for k in x0_vars:
+
+    rows = np.flatnonzero(data['b'] != b0)
+    ids = (data['b'][rows] - b0[rows])/-2.0
+    order = np.argsort(ids)
+    rows, ids = rows[order], ids[order]
+
+    count = 0
+    for k in sorted(x0_vars):
         if k != '__tau':
-            # because x.value sometimes returns a float, and sometimes returns a 2d np.Matrix...
-            # this cleans it all up to be a 1d array in either case
-            x = np.atleast_1d(np.squeeze(np.array(x0_vars[k].value)))
-            ind, = np.where(b==-2*x[0])
-            ind = ind[0]
-            
-            indmap[k] = slice(ind,ind+len(x))
+            x = x0_vars[k]
+            n = x.size[0]*x.size[1]
+            expected = np.arange(count+1, count+n+1)
+
+            sel = (ids > count) & (ids < count+n+1)
+            ind = rows[sel]
+            if not (len(ind) == n and np.array_equal(ids[sel], expected) and
+                    np.array_equal(ind, np.arange(ind[0], ind[0]+n))):
+                msg = 'Could not map prox input {} to a contiguous chunk of b.'
+                raise ValueError(msg.format(k))
+
+            indmap[k] = slice(int(ind[0]), int(ind[0])+n)
+            count += n
     
     return data, indmap
 
 
-def restuff(data, indmap, x0_vals):
+def restuff(data, indmap, x0_vals, tau=None):
     """ Modify the b,c data in `data` to reflect the x0 prox values
     in x0_vals (which should be appropriately sized numpy arrays or scalars).
     
     indmap is the mapping from variable names to b,c indices
+
+    tau is taken from x0_vals['__tau'] unless given explicitly,
+    which lets callers avoid copying x0_vals just to add it.
     
     Notes
     -----
     tau maps to tau in c, but x maps to -2*x in b.
+    b is written in place, without temporary arrays.
     """
-    
+    if tau is None:
+        tau = x0_vals['__tau']
+
     c = data['c']
-    c[indmap['__tau']] = x0_vals['__tau']
+    c[indmap['__tau']] = tau
     
     b = data['b']
     for k in x0_vals:
         if k != '__tau':
-            b[indmap[k]] = -2*x0_vals[k]
+            x = x0_vals[k]
+            target = b[indmap[k]]
+            if np.ndim(x) > 1:
+                # matrix variables are stuffed in column-major order;
+                # write through a Fortran-ordered view of b, without copying x
+                target = target.reshape(np.shape(x), order='F')
+            np.multiply(x, -2.0, out=target)
+
+def restuff_flat(data, indmap, bidx, bx, tau):
+    """ Like `restuff`, but with the prox input given as one flat vector.
+
+    `bidx` gives the b indices of the flat layout, and `bx` holds the values
+    to scatter there, i.e., `-2*x` for flat prox input `x`.
+    """
+    data['c'][indmap['__tau']] = tau
+    data['b'][bidx] = bx
+
+def problem_params(prob):
+    """ The CVXPY Parameters in `prob`, keyed by their names.
+    """
+    params = {}
+    for p in prob.parameters():
+        k = p.name()
+        if k in params and params[k] is not p:
+            raise ValueError('Parameter name {} is used more than once.'.format(k))
+        params[k] = p
+    return params
+
+def _set_param(param, v):
+    param.value = np.asarray(v, dtype=np.float64).reshape(param.size, order='F')
+
+def _coeffs_from_probes(d1, d2, n):
+    """ Sparse coefficients `M` (rows of b or c by parameter entries) from the
+    changes `d1` and `d2` when the parameter entries are set to `j+1` and `(j+1)**2`.
+
+    If each changed row depends on one entry `j`, with coefficient `a`,
+    then `d1 = a*(j+1)` and `d2 = a*(j+1)**2`, which identifies both.
+    Returns None if any row doesn't fit that pattern.
+    """
+    rows = np.flatnonzero(d1)
+    if np.any(d2[d1 == 0] != 0):
+        return None
+
+    ratio = d2[rows]/d1[rows]
+    ids = np.round(ratio)
+    if not (np.allclose(ratio, ids, rtol=0, atol=1e-6) and
+            np.all(ids >= 1) and np.all(ids <= n)):
+        return None
+
+    cols = ids.astype(np.int64) - 1
+    vals = d1[rows]/ids
+    return sp.csc_matrix((vals, (rows, cols)), shape=(len(d1), n))
+
+def param_coeffs(pxprob, param, A0):
+    """ Coefficients of `param` in b and c, as sparse matrices `(B, C)`
+    with `b = b_0 + B*vec(param)` and `c = c_0 + C*vec(param)`.
+
+    Tries two numbered probes first, which suffices when each entry of
+    b and c depends on at most one entry of the parameter, and falls
+    back to one probe per parameter entry. The result is checked
+    against a random probe.
+    Leaves `param` at zero.
+    """
+    n = param.size[0]*param.size[1]
+    # probe with nonpositive values for nonpositive parameters
+    sgn = -1.0 if param.is_negative() and not param.is_positive() else 1.0
+
+    def stuff(v):
+        _set_param(param, sgn*v)
+        data = get_scs_data(pxprob)
+        if data['A'].shape != A0.shape or (data['A'] != A0).nnz != 0:
+            msg = 'Parameter {} appears in the A matrix, so it can not be restuffed.'
+            raise ValueError(msg.format(param.name()))
+        return data['b'].copy(), data['c'].copy()
+
+    b0, c0 = stuff(np.zeros(n))
+    j = np.arange(1.0, n+1)
+    b1, c1 = stuff(j)
+    b2, c2 = stuff(j**2)
+
+    B = _coeffs_from_probes(b1 - b0, b2 - b0, n)
+    C = _coeffs_from_probes(c1 - c0, c2 - c0, n)
+
+    v = np.random.RandomState(0).rand(n) + 0.5
+    b3, c3 = stuff(v)
+
+    def fits(B, C):
+        return (B is not None and C is not None and
+                np.allclose(b3 - b0, B.dot(v), rtol=1e-9, atol=1e-12) and
+                np.allclose(c3 - c0, C.dot(v), rtol=1e-9, atol=1e-12))
+
+    if not fits(B, C):
+        Bcols, Ccols = [], []
+        for i in range(n):
+            e = np.zeros(n)
+            e[i] = 1.0
+            bi, ci = stuff(e)
+            Bcols.append(sp.csc_matrix((bi - b0)[:, None]))
+            Ccols.append(sp.csc_matrix((ci - c0)[:, None]))
+        B, C = sp.hstack(Bcols).tocsc(), sp.hstack(Ccols).tocsc()
+
+        if not fits(B, C):
+            msg = 'Parameter {} does not enter b and c affinely.'
+            raise ValueError(msg.format(param.name()))
+
+    _set_param(param, np.zeros(n))
+
+    return sgn*B, sgn*C
+
+def extra_param_map(pxprob, params):
+    """ Map CVXPY Parameters (other than the prox inputs) to the b and c
+    entries they affect, so they can be restuffed like x0 and tau.
+
+    Parameters
+    ----------
+    pxprob: CVXPY prox problem
+    params: dict
+        Parameters keyed by name, each with a value.
+
+    Returns
+    -------
+    data: dict
+        SCS data stuffed at the current parameter values
+    pmap: dict
+        'slices' and 'shapes' of the parameters in the vector 'values',
+        and the affected entries 'brows' and 'crows' of b and c, which are
+        `bbase + B*values` and `cbase + C*values`. See `restuff_params`.
+    """
+    names = sorted(params)
+    orig = {}
+    for k in names:
+        if params[k].value is None:
+            raise ValueError('Parameter {} needs a value before forming the prox.'.format(k))
+        orig[k] = np.array(params[k].value, dtype=np.float64)
+
+    A0 = get_scs_data(pxprob)['A'].copy()
+
+    slices, Bs, Cs = {}, [], []
+    start = 0
+    for k in names:
+        B, C = param_coeffs(pxprob, params[k], A0)
+        Bs.append(B)
+        Cs.append(C)
+        slices[k] = slice(start, start + B.shape[1])
+        start += B.shape[1]
+
+    for k in names:
+        params[k].value = orig[k]
+    data = get_scs_data(pxprob)
+
+    values = np.concatenate([orig[k].ravel(order='F') for k in names])
+    B = sp.hstack(Bs).tocsr()
+    C = sp.hstack(Cs).tocsr()
+    brows = np.flatnonzero(B.getnnz(axis=1)).astype(np.int64)
+    crows = np.flatnonzero(C.getnnz(axis=1)).astype(np.int64)
+    B, C = B[brows], C[crows]
+
+    pmap = dict(slices=slices,
+                shapes=var_shapes(params),
+                values=values,
+                brows=brows, B=B, bbase=data['b'][brows] - B.dot(values),
+                crows=crows, C=C, cbase=data['c'][crows] - C.dot(values))
+
+    return data, pmap
+
+def restuff_params(data, pmap):
+    """ Write the parameter values `pmap['values']` into b and c, in place.
+    """
+    b, c = data['b'], data['c']
+    b[pmap['brows']] = pmap['bbase'] + pmap['B'].dot(pmap['values'])
+    c[pmap['crows']] = pmap['cbase'] + pmap['C'].dot(pmap['values'])
 
 def dummy_scs_output(data):
     """ `data` is a dict of SCS input data
@@ -175,31 +407,162 @@ def get_solmap(prob, x_vars, data=None):
     -------
     dict
         elements are Python `slice` objects.
+
+    Notes
+    -----
+    Reads the variable offsets into the SCS `x` vector from the symbolic data
+    CVXPY keeps after stuffing the problem for SCS.
     """
     if data is None:
         data = get_scs_data(prob)
-    
-    out = dummy_scs_output(data)
 
-    prob.unpack_results('SCS', out)
-    
+    var_offsets = prob._cached_data['SCS'].sym_data.var_offsets
+
     solmap = {}
     for k in x_vars:
-        x = np.atleast_1d(np.squeeze(np.array(x_vars[k].value)))
-        ind, = np.where(x[0]==out['x'])
-        ind = ind[0]
-        solmap[k] = slice(ind,ind+len(x))
+        x = x_vars[k]
+        if x.id not in var_offsets:
+            raise ValueError('Variable {} does not appear in the problem.'.format(k))
+        ind = int(var_offsets[x.id])
+        solmap[k] = slice(ind, ind + x.size[0]*x.size[1])
         
     return solmap
 
-def extract_sol(scs_x, solmap):
+def extract_sol(scs_x, solmap, out=None, shapes=None):
     """ Extract a solution from the SCS output variable `x`.
     solmap is a dict mapping variable names to indices (slices) of x.
+    shapes optionally maps variable names to their shapes (see `var_shapes`);
+    matrices are returned as Fortran-ordered views.
+
+    If `out` is given, array values are copied into the arrays of the dict `out`,
+    and scalar values replace the entries of `out`. A ValueError is raised
+    if `out` is missing a variable, or its array doesn't fit the variable.
+    Otherwise, the returned arrays are views into `scs_x`.
     """
+    if out is not None:
+        for k in solmap:
+            s = solmap[k]
+            if k not in out:
+                raise ValueError('out is missing variable {}.'.format(k))
+            v = out[k]
+            size = s.stop - s.start
+            if np.ndim(v) == 0:
+                if size != 1:
+                    raise ValueError('out[{!r}] is a scalar, but the variable has {} '
+                                     'entries.'.format(k, size))
+                out[k] = scs_x[s.start]
+                continue
+
+            shape = tuple(shapes[k]) if shapes is not None and shapes[k] != () else (size,)
+            if np.size(v) != size or (len(shape) > 1 and np.shape(v) != shape):
+                raise ValueError('out[{!r}] has shape {}, not {}.'.format(k, np.shape(v), shape))
+            v[...] = _shaped(scs_x[s], shapes, k)
+        return out
+
     x_vals = {}
     for k in solmap:
-        x_vals[k] = scs_x[solmap[k]]
+        x_vals[k] = _shaped(scs_x[solmap[k]], shapes, k)
         if len(x_vals[k]) == 1:
             x_vals[k] = x_vals[k][0]
         
     return x_vals
+
+def _shaped(x, shapes, k):
+    """ View of the 1D array `x` with the shape of variable `k`, if it's a matrix.
+    """
+    if shapes is not None and len(shapes[k]) > 1:
+        return x.reshape(shapes[k], order='F')
+    return x
+
+def var_shapes(x_vars):
+    """ Shapes of the prox variables as seen by the user:
+    `()` for scalars, `(n,)` for vectors and `(m, n)` for matrices.
+
+    Row and column vectors are both 1D.
+    Matrices are stuffed in column-major (Fortran) order.
+    """
+    shapes = {}
+    for k in x_vars:
+        m, n = x_vars[k].size
+        if m == 1 and n == 1:
+            shapes[k] = ()
+        elif m == 1 or n == 1:
+            shapes[k] = (m*n,)
+        else:
+            shapes[k] = (m, n)
+
+    return shapes
+
+def default_shapes(solmap):
+    """ Shapes for 1D variables, as implied by the slices of `solmap`.
+    """
+    shapes = {}
+    for k in solmap:
+        length = solmap[k].stop - solmap[k].start
+        shapes[k] = () if length == 1 else (length,)
+
+    return shapes
+
+def flat_layout(solmap):
+    """ Lay out the prox variables, sorted by name, in one contiguous vector.
+
+    Parameters
+    ----------
+    solmap: dict
+        mapping of variable names to slices of the SCS `x` vector
+
+    Returns
+    -------
+    OrderedDict
+        mapping of variable names to slices of the flat vector
+    """
+    layout = OrderedDict()
+    start = 0
+    for k in sorted(solmap):
+        s = solmap[k]
+        length = s.stop - s.start
+        layout[k] = slice(start, start+length)
+        start += length
+
+    return layout
+
+def flat_index(mapping, layout):
+    """ Concatenate the indices in `mapping` (a dict of slices, like indmap or solmap)
+    in the order given by `layout`, so that `v[flat_index(mapping, layout)]`
+    gathers a flat vector from `v`.
+    """
+    inds = [np.arange(mapping[k].start, mapping[k].stop) for k in layout]
+    return np.concatenate(inds).astype(np.int64)
+
+def flat_size(layout):
+    """ Length of a flat vector with the given layout.
+    """
+    if not layout:
+        return 0
+    return max(s.stop for s in layout.values())
+
+def dict_to_flat(x_vals, layout, out=None):
+    """ Write the values of dict `x_vals` into one flat vector with the given layout.
+    Matrices are flattened in column-major order.
+    """
+    if out is None:
+        out = np.empty(flat_size(layout))
+    for k in layout:
+        x = x_vals[k]
+        if np.ndim(x) > 1:
+            out[layout[k]].reshape(np.shape(x), order='F')[...] = x
+        else:
+            out[layout[k]] = x
+
+    return out
+
+def flat_to_dict(x, layout, shapes=None):
+    """ Split a flat vector into a dict of variables, like `extract_sol`.
+    """
+    x_vals = {}
+    for k in layout:
+        x_vals[k] = _shaped(x[layout[k]], shapes, k)
+        if len(x_vals[k]) == 1:
+            x_vals[k] = x_vals[k][0]
+
+    return x_vals
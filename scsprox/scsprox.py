@@ -1,31 +1,90 @@
-import scs
+from time import perf_counter
+
 import numpy as np
 
-from .scs_mapping import get_solmap, extract_sol, form_prox, rand_param_vals, param_map, restuff
-from .examples import example, example2, example3
+from .scs_mapping import (get_solmap, extract_sol, form_prox, rand_param_vals, param_map,
+                          restuff, restuff_flat, problem_params, extra_param_map,
+                          get_scs_data)
+from .conic import conic_prox
+from .quadratic import quadratic_prox
+from .inexact import accuracy
 
 
 """
-Note: only works with x_vars pointing to scalars or vectors,
-but not matrices
+Note: x_vars can point to scalars, vectors or matrices.
+Matrix variables are stuffed in column-major (Fortran) order.
 
 """
 
-def stuffed_prox(prob, x_vars):
+def stuffed_prox(prob, x_vars, with_params=False, diag=False):
+    """ Stuff the prox problem of `prob`, and map the prox inputs into the SCS data.
+
+    With `with_params=True`, also maps the other CVXPY Parameters in `prob`
+    (see `extra_param_map`), and returns their map as a fourth value,
+    which is None if there are none.
+
+    With `diag=True`, each coordinate gets its own tau. CVXPY only stuffs `prob`
+    itself, and the prox term is added at the conic level by `conic_prox`.
+    """
+    if diag:
+        return _stuffed_diag_prox(prob, x_vars, with_params)
+
     pxprob, x0_vars = form_prox(prob, x_vars)
 
     data, indmap = param_map(pxprob, x0_vars)
+
+    pmap = None
+    if with_params:
+        params = problem_params(prob)
+        if params:
+            data, pmap = extra_param_map(pxprob, params)
+
     solmap = get_solmap(pxprob, x_vars, data=data)
-    
+
+    if with_params:
+        return data, indmap, solmap, pmap
     return data, indmap, solmap
 
+def _stuffed_problem(prob, with_params=False):
+    """ SCS data of `prob` itself, without a prox term, and the map of its
+    other Parameters (or None).
+    """
+    params = problem_params(prob) if with_params else {}
+    if params:
+        return extra_param_map(prob, params)
+    return get_scs_data(prob), None
+
+def _stuffed_diag_prox(prob, x_vars, with_params=False):
+    data, pmap = _stuffed_problem(prob, with_params)
+
+    var_slices = get_solmap(prob, x_vars, data=data)
+    data, indmap, solmap = conic_prox(data['A'], data['b'], data['c'], data['dims'],
+                                      var_slices, diag=True, pmap=pmap)
+
+    if with_params:
+        return data, indmap, solmap, pmap
+    return data, indmap, solmap
+
+def stuffed_quadratic_prox(prob, x_vars, with_params=False, diag=False, **settings):
+    """ Like `stuffed_prox`, but with the prox term as a quadratic objective
+    for SCS 3, instead of a second-order cone epigraph; see `scsprox.quadratic`.
+
+    Returns the `QuadraticWorkspace` first, then the values `stuffed_prox` would.
+    `settings` are the `Prox` settings for the workspace.
+    """
+    data, pmap = _stuffed_problem(prob, with_params)
+
+    var_slices = get_solmap(prob, x_vars, data=data)
+    work, data, indmap, solmap = quadratic_prox(data, var_slices, diag=diag, **settings)
+
+    if with_params:
+        return work, data, indmap, solmap, pmap
+    return work, data, indmap, solmap
+
 def do_prox(data, indmap, solmap, x0_vals, rho):    
-    # don't modify original dict
-    x0_vals = dict(x0_vals)
-    # set tau in x0_vals
-    x0_vals['__tau'] = rho/2.0
-    
-    restuff(data, indmap, x0_vals)
+    import scs
+
+    restuff(data, indmap, x0_vals, tau=rho/2.0)
     
     out = scs.solve(data, data['dims'], verbose=False)
     scs_x = out['x']
@@ -34,18 +93,120 @@ def do_prox(data, indmap, solmap, x0_vals, rho):
     
     return x_vals
 
-def do_prox_work(work, bc, indmap, solmap, x0_vals, rho, warm_start=None, **settings):
-    # don't modify original dict
-    x0_vals = dict(x0_vals)
-    # set tau in x0_vals
-    x0_vals['__tau'] = rho/2.0
-    
+def _record_times(times, t0, t1, t2, t3):
+    if times is not None:
+        times['restuff'] = t1 - t0
+        times['solve'] = t2 - t1
+        times['extract'] = t3 - t2
+
+def do_prox_work(work, bc, indmap, solmap, x0_vals, rho, warm_start=None, out=None,
+                 shapes=None, times=None, **settings):
+    """ If `times` is a dict, the 'restuff', 'solve' and 'extract'
+    times in seconds are written into it.
+    `warm_start` may be a function, called with the restuffed `bc`,
+    which returns the warm-start.
+    """
+    t0 = perf_counter()
     # modifies bc
-    restuff(bc, indmap, x0_vals)
+    restuff(bc, indmap, x0_vals, tau=rho/2.0)
+    t1 = perf_counter()
+    if callable(warm_start):
+        warm_start = warm_start(bc)
     
     scs_sol = work.solve(new_bc=bc, warm_start=warm_start, **settings)
     scs_x = scs_sol['x']
+    t2 = perf_counter()
     
-    x_vals = extract_sol(scs_x, solmap)
+    x_vals = extract_sol(scs_x, solmap, out=out, shapes=shapes)
+    _record_times(times, t0, t1, t2, perf_counter())
     
-    return x_vals, scs_sol
\ No newline at end of file
+    return x_vals, scs_sol
+
+def do_prox_flat(work, bc, indmap, bidx, xidx, x0, rho, warm_start=None,
+                 out=None, buf=None, times=None, **settings):
+    """ Like `do_prox_work`, but the prox input `x0` and the returned solution
+    are flat vectors. `bidx` and `xidx` gather the flat layout from the b vector
+    and the SCS x vector.
+
+    The solution is written into `out` if given, and `buf` is used as
+    scratch space for `-2*x0`, so that no temporary arrays are allocated.
+    """
+    t0 = perf_counter()
+    bx = np.multiply(x0, -2.0, out=buf)
+
+    # modifies bc
+    restuff_flat(bc, indmap, bidx, bx, rho/2.0)
+    t1 = perf_counter()
+    if callable(warm_start):
+        warm_start = warm_start(bc)
+
+    scs_sol = work.solve(new_bc=bc, warm_start=warm_start, **settings)
+    t2 = perf_counter()
+
+    x = np.take(scs_sol['x'], xidx, out=out)
+    _record_times(times, t0, t1, t2, perf_counter())
+
+    return x, scs_sol
+
+def do_prox_batch(work, bc, indmap, bidx, xidx, X0, rhos, warm_start=None, starter=None,
+                  **settings):
+    """ Evaluate the prox at each row of the 2D array `X0`, reusing `work`.
+
+    `bidx` and `xidx` gather the flat layout of the prox variables
+    from the b vector and the SCS x vector. Each solve is warm-started
+    from the previous one, or, with a `WarmStarter` as `starter`, as it chooses;
+    failed extrapolated solves are redone from the previous one.
+
+    Returns
+    -------
+    X: 2D numpy array
+        row i is the prox at row i of `X0` with `rhos[i]`
+    info: dict
+        per-point 'iter', 'time', 'status' and 'accuracy' arrays, and the
+        'restuff', 'solve' and 'extract' times (from `perf_counter`)
+    scs_sol: dict
+        SCS solution for the last point
+    """
+    N = X0.shape[0]
+    X = np.empty((N, len(xidx)))
+    info = dict(iter=np.zeros(N, dtype=np.int64),
+                time=np.zeros(N),
+                status=np.empty(N, dtype=object),
+                accuracy=np.full(N, np.nan),
+                restuff=np.zeros(N),
+                solve=np.zeros(N),
+                extract=np.zeros(N))
+
+    # x maps to -2*x in b; scale the whole batch at once
+    B = -2.0*X0
+    taus = 0.5*np.asarray(rhos, dtype=np.float64)
+
+    scs_sol = None
+    for i in range(N):
+        t0 = perf_counter()
+        restuff_flat(bc, indmap, bidx, B[i], taus[i])
+        t1 = perf_counter()
+
+        if starter is None or starter.strategy == 'previous':
+            scs_sol = work.solve(new_bc=bc, warm_start=warm_start, **settings)
+        else:
+            guess = starter.guess(bc, warm_start)
+            scs_sol = work.solve(new_bc=bc, warm_start=guess, **settings)
+            if starter.rejected(scs_sol):
+                scs_sol = work.solve(new_bc=bc, warm_start=warm_start, **settings)
+            starter.update(scs_sol)
+        warm_start = scs_sol
+        t2 = perf_counter()
+
+        np.take(scs_sol['x'], xidx, out=X[i])
+        info['restuff'][i] = t1 - t0
+        info['solve'][i] = t2 - t1
+        info['extract'][i] = perf_counter() - t2
+        info['iter'][i] = scs_sol['info']['iter']
+        info['time'][i] = scs_sol['info']['solveTime']*1e-3
+        info['status'][i] = scs_sol['info']['status']
+        acc = accuracy(scs_sol['info'])
+        if acc is not None:
+            info['accuracy'][i] = acc
+
+    return X, info, scs_sol
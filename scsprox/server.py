@@ -0,0 +1,437 @@
+""" Serving pre-built Prox operators over a local socket.
+
+`ProxServer` hosts named `Prox` objects and answers requests over a Unix
+socket (given a path) or TCP (given a `(host, port)` pair). Each client
+connection is a session, with its own copy of the `b` and `c` vectors and
+its own warm-start for each operator. All sessions of an operator share one
+CySCS workspace, so the factorization is done once per operator, not once
+per client; solves on it are serialized.
+
+`ProxClient` connects to one operator and has the same call signature as `Prox`.
+
+Wire format
+-----------
+All integers and floats are little-endian. A request is the header
+
+    request id (uint32), op (uint8), name length (uint16),
+    payload bytes (uint32), rho (float64)
+
+followed by the operator name in UTF-8 and the payload: for a prox
+evaluation, `x0` as raw float64s laid out as in `Prox.layout`,
+or nothing for the zero element. A response is the header
+
+    request id (uint32), kind (uint8), payload bytes (uint32),
+    iterations (int32), solve time in seconds (float64)
+
+followed by the solution as raw float64s, a JSON object, or an error message.
+A connection's requests are answered in order, so clients may send many
+requests before reading the responses.
+
+Run a server from the command line with saved proxes (see `Prox.save`):
+
+    python -m scsprox.server --unix /tmp/prox.sock lasso=path/to/lasso
+    python -m scsprox.server --tcp 127.0.0.1:5000 lasso=path/to/lasso
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+from collections import deque
+
+import numpy as np
+
+from .prox_obj import Prox
+from .quadratic import QuadraticWorkspace
+from .scs_mapping import dict_to_flat, flat_to_dict, flat_size
+
+_request = struct.Struct('<IBHId')
+_response = struct.Struct('<IBIid')
+
+# request ops
+_DO, _META, _RESET, _INFO = 0, 1, 2, 3
+# response kinds
+_FLOATS, _ERROR, _JSON = 0, 1, 2
+
+_float = np.dtype('<f8')
+
+
+class ProxServerError(RuntimeError):
+    """ An error raised on the server while handling a request.
+    """
+
+
+def _recv_into(sock, buf):
+    view = memoryview(buf).cast('B')
+    while len(view):
+        n = sock.recv_into(view)
+        if n == 0:
+            raise ConnectionError('Connection closed mid-message.')
+        view = view[n:]
+
+def _recv_exact(sock, n, eof_ok=False):
+    """ `n` bytes from `sock`, or None if `eof_ok` and the peer closed
+    the connection before sending any.
+    """
+    buf = bytearray(n)
+    view = memoryview(buf)
+    while len(view):
+        k = sock.recv_into(view)
+        if k == 0:
+            if eof_ok and len(view) == n:
+                return None
+            raise ConnectionError('Connection closed mid-message.')
+        view = view[k:]
+    return buf
+
+def _send(sock, header, payload=b''):
+    sock.sendall(b''.join((header, payload)))
+
+def _nodelay(sock):
+    if sock.family in (socket.AF_INET, socket.AF_INET6):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+def _session_prox(prox):
+    """ A `Prox` sharing the workspace of `prox`, with its own b, c and warm-start.
+    Closed-form proxes keep no state between calls, so they are used as they are.
+    """
+    if prox.method != 'scs':
+        return prox
+    data = dict(A=prox._A, b=prox._bc['b'].copy(), c=prox._bc['c'].copy(), dims=prox._dims)
+    if prox.prox_term == 'quadratic':
+        # SCS 3 solvers can't be shared; each session sets up its own
+        work = QuadraticWorkspace(data['A'], data['b'], data['c'], data['dims'],
+                                  prox._work.xidx, **prox.settings)
+        return Prox._from_data(data, prox._indmap, prox._solmap, shapes=prox._shapes,
+                               work=work, **prox.settings)
+    # other backends have no workspace to share, and set up their own
+    return Prox._from_data(data, prox._indmap, prox._solmap,
+                           share_work=prox.backend == 'cyscs', shapes=prox._shapes,
+                           backend=prox.backend, **prox.settings)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        sock = self.request
+        _nodelay(sock)
+        hosted = self.server.proxes
+        session = {}
+
+        while True:
+            head = _recv_exact(sock, _request.size, eof_ok=True)
+            if head is None:
+                return
+            rid, op, nlen, nbytes, rho = _request.unpack(head)
+            name = _recv_exact(sock, nlen).decode('utf-8')
+            if nbytes % _float.itemsize:
+                _recv_exact(sock, nbytes)
+                x0 = None
+            else:
+                x0 = np.empty(nbytes//_float.itemsize, dtype=_float)
+                _recv_into(sock, x0)
+
+            try:
+                if name not in hosted:
+                    raise KeyError('No operator named {}.'.format(name))
+                if name not in session:
+                    session[name] = _session_prox(hosted[name])
+                prox = session[name]
+
+                if op == _DO:
+                    if x0 is None:
+                        raise ValueError('Payload is not a float64 vector.')
+                    x = prox.do_flat(x0 if len(x0) else None, rho)
+                    info = prox._sol_info
+                    _send(sock, _response.pack(rid, _FLOATS, x.nbytes, info['iter'],
+                                               info['solveTime']*1e-3),
+                          np.ascontiguousarray(x, dtype=_float).data.cast('B'))
+                    continue
+
+                if op == _META:
+                    out = dict(layout={k: [s.start, s.stop] for k, s in prox.layout.items()},
+                               shapes={k: list(v) for k, v in prox._shapes.items()})
+                elif op == _RESET:
+                    prox.reset_warm_start()
+                    out = {}
+                elif op == _INFO:
+                    out = prox.info
+                else:
+                    raise ValueError('Unknown op: {}'.format(op))
+
+                msg = json.dumps(out, default=float).encode('utf-8')
+                _send(sock, _response.pack(rid, _JSON, len(msg), 0, 0.0), msg)
+
+            except Exception as e:
+                msg = '{}: {}'.format(type(e).__name__, e).encode('utf-8')
+                _send(sock, _response.pack(rid, _ERROR, len(msg), 0, 0.0), msg)
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    def _UnixServer(*args):
+        raise ValueError('Unix sockets are not supported on this platform')
+
+
+class ProxServer(object):
+    """ Serve named Prox operators to `ProxClient` sessions.
+
+    Parameters
+    ----------
+    proxes: dict
+        Maps operator names to `Prox` objects, or to paths of proxes saved
+        with `Prox.save`.
+    address: str or (host, port)
+        A Unix socket path, or a TCP address. Port 0 picks a free port;
+        see `ProxServer.address`.
+
+    Use `serve_forever()`, or `start()` to serve from a background thread,
+    and `shutdown()` to stop.
+    """
+
+    def __init__(self, proxes, address):
+        self.proxes = {}
+        for name, p in proxes.items():
+            if not isinstance(p, Prox):
+                p = Prox.load(p)
+            # sessions share this one's workspace through the registry
+            self.proxes[name] = _session_prox(p)
+
+        if isinstance(address, str):
+            self._server = _UnixServer(address, _Handler)
+        else:
+            self._server = _TCPServer(tuple(address), _Handler)
+        self._server.proxes = self.proxes
+        self._thread = None
+        # `socketserver.shutdown` blocks unless `serve_forever` has run
+        self._started = False
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def serve_forever(self):
+        self._started = True
+        self._server.serve_forever()
+
+    def start(self):
+        self._started = True
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self):
+        if self._started:
+            self._server.shutdown()
+            self._started = False
+        self._server.server_close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+
+class ProxClient(object):
+    """ A session with one operator on a `ProxServer`, called like a `Prox`.
+
+    Parameters
+    ----------
+    address: str or (host, port)
+        As for `ProxServer`.
+    name: str
+        The operator's name on the server.
+
+    `send_flat` and `recv_flat` pipeline requests: many can be sent before
+    the responses are read, which come back in order. A client holds
+    one connection, and is not safe to share between threads.
+    """
+
+    def __init__(self, address, name, timeout=None):
+        if isinstance(address, str):
+            if not hasattr(socket, 'AF_UNIX'):
+                raise ValueError('Unix sockets are not supported on this platform')
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            address = tuple(address)
+        self._sock.settimeout(timeout)
+        self._sock.connect(address)
+        _nodelay(self._sock)
+
+        self.name = name
+        self._name = name.encode('utf-8')
+        self._next = 0
+        self._pending = deque()
+        self._info = dict(iter=0, time=0.0)
+
+        meta = self._request(_META)
+        self._layout = {k: slice(*v) for k, v in meta['layout'].items()}
+        self._shapes = {k: tuple(v) for k, v in meta['shapes'].items()}
+
+    def _send(self, op, payload=b'', rho=1.0):
+        rid = self._next
+        self._next = (self._next + 1) % 2**32
+        head = _request.pack(rid, op, len(self._name), len(payload), rho)
+        _send(self._sock, head + self._name, payload)
+        self._pending.append(rid)
+        return rid
+
+    def _recv(self, out=None):
+        """ The next response, as `(request id, result)`.
+        """
+        rid, kind, nbytes, iters, time = _response.unpack(_recv_exact(self._sock, _response.size))
+        expected = self._pending.popleft()
+        if rid != expected:
+            raise ConnectionError('Response {} out of order; expected {}.'.format(rid, expected))
+
+        if kind == _FLOATS:
+            n = nbytes//_float.itemsize
+            if out is None or len(out) != n:
+                out = np.empty(n)
+            if out.dtype == _float and out.flags.c_contiguous:
+                _recv_into(self._sock, out)
+            else:
+                buf = np.empty(n, dtype=_float)
+                _recv_into(self._sock, buf)
+                out[:] = buf
+            self._info.update(iter=iters, time=time)
+            return rid, out
+
+        msg = _recv_exact(self._sock, nbytes).decode('utf-8')
+        if kind == _ERROR:
+            raise ProxServerError(msg)
+        return rid, json.loads(msg)
+
+    def _request(self, op):
+        self._send(op)
+        return self._recv()[1]
+
+    def send_flat(self, x0=None, rho=1.0):
+        """ Send a prox request without waiting for the result.
+        Returns the request id.
+        """
+        if x0 is None:
+            payload = b''
+        else:
+            x0 = np.ascontiguousarray(x0, dtype=_float)
+            if len(x0) != len(self):
+                raise ValueError('x0 must have length {}.'.format(len(self)))
+            payload = x0.data.cast('B')
+        return self._send(_DO, payload, float(rho))
+
+    def recv_flat(self, out=None):
+        """ The result of the oldest pending request, as `(request id, x)`.
+        """
+        return self._recv(out)
+
+    def do_flat(self, x0=None, rho=1.0, out=None):
+        self.send_flat(x0, rho)
+        return self.recv_flat(out)[1]
+
+    def do(self, x0=None, rho=1.0, out=None):
+        x0 = dict_to_flat(x0, self._layout) if x0 else None
+        x = flat_to_dict(self.do_flat(x0, rho), self._layout, self._shapes)
+        if out is None:
+            return x
+        for k in x:
+            if isinstance(out[k], np.ndarray):
+                out[k][...] = x[k]
+            else:
+                out[k] = x[k]
+        return out
+
+    def __call__(self, x0=None, rho=1.0, out=None):
+        return self.do(x0, rho, out=out)
+
+    def map_flat(self, X0, rho=1.0, window=32):
+        """ Prox at each row of `X0`, keeping up to `window` requests in flight.
+        """
+        X0 = np.atleast_2d(X0)
+        X = np.empty((X0.shape[0], len(self)))
+        sent = 0
+        for i in range(X0.shape[0]):
+            while sent < X0.shape[0] and sent - i < window:
+                self.send_flat(X0[sent], rho)
+                sent += 1
+            self.recv_flat(out=X[i])
+        return X
+
+    def __len__(self):
+        return flat_size(self._layout)
+
+    @property
+    def layout(self):
+        return dict(self._layout)
+
+    @property
+    def zero_elem(self):
+        return flat_to_dict(np.zeros(len(self)), self._layout, self._shapes)
+
+    def dict_to_flat(self, x):
+        return dict_to_flat(x, self._layout)
+
+    def flat_to_dict(self, x):
+        return flat_to_dict(x, self._layout, self._shapes)
+
+    @property
+    def info(self):
+        """ The `Prox.info` of this session's operator on the server.
+        """
+        return self._request(_INFO)
+
+    def reset_warm_start(self):
+        self._request(_RESET)
+
+    def close(self):
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve saved proxes over a socket.')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--unix', metavar='PATH', help='Unix socket path')
+    group.add_argument('--tcp', metavar='HOST:PORT', help='TCP address')
+    parser.add_argument('proxes', nargs='+', metavar='NAME=PATH',
+                        help='operator names and the directories they were saved to')
+    args = parser.parse_args(argv)
+
+    proxes = dict(p.split('=', 1) for p in args.proxes)
+    if args.unix:
+        address = args.unix
+    else:
+        host, port = args.tcp.rsplit(':', 1)
+        address = (host, int(port))
+
+    server = ProxServer(proxes, address)
+    print('serving {} on {}'.format(', '.join(sorted(proxes)), server.address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+""" Running performance statistics for prox calls.
+
+Each call is broken down (in seconds, from `time.perf_counter`) into
+
+- 'restuff': writing x0 and rho into b and c,
+- 'solve': the SCS solve,
+- 'extract': copying the solution out of the SCS x vector,
+- 'overhead': everything else in the Python call.
+
+Recording a call is O(1) and doesn't allocate memory proportional to the problem.
+"""
+import json
+import math
+from collections import Counter
+
+import numpy as np
+
+_phases = 'restuff', 'solve', 'extract', 'overhead', 'total'
+
+# latency histogram: 8 log-spaced bins per decade from 1 microsecond to 100 seconds,
+# plus an underflow and an overflow bin
+_lat_lo = -6
+_lat_hi = 2
+_lat_per_decade = 8
+_lat_edges = np.logspace(_lat_lo, _lat_hi, (_lat_hi - _lat_lo)*_lat_per_decade + 1)
+
+
+def _lat_bin(t):
+    if t <= 0:
+        return 0
+    i = int(math.floor((math.log10(t) - _lat_lo)*_lat_per_decade)) + 1
+    return min(max(i, 0), len(_lat_edges))
+
+def _hist_percentile(counts, q):
+    """ Upper edge of the latency bin holding the `q`th percentile.
+    """
+    total = counts.sum()
+    if total == 0:
+        return None
+    i = int(np.searchsorted(np.cumsum(counts), q/100.0*total))
+    if i >= len(_lat_edges):
+        return float('inf')
+    return float(_lat_edges[i])
+
+def _counter_percentile(counter, q):
+    total = sum(counter.values())
+    if total == 0:
+        return None
+    target = q/100.0*total
+    seen = 0
+    for k in sorted(counter):
+        seen += counter[k]
+        if seen >= target:
+            return k
+
+
+class ProxStats(object):
+    """ Aggregate timing, iteration and status statistics over prox calls.
+
+    Parameters
+    ----------
+    hook: function, optional
+        Called after every recorded call with a dict holding the breakdown
+        (see the module docstring), 'iter', 'status' and 'warm'.
+        The dict is reused between calls; copy it to keep it.
+        Exceptions from the hook propagate to the prox caller.
+    """
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.last = {}
+        self.reset()
+
+    def reset(self):
+        """ Clear all statistics. The hook is kept.
+        """
+        self.calls = 0
+        self.time = dict.fromkeys(_phases, 0.0)
+        self.lat_min = float('inf')
+        self.lat_max = 0.0
+        self.lat_counts = np.zeros(len(_lat_edges) + 1, dtype=np.int64)
+        self.iters = Counter()
+        self.iter_sum = {True: 0, False: 0}
+        self.warm_calls = {True: 0, False: 0}
+        self.statuses = Counter()
+        self.inaccurate = 0
+        self.failed = 0
+
+    def record(self, times, total, iters, status, warm):
+        """ Record one call.
+
+        Parameters
+        ----------
+        times: dict
+            'restuff', 'solve' and 'extract' times in seconds
+        total: float
+            Total time of the call in seconds
+        iters: int
+        status: str
+            SCS status string
+        warm: bool
+            Whether the solve was warm-started.
+        """
+        last = self.last
+        last['restuff'] = times['restuff']
+        last['solve'] = times['solve']
+        last['extract'] = times['extract']
+        last['overhead'] = max(total - times['restuff'] - times['solve'] - times['extract'], 0.0)
+        last['total'] = total
+        last['iter'] = iters
+        last['status'] = status
+        last['warm'] = warm
+
+        self.calls += 1
+        for k in _phases:
+            self.time[k] += last[k]
+
+        self.lat_min = min(self.lat_min, total)
+        self.lat_max = max(self.lat_max, total)
+        self.lat_counts[_lat_bin(total)] += 1
+
+        self.iters[iters] += 1
+        self.iter_sum[warm] += iters
+        self.warm_calls[warm] += 1
+
+        self.statuses[status] += 1
+        if 'Solved' not in status:
+            self.failed += 1
+        elif 'Inaccurate' in status:
+            self.inaccurate += 1
+
+        if self.hook is not None:
+            self.hook(last)
+
+    def latency_percentile(self, q):
+        """ Approximate `q`th percentile of the call latency in seconds,
+        accurate to the histogram bin width (about 33%).
+        """
+        return _hist_percentile(self.lat_counts, q)
+
+    def iter_percentile(self, q):
+        """ Exact `q`th percentile of the iteration count.
+        """
+        return _counter_percentile(self.iters, q)
+
+    def as_dict(self):
+        """ All statistics as a dict of plain Python types.
+        """
+        n = self.calls
+        nw, nc = self.warm_calls[True], self.warm_calls[False]
+        warm_mean = self.iter_sum[True]/float(nw) if nw else None
+        cold_mean = self.iter_sum[False]/float(nc) if nc else None
+
+        return dict(
+            calls=n,
+            time=dict(self.time),
+            latency=dict(mean=self.time['total']/n if n else None,
+                         min=self.lat_min if n else None,
+                         max=self.lat_max if n else None,
+                         p50=self.latency_percentile(50),
+                         p90=self.latency_percentile(90),
+                         p99=self.latency_percentile(99),
+                         hist=dict(edges=_lat_edges.tolist(),
+                                   counts=self.lat_counts.tolist())),
+            iter=dict(mean=sum(k*v for k, v in self.iters.items())/float(n) if n else None,
+                      max=max(self.iters) if n else None,
+                      p50=self.iter_percentile(50),
+                      p90=self.iter_percentile(90),
+                      p99=self.iter_percentile(99),
+                      hist={int(k): v for k, v in sorted(self.iters.items())}),
+            warm_start=dict(warm_calls=nw,
+                            cold_calls=nc,
+                            warm_iter_mean=warm_mean,
+                            cold_iter_mean=cold_mean,
+                            iter_saved=(cold_mean - warm_mean
+                                        if nw and nc else None)),
+            status=dict(self.statuses),
+            inaccurate=self.inaccurate,
+            failed=self.failed)
+
+    def to_json(self, **kwargs):
+        """ `as_dict` as a JSON string. Keyword arguments go to `json.dumps`.
+        """
+        return json.dumps(self.as_dict(), **kwargs)
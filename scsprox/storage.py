@@ -0,0 +1,151 @@
+""" Saving and loading stuffed prox data.
+
+A saved prox is a directory holding one `.npy` file per array
+(the CSC parts of A, b, c and the tau locations) and a `meta.json` file
+with the cone dims, index maps and settings.
+`.npy` files can be memory-mapped, so many processes loading the same
+prox share the pages of A instead of each holding a copy.
+
+Nothing here depends on CVXPY.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import scipy.sparse as sp
+
+_meta = 'meta.json'
+
+
+def _to_json(x):
+    """ Convert numpy scalars and arrays in cone dims to plain Python.
+    """
+    if isinstance(x, dict):
+        return {k: _to_json(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple, np.ndarray)):
+        return [_to_json(v) for v in x]
+    if isinstance(x, np.integer):
+        return int(x)
+    if isinstance(x, np.floating):
+        return float(x)
+    return x
+
+def _slices_to_json(m):
+    return {k: [s.start, s.stop] for k, s in m.items() if isinstance(s, slice)}
+
+def _slices_from_json(m):
+    return {k: slice(start, stop) for k, (start, stop) in m.items()}
+
+
+def _save_csr(tmp, k, M):
+    for part in 'data', 'indices', 'indptr':
+        np.save(os.path.join(tmp, '{}_{}.npy'.format(k, part)), getattr(M, part))
+
+def _load_csr(load, k, shape):
+    return sp.csr_matrix((load(k + '_data'), load(k + '_indices'), load(k + '_indptr')),
+                         shape=tuple(shape))
+
+
+def save_prox_data(path, data, indmap, solmap, settings, shapes=None, pmap=None):
+    """ Write SCS data and prox index maps to the directory `path`.
+    `pmap` is the map of extra parameters from `extra_param_map`, if any.
+
+    The directory is written under a temporary name and then renamed,
+    so concurrent writers and readers never see a partial entry.
+    If `path` already exists, it is left alone.
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(parent):
+        os.makedirs(parent)
+
+    tmp = tempfile.mkdtemp(dir=parent)
+    try:
+        A = data['A']
+        arrays = dict(A_indptr=A.indptr, A_indices=A.indices, A_data=A.data,
+                      b=data['b'], c=data['c'], tau=indmap['__tau'])
+        if pmap is not None:
+            for k in 'values', 'brows', 'bbase', 'crows', 'cbase':
+                arrays['param_' + k] = pmap[k]
+            _save_csr(tmp, 'param_B', pmap['B'])
+            _save_csr(tmp, 'param_C', pmap['C'])
+
+        for k, v in arrays.items():
+            np.save(os.path.join(tmp, k + '.npy'), v)
+
+        meta = dict(shape=list(A.shape),
+                    dims=_to_json(data['dims']),
+                    indmap=_slices_to_json(indmap),
+                    solmap=_slices_to_json(solmap),
+                    shapes=None if shapes is None else {k: list(v) for k, v in shapes.items()},
+                    settings=settings,
+                    diag=bool(indmap.get('__diag', False)))
+        if pmap is not None:
+            meta['params'] = dict(slices=_slices_to_json(pmap['slices']),
+                                  shapes={k: list(v) for k, v in pmap['shapes'].items()},
+                                  B_shape=list(pmap['B'].shape),
+                                  C_shape=list(pmap['C'].shape))
+        with open(os.path.join(tmp, _meta), 'w') as f:
+            json.dump(meta, f)
+
+        os.rename(tmp, path)
+    except OSError:
+        if not os.path.isdir(path):
+            raise
+    finally:
+        if os.path.isdir(tmp):
+            shutil.rmtree(tmp)
+
+def load_prox_data(path, mmap=True):
+    """ Read data written by `save_prox_data`.
+
+    With `mmap=True`, the arrays of A are memory-mapped copy-on-write.
+    CySCS needs writable arrays, but never writes to A, so the pages stay shared.
+    b and c are always read into memory, since they get restuffed.
+
+    Returns
+    -------
+    data, indmap, solmap, settings, shapes, pmap
+        `pmap` is None if no extra parameters were saved.
+    """
+    with open(os.path.join(path, _meta)) as f:
+        meta = json.load(f)
+
+    def load(k, mode=None):
+        return np.load(os.path.join(path, k + '.npy'), mmap_mode=mode)
+
+    mode = 'c' if mmap else None
+    # assign the arrays directly: the csc_matrix constructor may copy or
+    # downcast them, but CySCS wants the int64 (memory-mapped) arrays as they are
+    A = sp.csc_matrix(tuple(meta['shape']))
+    A.data = load('A_data', mode)
+    A.indices = load('A_indices', mode)
+    A.indptr = load('A_indptr', mode)
+
+    data = dict(A=A, b=load('b'), c=load('c'), dims=meta['dims'])
+
+    indmap = _slices_from_json(meta['indmap'])
+    indmap['__tau'] = load('tau')
+    if meta.get('diag'):
+        indmap['__diag'] = True
+    solmap = _slices_from_json(meta['solmap'])
+
+    pmap = None
+    if 'params' in meta:
+        pm = meta['params']
+        pmap = {k: load('param_' + k) for k in ('values', 'brows', 'bbase', 'crows', 'cbase')}
+        pmap.update(slices=_slices_from_json(pm['slices']),
+                    shapes={k: tuple(v) for k, v in pm['shapes'].items()},
+                    B=_load_csr(load, 'param_B', pm['B_shape']),
+                    C=_load_csr(load, 'param_C', pm['C_shape']))
+
+    return data, indmap, solmap, meta['settings'], meta.get('shapes'), pmap
+
+def cache_path(cache_dir, key):
+    """ Location of the cache entry for `key` (str or bytes) in `cache_dir`.
+    """
+    if not isinstance(key, bytes):
+        key = key.encode('utf-8')
+    return os.path.join(cache_dir, hashlib.sha256(key).hexdigest())
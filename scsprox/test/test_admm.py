@@ -0,0 +1,35 @@
+import cvxpy as cvx
+import numpy as np
+
+from scsprox import Prox
+from scsprox.admm import consensus
+
+def problems(n=5, seed=0):
+    np.random.seed(seed)
+    a = np.random.randn(n)
+    b = np.random.randn(n)
+
+    x1 = cvx.Variable(n)
+    prob1 = cvx.Problem(cvx.Minimize(cvx.sum_squares(x1 - a)))
+
+    x2 = cvx.Variable(n)
+    prob2 = cvx.Problem(cvx.Minimize(cvx.norm(x2 - b, 1)))
+
+    x = cvx.Variable(n)
+    prob = cvx.Problem(cvx.Minimize(cvx.sum_squares(x - a) + cvx.norm(x - b, 1)))
+    prob.solve(solver='ECOS')
+    true_sol = np.array(x.value).flatten()
+
+    return [(prob1, dict(x=x1)), (prob2, dict(x=x2))], true_sol
+
+def test_consensus():
+    specs, true_sol = problems()
+
+    for anderson in 0, 5:
+        proxes = [Prox(prob, x_vars, eps=1e-6, max_iters=1000) for prob, x_vars in specs]
+        z, info = consensus(proxes, max_iters=500, alpha=1.5,
+                            eps_abs=1e-6, eps_rel=1e-6, anderson=anderson)
+
+        assert info['converged']
+        assert len(info['r_norm']) == info['iters']
+        assert np.allclose(z['x'], true_sol, atol=1e-3)
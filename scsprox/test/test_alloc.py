@@ -0,0 +1,73 @@
+"""
+Check that steady-state prox calls with preallocated outputs
+don't allocate memory proportional to the problem size,
+beyond the solution arrays which CySCS creates on every solve.
+"""
+import tracemalloc
+
+import numpy as np
+
+from scsprox import Prox
+from scsprox.examples import example_rand
+
+
+def peak_per_call(f, calls=5):
+    """ Largest increase in traced memory during any single call to `f`.
+    """
+    peak = 0
+    for _ in range(calls):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        f()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    return peak
+
+def test_out():
+    m, n = 2000, 20
+    prob, x_vars, _ = example_rand(m, n)
+    prox = Prox(prob, x_vars, max_iters=5)
+    prox.update_settings(eps=1e-12)
+
+    # size of the x, y, s arrays CySCS allocates for each solve
+    scs_bytes = 8*(prox._work._n + 2*prox._work._m)
+    # well below the size of any of the prox variables
+    slack = 4096
+
+    x0 = prox.zero_elem
+    out = prox.zero_elem
+    flat_out = np.zeros(len(prox._xidx))
+    flat_x0 = prox.dict_to_flat(x0)
+
+    def call():
+        try:
+            prox(x0, 1.0, out=out)
+        except RuntimeError:
+            # we only care about memory here, not accuracy
+            pass
+
+    def call_flat():
+        try:
+            prox.do_flat(flat_x0, 1.0, out=flat_out)
+        except RuntimeError:
+            pass
+
+    tracemalloc.start()
+    try:
+        for f in call, call_flat:
+            # settle down caches and the warm-start
+            for _ in range(3):
+                f()
+
+            start = tracemalloc.get_traced_memory()[0]
+            assert peak_per_call(f) <= scs_bytes + slack
+            # no growth across calls
+            assert tracemalloc.get_traced_memory()[0] - start <= slack
+    finally:
+        tracemalloc.stop()
+
+    # solutions really are written into `out`
+    prox.update_settings(eps=1e-3, max_iters=1000)
+    x = prox(x0, 1.0, out=out)
+    assert x is out
+    assert out['y'].shape == (m,)
+    assert np.allclose(out['y'], prox(x0, 1.0)['y'], atol=1e-3)
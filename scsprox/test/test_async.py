@@ -0,0 +1,65 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from scsprox import Prox, AsyncProx
+from scsprox.asyncprox import ProxBusy, aprox, gather
+from scsprox.examples import example_rand, example2
+
+def test_async():
+    prob, x_vars, _ = example_rand(10, 5, 0)
+    prox = Prox(prob, x_vars, eps=1e-6, max_iters=5000)
+    prob2, x_vars2 = example2()
+    prox2 = Prox(prob2, x_vars2, eps=1e-6, max_iters=5000)
+
+    async def main():
+        ap = AsyncProx(prox)
+        x = await ap.do()
+        assert ap.info['status'] == 'Solved'
+
+        # many calls on the same operator are serialized and all finish
+        xs = await asyncio.gather(*[ap(None, rho) for rho in (1.0, 2.0, 4.0)])
+        assert len(xs) == 3
+
+        # different operators, same wrapper per operator
+        assert aprox(prox) is aprox(prox)
+        ys = await gather([prox, prox2, prox], [None, None, None])
+        assert np.allclose(ys[0]['x'], x['x'], atol=1e-4)
+        assert set(ys[1]) == set(x_vars2)
+
+        zs = await gather([prox, prox2], [prox.dict_to_flat(x), None], rho=[1.0, 2.0], flat=True)
+        assert zs[0].ndim == 1
+
+        # an array gives one rho per operator, as in `prox_map`
+        rhos = np.array([0.5, 4.0])
+        ws = await gather([prox, prox], [None, None], rho=rhos, flat=True)
+        for w, r in zip(ws, rhos):
+            assert np.allclose(w, prox.do_flat(None, r), atol=1e-4)
+        assert not np.allclose(ws[0], ws[1], atol=1e-3)
+
+    asyncio.run(main())
+
+def test_backpressure():
+    prob, x_vars, _ = example_rand(10, 5, 0)
+    prox = Prox(prob, x_vars)
+
+    async def main():
+        ap = AsyncProx(prox, max_pending=1)
+        res = await asyncio.gather(ap.do(), ap.do(), return_exceptions=True)
+        assert isinstance(res[1], ProxBusy)
+        assert ap.pending == 0
+
+        # cancel one call queued behind another
+        first = asyncio.ensure_future(ap.do())
+        await asyncio.sleep(0)
+        ap.max_pending = None
+        second = asyncio.ensure_future(ap.do())
+        await asyncio.sleep(0)
+        second.cancel()
+        await first
+        with pytest.raises(asyncio.CancelledError):
+            await second
+        assert not ap._lock.locked()
+
+    asyncio.run(main())
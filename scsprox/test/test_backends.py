@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from scsprox import Prox, benchmark
+from scsprox.backends import register_backend, backends, ScsBackend
+from scsprox.examples import example_rand
+
+@pytest.mark.parametrize('backend', ['scs', 'ecos'])
+def test_match_cyscs(backend):
+    pytest.importorskip(backend)
+    prob, x_vars, _ = example_rand()
+    ref = Prox(prob, x_vars, eps=1e-6, max_iters=5000)
+    prox = Prox(prob, x_vars, backend=backend, eps=1e-6, max_iters=5000)
+    assert prox.backend == backend
+
+    np.random.seed(0)
+    for i in range(3):
+        x0 = np.random.randn(len(ref.dict_to_flat(ref.zero_elem)))
+        assert np.allclose(prox.do_flat(x0, 2.0), ref.do_flat(x0, 2.0), atol=1e-3)
+        assert 'Solved' in prox.info['status']
+
+    # the dict path, and batches, work the same way
+    x = prox(ref.flat_to_dict(x0), 2.0)
+    for k, v in ref(ref.flat_to_dict(x0), 2.0).items():
+        assert np.allclose(x[k], v, atol=1e-3)
+
+def test_register():
+    calls = []
+
+    class Counting(ScsBackend):
+        def solve(self, *args, **kwargs):
+            calls.append(1)
+            return super(Counting, self).solve(*args, **kwargs)
+
+    pytest.importorskip('scs')
+    register_backend('counting', Counting)
+    try:
+        prob, x_vars, _ = example_rand()
+        prox = Prox(prob, x_vars, backend='counting')
+        prox.do_flat()
+        assert calls == [1]
+    finally:
+        del backends['counting']
+
+def test_errors():
+    prob, x_vars, _ = example_rand()
+    with pytest.raises(ValueError):
+        Prox(prob, x_vars, backend='nope')
+    with pytest.raises(ValueError):
+        Prox(prob, x_vars, backend='scs', share_work=True)
+
+def test_bench():
+    res = benchmark.bench_backends(20, 5, 1, backends=('cyscs', 'scs'), calls=3)
+    assert [r['backend'] for r in res] == ['cyscs', 'scs']
+    assert res[0]['max_diff'] == 0.0
+    for r in res:
+        if r['error'] is None:
+            assert r['time'] > 0
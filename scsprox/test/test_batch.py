@@ -0,0 +1,67 @@
+from scsprox import Prox
+from scsprox.examples import example_rand
+from scsprox.scs_mapping import flat_layout, dict_to_flat, flat_to_dict
+
+import numpy as np
+
+def test_layout():
+    solmap = dict(y=slice(3,5), x=slice(0,3), z=slice(5,6))
+    layout = flat_layout(solmap)
+
+    assert list(layout) == ['x', 'y', 'z']
+    assert layout['z'] == slice(5,6)
+
+    x = dict(x=np.arange(3.0), y=np.array([3.0, 4.0]), z=5.0)
+    v = dict_to_flat(x, layout)
+    assert np.all(v == np.arange(6.0))
+
+    x2 = flat_to_dict(v, layout)
+    assert isinstance(x2['z'], float)
+    for k in x:
+        assert np.all(x[k] == x2[k])
+
+def test_batch():
+    prob, x_vars, _ = example_rand(10, 5)
+    prox = Prox(prob, x_vars, eps=1e-6, max_iters=1000)
+
+    N = 4
+    x0s = [prox.zero_elem]
+    for _ in range(N-1):
+        x0s.append(prox(x0s[-1]))
+    rhos = np.linspace(0.5, 2.0, N)
+
+    prox.reset_warm_start()
+    X, info = prox.do_batch(x0s, rhos)
+
+    assert X.shape == (N, 16)
+    assert len(info['iter']) == N
+    assert all(s == 'Solved' for s in info['status'])
+
+    X2, _ = prox.do_batch(X0=np.vstack([dict_to_flat(x0, prox._layout) for x0 in x0s]), rho=rhos)
+
+    for i in range(N):
+        prox.reset_warm_start()
+        x = prox(x0s[i], rhos[i])
+        x = dict_to_flat(x, prox._layout)
+        assert np.allclose(X[i], x, atol=1e-4)
+        assert np.allclose(X2[i], x, atol=1e-4)
+
+def test_flat():
+    prob, x_vars, _ = example_rand(10, 5)
+    prox = Prox(prob, x_vars, eps=1e-6, max_iters=1000)
+
+    x0 = prox()
+    prox.reset_warm_start()
+    x1 = prox(x0, 2.0)
+
+    prox.reset_warm_start()
+    v1 = prox.do_flat(prox.dict_to_flat(x0), 2.0)
+    assert v1.shape == (16,)
+
+    x2 = prox.flat_to_dict(v1)
+    for k in x1:
+        assert np.allclose(x1[k], x2[k], atol=1e-4)
+
+    # None gives the zero element
+    prox.reset_warm_start()
+    assert np.allclose(prox.do_flat(), prox.dict_to_flat(x0), atol=1e-4)
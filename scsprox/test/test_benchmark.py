@@ -0,0 +1,25 @@
+import json
+
+from scsprox import benchmark
+
+def test_smoke(tmpdir):
+    res = benchmark.run([(20, 5, 2)], calls=3, isolate=False)
+
+    r, = res['results']
+    assert r['num_vars'] == 4
+    assert r['size'] == 2*(20 + 5)
+    for k in 'cvxpy_time', 'scs_setup_time', 'cold_time', 'warm_time', 'peak_rss_mb':
+        assert r[k] > 0
+    assert r['warm_iter'] <= r['cold_iter']
+
+    # round trip through JSON, and compare against itself
+    path = str(tmpdir.join('bench.json'))
+    with open(path, 'w') as f:
+        json.dump(res, f)
+    with open(path) as f:
+        old = json.load(f)
+    assert benchmark.compare(res, old) == []
+
+    slow = json.loads(json.dumps(res))
+    slow['results'][0]['warm_time'] *= 10
+    assert [w[3] for w in benchmark.compare(slow, old)] == ['warm_time']
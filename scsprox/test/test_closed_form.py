@@ -0,0 +1,96 @@
+import cvxpy as cvx
+import numpy as np
+import pytest
+
+from scsprox import Prox
+from scsprox.examples import example_rand
+
+def check_routes(prob, x_vars, rho=2.0, seed=0):
+    """ Closed-form and SCS proxes should agree.
+    """
+    fast = Prox(prob, x_vars, method='closed_form')
+    slow = Prox(prob, x_vars, method='scs', eps=1e-7, max_iters=10000)
+    assert fast.method == 'closed_form'
+    assert slow.method == 'scs'
+
+    np.random.seed(seed)
+    x0 = fast.zero_elem
+    for k in x0:
+        x0[k] = 3*np.random.randn(*np.shape(x0[k]))
+        if np.shape(x0[k]) == ():
+            x0[k] = float(x0[k])
+
+    x = fast(x0, rho)
+    y = slow(x0, rho)
+    for k in x:
+        assert np.shape(x[k]) == np.shape(y[k])
+        assert np.allclose(x[k], y[k], atol=1e-4)
+
+    assert fast.info['status'] == 'Solved'
+    assert fast.info['iter'] == 0
+
+    return fast
+
+def test_elementwise():
+    x = cvx.Variable(5)
+    y = cvx.Variable(3, 2)
+    z = cvx.Variable()
+    obj = 2*cvx.norm(x, 1) + cvx.sum_squares(x) + cvx.sum_squares(y) + cvx.norm(z, 1)
+    cons = [x >= 0, y <= 1, -1 <= y]
+    check_routes(cvx.Problem(cvx.Minimize(obj), cons), dict(x=x, y=y, z=z))
+
+def test_norm2():
+    x = cvx.Variable(4)
+    prob = cvx.Problem(cvx.Minimize(3*cvx.norm(x)))
+    check_routes(prob, dict(x=x))
+
+def test_least_squares():
+    np.random.seed(1)
+    A = np.random.randn(6, 4)
+    b = np.random.randn(6)
+    x = cvx.Variable(4)
+    y = cvx.Variable(2)
+    prob = cvx.Problem(cvx.Minimize(cvx.sum_squares(A*x - b) + cvx.sum_squares(y - 1)))
+    prox = check_routes(prob, dict(x=x, y=y))
+
+    # the flat and batch paths go through the same workspace
+    X0 = np.random.randn(3, 6)
+    X0[2] = X0[0]
+    X, info = prox.do_batch(X0, rho=[1.0, 2.0, 1.0])
+    assert np.all(info['iter'] == 0)
+    assert np.allclose(X[0], X[2])
+    assert np.allclose(prox.do_flat(X0[1], 2.0), X[1])
+
+def test_fallback():
+    prob, x_vars, _ = example_rand(10, 5)
+    assert Prox(prob, x_vars).method == 'scs'
+    with pytest.raises(ValueError):
+        Prox(prob, x_vars, method='closed_form')
+    with pytest.raises(ValueError):
+        Prox(prob, x_vars, method='nope')
+
+    # an l1 norm of an affine expression isn't separable
+    x = cvx.Variable(3)
+    prob = cvx.Problem(cvx.Minimize(cvx.norm(2*x - 1, 1)))
+    assert Prox(prob, dict(x=x)).method == 'scs'
+
+    # variables we don't prox on would need minimizing over
+    y = cvx.Variable(3)
+    prob = cvx.Problem(cvx.Minimize(cvx.norm(x, 1) + cvx.norm(y, 1)))
+    assert Prox(prob, dict(x=x)).method == 'scs'
+
+def test_not_bounds():
+    # equality and PSD constraints subclass LeqConstraint in CVXPY, but aren't bounds
+    x = cvx.Variable(3)
+    prob = cvx.Problem(cvx.Minimize(cvx.sum_squares(x)), [x == 1])
+    prox = Prox(prob, dict(x=x), eps=1e-7, max_iters=10000)
+    assert prox.method == 'scs'
+
+    x0 = dict(x=np.array([3.0, -2.0, 0.5]))
+    ref = Prox(prob, dict(x=x), method='scs', eps=1e-7, max_iters=10000)
+    assert np.allclose(prox(x0, 2.0)['x'], ref(x0, 2.0)['x'], atol=1e-4)
+    assert np.allclose(prox(x0, 2.0)['x'], 1.0, atol=1e-4)
+
+    X = cvx.Variable(2, 2)
+    prob = cvx.Problem(cvx.Minimize(cvx.sum_squares(X)), [X >> 0])
+    assert Prox(prob, dict(X=X)).method == 'scs'
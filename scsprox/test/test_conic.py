@@ -0,0 +1,37 @@
+import numpy as np
+
+from scsprox import Prox
+from scsprox.examples import example2, example3
+from scsprox.scs_mapping import get_scs_data, get_solmap
+
+def test_simple():
+    # min x s.t. x >= 0, i.e., s = 0 - (-1)*x in the linear cone
+    prox = Prox.from_conic(np.array([[-1.0]]), np.zeros(1), np.ones(1),
+                           dict(l=1), dict(x=slice(0, 1)))
+
+    x = 3
+    rho = 2 # x should decrease by 1/rho
+    x1 = prox(dict(x=x), rho)
+    assert prox.info['status'] == 'Solved'
+    assert np.allclose(x1['x'], x-1.0/rho, atol=1e-3)
+
+    assert prox.info['cvxpy_time'] == 0.0
+
+def test_match_cvxpy():
+    for ex in example2, example3:
+        prob, x_vars = ex()
+        data = get_scs_data(prob)
+        var_slices = get_solmap(prob, x_vars, data=data)
+
+        prox1 = Prox.from_conic(data['A'], data['b'], data['c'], data['dims'],
+                                var_slices, eps=1e-6, max_iters=1000)
+        prox2 = Prox(*ex(), eps=1e-6, max_iters=1000)
+
+        x0 = prox2.zero_elem
+        for k in x0:
+            x0[k] = x0[k] + 1.0
+
+        x1 = prox1(x0, 2.0)
+        x2 = prox2(x0, 2.0)
+        for k in x1:
+            assert np.allclose(x1[k], x2[k], atol=1e-4)
@@ -0,0 +1,74 @@
+import numpy as np
+import cvxpy as cvx
+import pytest
+
+from scsprox import Prox
+from scsprox.examples import example_rand
+
+def test_simple():
+    # min sum(x) s.t. x >= 0; each coordinate decreases by 1/rho_i
+    prox = Prox.from_conic(-np.eye(3), np.zeros(3), np.ones(3),
+                           dict(l=3), dict(x=slice(0, 3)), diag_rho=True)
+    assert prox.diag_rho
+
+    x0 = np.array([3.0, 3.0, 3.0])
+    rho = np.array([1.0, 2.0, 4.0])
+    x = prox.do_flat(x0, rho)
+    assert np.allclose(x, x0 - 1.0/rho, atol=1e-3)
+
+    x = prox(dict(x=x0), dict(x=rho))
+    assert np.allclose(x['x'], x0 - 1.0/rho, atol=1e-3)
+
+    # a scalar rho still works
+    assert np.allclose(prox.do_flat(x0, 2.0), x0 - 0.5, atol=1e-3)
+
+def test_match_cvxpy():
+    prob, x_vars, _ = example_rand()
+    prox = Prox(prob, x_vars, diag_rho=True, eps=1e-6, max_iters=5000)
+    assert prox.method == 'scs'
+
+    np.random.seed(0)
+    x0 = {k: np.random.randn(*np.shape(v)) for k, v in prox.zero_elem.items()}
+    rho = {k: np.random.rand(*np.shape(v)) + 0.5 for k, v in prox.zero_elem.items()}
+
+    x = prox(x0, rho)
+
+    obj = prob.objective.args[0]
+    for k, v in x_vars.items():
+        obj = obj + cvx.sum_entries(cvx.mul_elemwise(rho[k]/2.0, cvx.square(v - x0[k])))
+    cvx.Problem(cvx.Minimize(obj), prob.constraints).solve(solver='ECOS')
+
+    for k, v in x_vars.items():
+        assert np.allclose(x[k], np.array(v.value).flatten(), atol=1e-3)
+
+    # same as the scalar prox when all weights are equal
+    scalar = Prox(prob, x_vars, eps=1e-6, max_iters=5000)
+    flat = prox.dict_to_flat(x0)
+    assert np.allclose(prox.do_flat(flat, np.full(len(flat), 2.0)),
+                       scalar.do_flat(flat, 2.0), atol=1e-3)
+
+def test_batch():
+    prox = Prox.from_conic(-np.eye(2), np.zeros(2), np.ones(2),
+                           dict(l=2), dict(x=slice(0, 2)), diag_rho=True)
+    X0 = np.full((3, 2), 5.0)
+    R = np.array([[1.0, 2.0], [2.0, 4.0], [4.0, 1.0]])
+    X, info = prox.do_batch(X0, R)
+    assert np.allclose(X, X0 - 1.0/R, atol=1e-3)
+
+    X, info = prox.do_batch(X0, dict(x=[1.0, 2.0]))
+    assert np.allclose(X, X0 - [1.0, 0.5], atol=1e-3)
+
+def test_errors():
+    prob, x_vars, _ = example_rand()
+    prox = Prox(prob, x_vars)
+    with pytest.raises(ValueError):
+        prox.do_flat(None, np.ones(len(prox.dict_to_flat(prox.zero_elem))))
+
+    prox = Prox(prob, x_vars, diag_rho=True)
+    with pytest.raises(ValueError):
+        prox(None, dict(x=1.0))
+    with pytest.raises(ValueError):
+        prox.do_flat(None, -np.ones(len(prox.dict_to_flat(prox.zero_elem))))
+
+    with pytest.raises(ValueError):
+        Prox(prob, x_vars, method='closed_form', diag_rho=True)
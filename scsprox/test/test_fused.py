@@ -0,0 +1,94 @@
+import cvxpy as cvx
+import numpy as np
+import pytest
+
+from scsprox import Prox, FusedProx
+from scsprox.fused import cone_rows, stack_blocks
+from scsprox.examples import example_rand, example2, example3, example_blocks
+
+def operators():
+    return [example2(), example3(), example_rand(10, 5, 0)[:2]]
+
+def test_fused_matches():
+    specs = operators()
+    proxes = [Prox(prob, x_vars, method='scs', eps=1e-6, max_iters=5000)
+              for prob, x_vars in specs]
+    fused = FusedProx(proxes, eps=1e-6, max_iters=5000)
+    assert len(fused) == 3
+
+    np.random.seed(0)
+    x0s = [{k: v + np.random.randn(*np.shape(v)) for k, v in p.zero_elem.items()}
+           for p in proxes]
+    rhos = [0.5, 1.0, 2.0]
+
+    xs = fused(x0s, rhos)
+    for p, x0, rho, x in zip(proxes, x0s, rhos, xs):
+        expected = p(x0, rho)
+        for k in expected:
+            assert np.allclose(x[k], expected[k], atol=1e-3)
+
+    # flat vectors, split back per operator
+    flat = np.concatenate([p.dict_to_flat(x0) for p, x0 in zip(proxes, x0s)])
+    parts = fused.split(fused.do_flat(flat, rhos))
+    for p, x0, rho, part in zip(proxes, x0s, rhos, parts):
+        assert np.allclose(part, p.do_flat(p.dict_to_flat(x0), rho), atol=1e-3)
+
+def test_from_problems():
+    specs = operators()
+    fused = FusedProx(specs, eps=1e-6, max_iters=5000)
+    x = fused.do_flat(None, 1.0)
+    assert fused.info['status'] == 'Solved'
+
+    parts = fused.split(x)
+    for (prob, x_vars), part in zip(operators(), parts):
+        p = Prox(prob, x_vars, method='scs', eps=1e-6, max_iters=5000)
+        assert np.allclose(part, p.do_flat(), atol=1e-3)
+
+def test_many_blocks():
+    specs = [example_blocks(6, 3, 1, seed)[:2] for seed in range(20)]
+    fused = FusedProx(specs)
+    assert len(fused.layouts) == 20
+    x = fused.do_flat(rho=np.linspace(1, 2, 20))
+    assert len(fused.split(x)) == 20
+
+def test_errors():
+    fused = FusedProx(operators())
+    with pytest.raises(ValueError):
+        fused.do_flat(rho=[1.0, 2.0])
+    with pytest.raises(ValueError):
+        fused.do([None])
+    with pytest.raises(ValueError):
+        FusedProx(operators(), bad_setting=1)
+
+def test_psd_blocks():
+    X = cvx.Variable(3, 3)
+    prob = cvx.Problem(cvx.Minimize(-cvx.lambda_min(X) + cvx.trace(X)), [X >> 0])
+
+    # row counts agree with CVXPY's own stuffing
+    data = prob.get_problem_data('SCS')
+    assert data['dims']['s']
+    assert sum(cone_rows(data['dims'])) == data['A'].shape[0]
+
+    sdp = Prox(prob, dict(X=X), method='scs', eps=1e-6, max_iters=5000)
+    assert sum(cone_rows(sdp._dims)) == sdp._A.shape[0]
+
+    # fused after a problem with other cones, so the PSD rows move
+    rand = Prox(*example_rand(10, 5, 0)[:2], method='scs', eps=1e-6, max_iters=5000)
+    fused = FusedProx([rand, sdp], eps=1e-6, max_iters=5000)
+    assert fused._A.shape[0] == rand._A.shape[0] + sdp._A.shape[0]
+
+    np.random.seed(0)
+    x0s = [{k: v + np.random.randn(*np.shape(v)) for k, v in p.zero_elem.items()}
+           for p in (rand, sdp)]
+    xs = fused(x0s, 2.0)
+    assert fused.info['status'] == 'Solved'
+    for p, x0, x in zip((rand, sdp), x0s, xs):
+        expected = p(x0, 2.0)
+        for k in expected:
+            assert np.allclose(x[k], expected[k], atol=1e-3)
+
+def test_dims_mismatch():
+    # a full n*n PSD block doesn't fit
+    sdp = dict(A=-np.eye(4), b=np.zeros(4), c=np.ones(4), dims=dict(s=[2]))
+    with pytest.raises(ValueError, match='PSD'):
+        stack_blocks([sdp])
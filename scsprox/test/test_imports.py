@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from scsprox import Prox
+from scsprox.examples import example_rand
+
+# seconds to import scsprox and load a saved prox; generous, for slow CI machines
+import_budget = 2.0
+
+root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def run(code):
+    """ Run `code` in a fresh interpreter, returning its stdout.
+    """
+    env = dict(os.environ, PYTHONPATH=root)
+    out = subprocess.check_output([sys.executable, '-c', code], env=env)
+    return out.decode('utf-8').strip()
+
+def test_import_is_lazy():
+    out = run('import sys, scsprox; from scsprox import Prox; '
+              'print(sorted(k for k in ("cvxpy", "scsprox.examples", "scsprox.asyncprox") '
+              'if k in sys.modules))')
+    assert out == '[]'
+
+    out = run('from scsprox import AsyncProx; print(AsyncProx.__module__)')
+    assert out == 'scsprox.asyncprox'
+
+    # examples still load when asked for
+    out = run('import scsprox; print(scsprox.examples.__name__)')
+    assert out == 'scsprox.examples'
+
+def test_load_without_cvxpy():
+    prob, x_vars, _ = example_rand()
+    prox = Prox(prob, x_vars, method='scs')
+    x = prox.do_flat()
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'prox')
+        prox.save(path)
+
+        out = run('import sys\n'
+                  'from scsprox import Prox\n'
+                  'prox = Prox.load({!r})\n'
+                  'x = prox.do_flat()\n'
+                  'print(len(x), "cvxpy" in sys.modules)'.format(path))
+
+    assert out == '{} False'.format(len(x))
+
+def test_import_time():
+    prob, x_vars, _ = example_rand()
+    prox = Prox(prob, x_vars, method='scs')
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'prox')
+        prox.save(path)
+
+        out = run('from time import perf_counter\n'
+                  'start = perf_counter()\n'
+                  'import scsprox\n'
+                  'prox = scsprox.Prox.load({!r})\n'
+                  'print(perf_counter() - start)'.format(path))
+
+    assert float(out) < import_budget
+
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from scsprox import Prox
+from scsprox.admm import consensus
+from scsprox.examples import example_rand
+from scsprox.inexact import geometric, summable, is_solved
+
+from .test_admm import problems
+
+class Status(object):
+    """ Wraps a workspace, reporting `status` for each solve.
+    """
+
+    def __init__(self, work, status):
+        self.work = work
+        self.status = status
+
+    @property
+    def info(self):
+        return self.work.info
+
+    def solve(self, *args, **kwargs):
+        sol = self.work.solve(*args, **kwargs)
+        sol['info'] = dict(sol['info'], status=self.status)
+        return sol
+
+def simple_prox():
+    # min sum(x) s.t. x >= 0
+    return Prox.from_conic(-np.eye(3), np.zeros(3), np.ones(3), dict(l=3),
+                           dict(x=slice(0, 3)))
+
+def test_status_rule():
+    assert is_solved('Solved')
+    assert is_solved('Solved/Inaccurate')
+    assert not is_solved('Indeterminate')
+    assert is_solved('Indeterminate', inexact=True)
+    for status in 'Infeasible', 'Unbounded/Inaccurate', 'Failure':
+        assert not is_solved(status)
+        assert not is_solved(status, inexact=True)
+
+def test_inaccurate_returns():
+    # a default call which stops at max_iters still returns
+    prox = simple_prox()
+    prox._solver = Status(prox._work, 'Solved/Inaccurate')
+    x = prox()
+    assert prox.info['status'] == 'Solved/Inaccurate'
+    assert set(x) == {'x'}
+
+def test_indeterminate():
+    prox = simple_prox()
+    prox._solver = Status(prox._work, 'Indeterminate')
+
+    # rejected by a strict call, accepted by an inexact one
+    with pytest.raises(RuntimeError, match='Indeterminate'):
+        prox()
+    x = prox(accuracy=1e-3)
+    assert set(x) == {'x'}
+
+    prox.set_inexact(geometric())
+    prox.do_flat()
+    prox.set_inexact(None)
+    with pytest.raises(RuntimeError):
+        prox.do_flat()
+
+def test_accuracy():
+    prob, x_vars, _ = example_rand(10, 5, 0)
+    prox = Prox(prob, x_vars, eps=1e-10, max_iters=5)
+
+    # stopping early isn't an error in inexact mode
+    prox.reset_warm_start()
+    x = prox(accuracy=1e-10)
+    assert set(x) == set(x_vars)
+    assert prox.info['eps'] == 1e-10
+    assert prox.info['accuracy'] > 1e-10
+
+    # a loose call converges
+    prox.update_settings(max_iters=1000)
+    prox.reset_warm_start()
+    prox(accuracy=1e-2)
+    assert prox.info['status'] == 'Solved'
+    assert prox.info['accuracy'] <= 1e-2
+    # settings are untouched
+    assert prox.settings['eps'] == 1e-10
+
+    X, info = prox.do_batch(np.zeros((2, 16)), accuracy=1e-2)
+    assert np.all(np.isfinite(info['accuracy']))
+
+def test_schedules():
+    for s in geometric(1e-1, 1e-5), summable(1e-1, 1e-5):
+        eps = [s(k) for k in range(200)]
+        assert eps[0] == 1e-1
+        assert eps[-1] == 1e-5
+        assert np.all(np.diff(eps) <= 0)
+
+def test_consensus():
+    specs, true_sol = problems()
+    proxes = [Prox(prob, x_vars, method='scs', max_iters=1000) for prob, x_vars in specs]
+    for prox in proxes:
+        prox.set_inexact(summable(1e-2, 1e-7))
+
+    z, info = consensus(proxes, max_iters=500, eps_abs=1e-6, eps_rel=1e-6)
+    assert info['converged']
+    assert np.allclose(z['x'], true_sol, atol=1e-3)
+
+    for prox in proxes:
+        assert prox.info['eps'] < 1e-2
+
+    proxes[0].set_inexact(None)
+    proxes[0].do_flat()
+    assert proxes[0].info['eps'] == proxes[0].settings['eps']
@@ -0,0 +1,42 @@
+import cvxpy as cvx
+import numpy as np
+
+from scsprox import Prox
+
+def soft(x, t):
+    return np.sign(x)*np.maximum(np.abs(x) - t, 0)
+
+def test_matrix():
+    X = cvx.Variable(3, 2)
+    y = cvx.Variable(4)
+    prob = cvx.Problem(cvx.Minimize(cvx.norm(X, 1) + cvx.norm(y, 1)))
+    prox = Prox(prob, dict(X=X, y=y), method='scs', eps=1e-7, max_iters=5000)
+
+    x0 = prox.zero_elem
+    assert x0['X'].shape == (3, 2)
+    assert x0['y'].shape == (4,)
+
+    np.random.seed(0)
+    # C-ordered input is fine; it's written to b through a strided view
+    x0['X'] = 3*np.random.randn(3, 2)
+    x0['y'] = 3*np.random.randn(4)
+
+    rho = 2.0
+    x = prox(x0, rho)
+
+    assert x['X'].shape == (3, 2)
+    # a view into the SCS solution, not a copy
+    assert x['X'].flags.f_contiguous
+    assert not x['X'].flags.owndata
+
+    assert np.allclose(x['X'], soft(x0['X'], 1/rho), atol=1e-4)
+    assert np.allclose(x['y'], soft(x0['y'], 1/rho), atol=1e-4)
+
+    # flat round trip keeps the shape
+    v = prox.dict_to_flat(x)
+    x2 = prox.flat_to_dict(v)
+    assert np.all(x2['X'] == x['X'])
+
+    out = prox.zero_elem
+    prox(x0, rho, out=out)
+    assert np.allclose(out['X'], x['X'])
@@ -0,0 +1,59 @@
+import numpy as np
+
+from scsprox import Prox
+from scsprox.examples import example_rand
+
+def test_memo():
+    prob, x_vars, _ = example_rand(10, 5, 0)
+    prox = Prox(prob, x_vars, eps=1e-5, max_iters=5000)
+    prox.enable_memo(max_entries=2)
+
+    np.random.seed(0)
+    x0 = np.random.randn(3, len(prox.dict_to_flat(prox.zero_elem)))
+
+    a = prox.do_flat(x0[0], 1.0)
+    assert not prox.info['cached']
+    assert prox.memo.misses == 1
+
+    # a different rho is a different input
+    prox.do_flat(x0[0], 2.0)
+    assert prox.memo.misses == 2
+
+    b = prox.do_flat(x0[0], 1.0)
+    assert prox.info['cached']
+    assert prox.info['iter'] == 0
+    assert prox.memo.hits == 1
+    assert np.all(a == b)
+
+    # writing to a returned solution doesn't touch the cache
+    x = prox(prox.flat_to_dict(x0[1]))
+    x['x'][:] = 100
+    y = prox(prox.flat_to_dict(x0[1]))
+    assert prox.info['cached']
+    assert not np.any(y['x'] == 100)
+
+    # bounded by entry count
+    assert len(prox.memo) == 2
+    assert prox.memo.evictions >= 1
+
+    # tolerance changes invalidate
+    prox.update_settings(eps=1e-6)
+    assert len(prox.memo) == 0
+    prox.update_settings(verbose=False)
+    prox(prox.flat_to_dict(x0[1]))
+    assert not prox.info['cached']
+
+def test_bytes():
+    prob, x_vars, _ = example_rand(10, 5, 0)
+    prox = Prox(prob, x_vars)
+    prox.do_flat()
+    size = sum(prox._warm_start[k].nbytes for k in ('x', 'y', 's'))
+
+    prox.enable_memo(max_bytes=2*size)
+    for rho in 1.0, 2.0, 3.0:
+        prox.do_flat(None, rho)
+    assert len(prox.memo) == 2
+    assert prox.memo.nbytes <= 2*size
+
+    prox.disable_memo()
+    assert prox.memo is None
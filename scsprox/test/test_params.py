@@ -0,0 +1,82 @@
+import os
+import tempfile
+
+import numpy as np
+import cvxpy as cvx
+import pytest
+
+from scsprox import Prox
+
+def param_problem(m=10, n=5, seed=0):
+    np.random.seed(seed)
+    A = np.random.randn(m, n)
+
+    x = cvx.Variable(n)
+    b = cvx.Parameter(m, name='b')
+    hi = cvx.Parameter(name='hi')
+    b.value = np.random.randn(m)
+    hi.value = 1.0
+
+    obj = cvx.norm(A*x - b) + cvx.norm(x, 1)
+    prob = cvx.Problem(cvx.Minimize(obj), [x <= hi])
+
+    return prob, {'x': x}, b, hi
+
+def test_set_params():
+    prob, x_vars, b, hi = param_problem()
+    prox = Prox(prob, x_vars, eps=1e-6, max_iters=5000)
+    assert prox.method == 'scs'
+    assert set(prox.params) == {'b', 'hi'}
+
+    work = prox._work
+    x0 = {'x': np.random.randn(5)}
+
+    for seed in range(3):
+        np.random.seed(seed + 10)
+        bval, hival = np.random.randn(10), np.random.rand()
+        prox.set_params(b=bval, hi=hival)
+        x1 = prox(x0, 2.0)['x']
+
+        # same answer as building the prox from scratch
+        b.value, hi.value = bval, hival
+        fresh = Prox(prob, x_vars, eps=1e-6, max_iters=5000)
+        x2 = fresh(x0, 2.0)['x']
+
+        assert np.allclose(x1, x2, atol=1e-3)
+        assert np.all(x1 <= hival + 1e-3)
+        assert np.allclose(prox.params['b'], bval)
+
+    # the workspace and its factorization are kept
+    assert prox._work is work
+
+    with pytest.raises(ValueError):
+        prox.set_params(c=1.0)
+    with pytest.raises(ValueError):
+        prox.set_params(b=np.ones(3))
+
+def test_param_in_A():
+    np.random.seed(0)
+    x = cvx.Variable(5)
+    a = cvx.Parameter(5, name='a')
+    a.value = np.random.randn(5)
+    prob = cvx.Problem(cvx.Minimize(cvx.abs(a.T*x)))
+
+    with pytest.raises(ValueError):
+        Prox(prob, {'x': x})
+
+def test_save_load_params():
+    prob, x_vars, b, hi = param_problem()
+    prox = Prox(prob, x_vars, eps=1e-6, max_iters=5000)
+    prox.set_params(hi=0.1)
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'prox')
+        prox.save(path)
+        loaded = Prox.load(path)
+
+    assert np.allclose(loaded.params['hi'], 0.1)
+
+    x0 = {'x': np.ones(5)}
+    loaded.set_params(hi=0.5)
+    prox.set_params(hi=0.5)
+    assert np.allclose(loaded(x0)['x'], prox(x0)['x'], atol=1e-3)
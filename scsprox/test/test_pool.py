@@ -0,0 +1,37 @@
+from scsprox import Prox, ProxPool
+from scsprox.examples import example2, example3, example_rand
+
+import numpy as np
+import pytest
+
+def rand_spec():
+    prob, x_vars, _ = example_rand(10, 5)
+    return prob, x_vars
+
+def bad_spec():
+    raise ValueError('bad spec')
+
+def test_pool():
+    specs = [example2, example3, rand_spec]
+    settings = dict(eps=1e-6, max_iters=1000)
+
+    proxes = [Prox(*spec()[:2], **settings) for spec in specs]
+
+    with ProxPool(specs, processes=2, **settings) as pool:
+        assert len(pool) == 3
+
+        x0s = pool.zero_elems
+        for _ in range(3):
+            xs = pool(x0s, rho=[1.0, 2.0, 0.5])
+            for prox, x0, x, rho in zip(proxes, x0s, xs, [1.0, 2.0, 0.5]):
+                x_serial = prox(x0, rho)
+                for k in x:
+                    assert np.allclose(x[k], x_serial[k], atol=1e-4)
+            x0s = xs
+
+        assert all(d['status'] == 'Solved' for d in pool.info)
+
+def test_errors():
+    # a failed build is raised in the parent, instead of hanging it
+    with pytest.raises(RuntimeError, match='bad spec'):
+        ProxPool([rand_spec, bad_spec], processes=2)
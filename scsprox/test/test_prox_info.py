@@ -22,4 +22,16 @@ def test1():
     assert prox._work.settings['max_iters'] != 123
     prox()
     assert prox._work.settings['eps'] == 4.5
-    assert prox._work.settings['max_iters'] == 123
\ No newline at end of file
+    assert prox._work.settings['max_iters'] == 123
+def test_info_is_a_copy():
+    prob, xvars = example()
+    prox = Prox(prob, xvars)
+
+    prox()
+    info = prox.info
+    kept = dict(info)
+    assert prox.info is not info
+
+    # a kept info doesn't change with later calls
+    prox(None, 2.0)
+    assert info == kept
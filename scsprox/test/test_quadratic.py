@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from scsprox import Prox, benchmark
+from scsprox.examples import example_rand
+
+scs = pytest.importorskip('scs')
+if not hasattr(scs, 'SCS'):
+    pytest.skip('needs SCS 3 or later', allow_module_level=True)
+
+def test_simple():
+    # min sum(x) s.t. x >= 0; each coordinate decreases by 1/rho_i
+    prox = Prox.from_conic(-np.eye(3), np.zeros(3), np.ones(3),
+                           dict(l=3), dict(x=slice(0, 3)), prox_term='quadratic',
+                           diag_rho=True, eps=1e-6, max_iters=5000)
+    assert prox.prox_term == 'quadratic'
+    assert prox.backend == 'scs'
+
+    x0 = np.array([3.0, 3.0, 3.0])
+    rho = np.array([1.0, 2.0, 4.0])
+    assert np.allclose(prox.do_flat(x0, rho), x0 - 1.0/rho, atol=1e-4)
+    assert np.allclose(prox.do_flat(x0, 2.0), x0 - 0.5, atol=1e-4)
+
+def test_match_epigraph():
+    prob, x_vars, _ = example_rand()
+    ref = Prox(prob, x_vars, method='scs', eps=1e-6, max_iters=5000)
+    prox = Prox(prob, x_vars, prox_term='quadratic', eps=1e-6, max_iters=5000)
+    assert prox.method == 'scs'
+
+    # no epigraph variables, rows or cones
+    assert prox._A.shape[0] < ref._A.shape[0]
+    assert prox._A.shape[1] < ref._A.shape[1]
+
+    np.random.seed(0)
+    for rho in 1.0, 2.0, 1.0:
+        x0 = np.random.randn(len(ref.dict_to_flat(ref.zero_elem)))
+        assert np.allclose(prox.do_flat(x0, rho), ref.do_flat(x0, rho), atol=1e-3)
+        assert 'Solved' in prox.info['status']
+
+    # one solver for each rho
+    assert len(prox._work._solvers) == 2
+
+    x = prox(ref.flat_to_dict(x0), 2.0)
+    for k, v in ref(ref.flat_to_dict(x0), 2.0).items():
+        assert np.allclose(x[k], v, atol=1e-3)
+
+def test_errors():
+    prob, x_vars, _ = example_rand()
+    with pytest.raises(ValueError):
+        Prox(prob, x_vars, prox_term='nope')
+    with pytest.raises(ValueError):
+        Prox(prob, x_vars, prox_term='quadratic', backend='ecos')
+    with pytest.raises(ValueError):
+        Prox(prob, x_vars, prox_term='quadratic', share_work=True)
+
+    prox = Prox(prob, x_vars, prox_term='quadratic')
+    with pytest.raises(ValueError):
+        prox.save('unused')
+
+def test_bench():
+    res = benchmark.bench_prox_terms(20, 5, 1, calls=3, rhos=(1.0, 2.0))
+    assert [r['prox_term'] for r in res] == ['epigraph', 'quadratic']
+    assert res[0]['max_diff'] == 0.0
+    assert res[1]['rows'] < res[0]['rows']
@@ -1,6 +1,8 @@
 import numpy as np
+import pytest
 
-from scsprox.scs_mapping import get_solmap, extract_sol, form_prox, rand_param_vals
+from scsprox.scs_mapping import get_solmap, extract_sol, form_prox, rand_param_vals, param_map
+from scsprox.verify import check_indmap
 from scsprox.examples import example, example2, example3
 
 def test_1():
@@ -27,4 +29,42 @@ def test2():
 
     pxprob, x0_vars = form_prox(prob, x_vars)
     rand_param_vals(x0_vars)
-    solmap = get_solmap(pxprob, x_vars)
\ No newline at end of file
+    solmap = get_solmap(pxprob, x_vars)
+
+def test_param_map():
+    for ex in example, example2, example3:
+        prob, x_vars = ex()
+        pxprob, x0_vars = form_prox(prob, x_vars)
+        data, indmap = param_map(pxprob, x0_vars)
+
+        for k in x_vars:
+            s = indmap[k]
+            assert s.stop - s.start == x_vars[k].size[0]
+        assert len(indmap['__tau']) >= len(x_vars)
+
+        # mapping agrees with CVXPY's own stuffing for random parameter values
+        check_indmap(pxprob, x0_vars, indmap)
+
+        solmap = get_solmap(pxprob, x_vars, data=data)
+        for k in x_vars:
+            assert solmap[k].stop - solmap[k].start == x_vars[k].size[0]
+
+def test_extract_out():
+    solmap = dict(x=slice(0, 3), y=slice(3, 4), Z=slice(4, 8))
+    shapes = dict(x=(3,), y=(), Z=(2, 2))
+    scs_x = np.arange(8.0)
+
+    out = dict(x=np.zeros(3), y=0.0, Z=np.zeros((2, 2), order='F'))
+    x = extract_sol(scs_x, solmap, out=out, shapes=shapes)
+    assert x is out
+    assert np.array_equal(out['x'], [0, 1, 2])
+    assert out['y'] == 3
+    assert np.array_equal(out['Z'], [[4, 6], [5, 7]])
+
+    # missing or mis-shaped entries raise, instead of being truncated
+    bad = [dict(out, x=0.0), dict(out, x=np.zeros(2)), dict(out, Z=np.zeros(4)),
+           {k: v for k, v in out.items() if k != 'x'}]
+    for b in bad:
+        with pytest.raises(ValueError):
+            extract_sol(scs_x, solmap, out=b, shapes=shapes)
+
@@ -0,0 +1,98 @@
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from scsprox import Prox
+from scsprox.examples import example_rand
+from scsprox.server import ProxServer, ProxClient, ProxServerError
+
+def make_prox():
+    prob, x_vars, _ = example_rand()
+    return Prox(prob, x_vars, eps=1e-6, max_iters=5000)
+
+def check_client(address):
+    local = make_prox()
+    np.random.seed(0)
+    X0 = np.random.randn(5, len(local.dict_to_flat(local.zero_elem)))
+
+    with ProxClient(address, 'rand') as client:
+        assert client.layout == local.layout
+
+        x = client.do_flat(X0[0], 2.0)
+        assert np.allclose(x, local.do_flat(X0[0], 2.0), atol=1e-4)
+
+        d = client(local.flat_to_dict(X0[1]))
+        expected = local(local.flat_to_dict(X0[1]))
+        for k in expected:
+            assert np.allclose(d[k], expected[k], atol=1e-4)
+
+        # pipelined requests come back in order
+        X = client.map_flat(X0, 1.0, window=2)
+        for i in range(len(X0)):
+            assert np.allclose(X[i], local.do_flat(X0[i], 1.0), atol=1e-4)
+
+        with pytest.raises(ProxServerError):
+            client.do_flat(np.ones(2))
+
+def test_unix():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'prox.sock')
+        with ProxServer({'rand': make_prox()}, path) as server:
+            check_client(server.address)
+        assert not os.path.exists(path)
+
+def test_tcp():
+    with ProxServer({'rand': make_prox()}, ('127.0.0.1', 0)) as server:
+        check_client(server.address)
+
+def test_sessions():
+    prox = make_prox()
+    x0 = np.ones(len(prox.dict_to_flat(prox.zero_elem)))
+
+    with ProxServer({'rand': prox}, ('127.0.0.1', 0)) as server:
+        a = ProxClient(server.address, 'rand')
+        b = ProxClient(server.address, 'rand')
+
+        a.do_flat(x0)
+        cold = a.info['iter']
+        a.do_flat(x0)
+        assert a.info['iter'] < cold
+
+        # b's warm-start is its own, so its first solve is cold
+        b.do_flat(x0)
+        assert b.info['iter'] == cold
+
+        a.reset_warm_start()
+        a.do_flat(x0)
+        assert a.info['iter'] == cold
+
+        with pytest.raises(ProxServerError):
+            ProxClient(server.address, 'missing')
+
+        a.close()
+        b.close()
+
+def test_saved():
+    prox = make_prox()
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'rand')
+        prox.save(path)
+        with ProxServer({'rand': path}, ('127.0.0.1', 0)) as server:
+            with ProxClient(server.address, 'rand') as client:
+                assert np.allclose(client.do_flat(), prox.do_flat(), atol=1e-4)
+
+def test_shutdown_unstarted():
+    # returns instead of waiting for a serve loop that never ran
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'prox.sock')
+        server = ProxServer(dict(rand=make_prox()), path)
+        server.shutdown()
+        assert not os.path.exists(path)
+
+def test_no_unix_sockets(monkeypatch):
+    import socket
+    monkeypatch.delattr(socket, 'AF_UNIX', raising=False)
+    with pytest.raises(ValueError):
+        ProxClient('prox.sock', 'rand')
@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+
+from scsprox import Prox
+from scsprox.examples import example_rand
+from scsprox.stats import ProxStats
+
+def test_stats():
+    prob, x_vars, _ = example_rand(10, 5, 0)
+    prox = Prox(prob, x_vars, method='scs')
+
+    calls = []
+    prox.stats.hook = lambda d: calls.append(dict(d))
+
+    prox()
+    prox()
+    prox.do_flat()
+    prox.do_batch(np.zeros((3, len(prox.dict_to_flat(prox.zero_elem)))))
+
+    s = prox.stats.as_dict()
+    assert s['calls'] == 6
+    assert len(calls) == 6
+    assert s['warm_start']['cold_calls'] == 1
+    assert s['warm_start']['warm_calls'] == 5
+    # warm-started at the same point: no iterations needed
+    assert s['warm_start']['iter_saved'] > 0
+    assert s['status'] == {'Solved': 6}
+
+    first = calls[0]
+    assert not first['warm']
+    parts = first['restuff'] + first['solve'] + first['extract'] + first['overhead']
+    assert np.isclose(parts, first['total'])
+    assert s['latency']['min'] <= s['latency']['p50']
+    assert s['time']['total'] >= s['time']['solve']
+
+    assert json.loads(prox.stats.to_json())['calls'] == 6
+
+    prox.stats.reset()
+    assert prox.stats.as_dict()['calls'] == 0
+    assert prox.stats.hook is not None
+
+def test_counts():
+    stats = ProxStats()
+    times = dict(restuff=0.0, solve=1e-3, extract=0.0)
+    for i in range(100):
+        stats.record(times, 1e-3, i, 'Solved', True)
+    stats.record(times, 1e-3, 100, 'Solved/Inaccurate', True)
+    stats.record(times, 1e-3, 100, 'Infeasible', False)
+
+    assert stats.iter_percentile(50) == 50
+    assert stats.inaccurate == 1
+    assert stats.failed == 1
+    assert 1e-3/1.34 <= stats.latency_percentile(99) <= 1.34e-3
@@ -0,0 +1,48 @@
+import os
+import tempfile
+
+import numpy as np
+
+from scsprox import Prox
+from scsprox.examples import example_rand
+
+def compare(prox1, prox2, x0):
+    prox1.reset_warm_start()
+    prox2.reset_warm_start()
+    x1 = prox1(x0, 2.0)
+    x2 = prox2(x0, 2.0)
+    for k in x1:
+        assert np.all(x1[k] == x2[k])
+
+def test_save_load():
+    prob, x_vars, _ = example_rand(10, 5)
+    prox = Prox(prob, x_vars, eps=1e-5, max_iters=500)
+    x0 = prox()
+
+    path = os.path.join(tempfile.mkdtemp(), 'prox')
+    prox.save(path)
+
+    for mmap in True, False:
+        prox2 = Prox.load(path, mmap=mmap)
+        assert prox2.settings == prox.settings
+        assert prox2.info['cvxpy_time'] == 0.0
+        compare(prox, prox2, x0)
+
+    prox3 = Prox.load(path, max_iters=7)
+    assert prox3.settings['max_iters'] == 7
+
+def test_cached():
+    cache_dir = tempfile.mkdtemp()
+    calls = []
+
+    def build():
+        calls.append(1)
+        prob, x_vars, _ = example_rand(10, 5)
+        return prob, x_vars
+
+    prox1 = Prox.cached(cache_dir, 'example_rand(10, 5)', build)
+    prox2 = Prox.cached(cache_dir, 'example_rand(10, 5)', build)
+
+    assert len(calls) == 1
+    assert len(os.listdir(cache_dir)) == 1
+    compare(prox1, prox2, prox1.zero_elem)
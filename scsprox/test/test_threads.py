@@ -0,0 +1,57 @@
+import threading
+
+import numpy as np
+
+from scsprox import Prox, prox_map
+from scsprox.examples import example_rand
+
+def make(seed, **kwargs):
+    prob, x_vars, _ = example_rand(20, 5, seed)
+    return Prox(prob, x_vars, eps=1e-6, max_iters=5000, **kwargs)
+
+def test_prox_map():
+    proxes = [make(i) for i in range(4)]
+    serial = [make(i) for i in range(4)]
+
+    np.random.seed(0)
+    n = len(proxes[0].dict_to_flat(proxes[0].zero_elem))
+    inputs = list(np.random.randn(4, n))
+
+    xs = prox_map(proxes, inputs, rho=2.0, max_workers=4, flat=True)
+    for x, prox, x0 in zip(xs, serial, inputs):
+        assert np.allclose(x, prox.do_flat(x0, 2.0), atol=1e-4)
+
+    # dict inputs, and the same prox more than once
+    xs = prox_map([proxes[0]]*3, [None]*3, rho=[1.0, 2.0, 1.0])
+    assert np.allclose(xs[0]['x'], xs[2]['x'], atol=1e-4)
+
+def test_shared_lock():
+    a = make(0, share_work=True)
+    b = make(0, share_work=True)
+    assert a._work is b._work
+    assert a._lock is b._lock
+    assert make(0)._lock is not a._lock
+
+def test_hammer():
+    """ Concurrent calls on one prox give the same answers as serial ones.
+    """
+    prox = make(0)
+    ref = make(0)
+    n = len(prox.dict_to_flat(prox.zero_elem))
+    np.random.seed(1)
+    inputs = np.random.randn(8, n)
+    expected = [ref.do_flat(x0) for x0 in inputs]
+
+    results = [None]*len(inputs)
+    def run(i):
+        results[i] = prox.do_flat(inputs[i])
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(inputs))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for x, y in zip(results, expected):
+        assert np.allclose(x, y, atol=1e-4)
+    assert prox.stats.calls == len(inputs)
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from scsprox import Prox
+from scsprox.examples import example_rand
+from scsprox.warm_start import WarmStarter
+
+def linear_sols(starter, M, steps=8):
+    """ Feed `starter` solutions that depend linearly on a smoothly
+    moving input, and return the errors of its guesses.
+    """
+    prev = None
+    errs = []
+    for t in range(steps):
+        bc = dict(b=np.array([np.cos(.1*t), np.sin(.1*t), .05*t]), c=np.array([.5]))
+        guess = starter.guess(bc, prev)
+
+        f = np.concatenate([bc['b'], bc['c']])
+        sol = {k: M.dot(f) for k in ('x', 'y', 's')}
+        sol['info'] = dict(iter=10, status='Solved')
+        if guess is not None:
+            errs.append(np.linalg.norm(guess['x'] - sol['x']))
+
+        starter.update(sol)
+        prev = sol
+    return errs
+
+def test_extrapolation():
+    np.random.seed(0)
+    M = np.random.randn(7, 4)
+    errs = {}
+    for strategy in 'previous', 'linear', 'anderson':
+        starter = WarmStarter(np.arange(3), np.array([0]), strategy, probe_every=100)
+        errs[strategy] = linear_sols(starter, M)[-1]
+
+    assert errs['linear'] < errs['previous']/5
+    assert errs['anderson'] < errs['linear']/5
+
+    with pytest.raises(ValueError):
+        WarmStarter(np.arange(3), np.array([0]), 'nope')
+
+def test_safeguard():
+    starter = WarmStarter(np.arange(3), np.array([0]), 'linear', probe_every=100)
+    linear_sols(starter, np.eye(4))
+    assert starter.last['warm_start'] == 'linear'
+
+    # a failed extrapolated solve is redone, and extrapolation backs off
+    bad = dict(info=dict(iter=100, status='Solved/Inaccurate'))
+    assert not starter.rejected(bad)
+    bad['info']['status'] = 'Unbounded'
+    assert starter.rejected(bad)
+    assert starter.failures == 1
+
+def test_prox():
+    prob, x_vars, _ = example_rand(10, 5, 0)
+    plain = Prox(prob, x_vars, eps=1e-5, max_iters=5000)
+    prox = Prox(prob, x_vars, eps=1e-5, max_iters=5000)
+    prox.set_warm_start('anderson', history=4)
+
+    np.random.seed(0)
+    x0 = np.random.randn(len(prox.dict_to_flat(prox.zero_elem)))
+    d = np.random.randn(len(x0))
+    for t in range(20):
+        x = x0 + 0.05*t*d
+        assert np.allclose(prox.do_flat(x), plain.do_flat(x), atol=1e-3)
+        assert prox.info['warm_start'] in ('cold', 'previous', 'anderson')
+
+    assert plain.info['warm_start'] == 'previous'
+    assert plain.info['iter_saved'] == 0.0
+    assert prox.warm_starter.baseline is not None
+
+    prox.reset_warm_start()
+    assert prox.warm_starter.baseline is None
+
+def test_memo_hits_save_nothing():
+    starter = WarmStarter(np.arange(3), np.array([0]), 'linear', probe_every=100)
+    linear_sols(starter, np.eye(4))
+    saved, baseline = starter.saved, starter.baseline
+
+    bc = dict(b=np.zeros(3), c=np.array([.5]))
+    starter.guess(bc, dict(x=np.zeros(4), y=np.zeros(4), s=np.zeros(4)))
+    hit = {k: np.zeros(4) for k in ('x', 'y', 's')}
+    hit['info'] = dict(iter=0, status='Solved', cached=True)
+    starter.update(hit)
+
+    assert starter.saved == saved
+    assert starter.baseline == baseline
+    assert starter.last['iter_saved'] == 0.0
+
+def test_batch():
+    prob, x_vars, _ = example_rand(10, 5, 0)
+    plain = Prox(prob, x_vars, eps=1e-5, max_iters=5000)
+    prox = Prox(prob, x_vars, eps=1e-5, max_iters=5000)
+    prox.set_warm_start('linear')
+
+    np.random.seed(0)
+    x0 = np.random.randn(len(prox.dict_to_flat(prox.zero_elem)))
+    d = np.random.randn(len(x0))
+    X0 = np.array([x0 + 0.05*t*d for t in range(20)])
+
+    # batches go through the strategy too
+    X, info = prox.do_batch(X0)
+    assert np.allclose(X, plain.do_batch(X0)[0], atol=1e-3)
+    assert prox.warm_starter.baseline is not None
+    assert prox.warm_starter.last['warm_start'] in ('previous', 'linear')
@@ -0,0 +1,44 @@
+import cvxpy as cvx
+import numpy as np
+
+from scsprox import Prox
+from scsprox.workspace import registry
+
+def example_shared(b, seed=0):
+    """ Same A for every b, so the stuffed A matrices are identical.
+    """
+    np.random.seed(seed)
+    m, n = len(b), 5
+    A = np.random.randn(m, n)
+
+    x = cvx.Variable(n)
+    prob = cvx.Problem(cvx.Minimize(cvx.norm(A*x - b) + cvx.norm(x, 1)))
+
+    return prob, dict(x=x)
+
+def test_share():
+    registry.clear()
+    bs = [np.arange(10.0), np.ones(10), -np.arange(10.0)]
+
+    shared = [Prox(*example_shared(b), share_work=True, eps=1e-6, max_iters=1000) for b in bs]
+    alone = [Prox(*example_shared(b), eps=1e-6, max_iters=1000) for b in bs]
+
+    assert len(registry) == 1
+    assert shared[0]._work is shared[1]._work is shared[2]._work
+    assert alone[0]._work is not alone[1]._work
+
+    # interleave calls, so each Prox sees the workspace after another one used it
+    x0 = dict(x=np.ones(5))
+    for _ in range(2):
+        for p, q in zip(shared, alone):
+            x1 = p(x0)
+            x2 = q(x0)
+            assert p.info['status'] == 'Solved'
+            assert np.allclose(x1['x'], x2['x'], atol=1e-4)
+
+    # each Prox keeps its own warm-start
+    shared[0](x0)
+    assert shared[0].info['iter'] == 0
+
+    del shared
+    assert len(registry) == 0
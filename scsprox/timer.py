@@ -1,14 +1,20 @@
-import time
+from time import perf_counter
 from contextlib import contextmanager
 
+
+class Elapsed(object):
+    def __init__(self, time=None):
+        self.time = time
+
+
 @contextmanager
 def SimpleTimer():
     elapsed = Elapsed(None)
-    start = time.time()
+    start = perf_counter()
     try:
         yield elapsed
     finally:
-        end = time.time()
+        end = perf_counter()
         elapsed.time = end-start
 
 
@@ -16,9 +22,9 @@ def SimpleTimer():
 def DictTimer(label='time', d=None):
     if d is None:
         d = {}
-    start = time.time()
+    start = perf_counter()
     try:
         yield d
     finally:
-        end = time.time()
+        end = perf_counter()
         d[label] = end-start
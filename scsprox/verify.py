@@ -1,5 +1,7 @@
 import numpy as np
 
+from .scs_mapping import copy_prob, rand_param_vals, restuff
+
 # check that everything else stayed the same...
 def check(data, x0_vars, indmap):
     assert np.all(x0_vars['__tau'].value == data['c'][indmap['__tau']])
@@ -0,0 +1,189 @@
+""" Warm-starting SCS from an extrapolation of past solutions.
+
+In ADMM and similar methods, the prox inputs move smoothly from call to call,
+and so do the SCS solutions `w = (x, y, s)`. `WarmStarter` keeps the last few
+inputs `f` (the restuffed entries of b and c) and solutions in a ring buffer,
+and guesses the next solution as:
+
+- 'previous': the last solution, which is what `Prox` does by default
+- 'linear': a secant step, projecting the new input onto the line
+  through the last two inputs, and moving along the line through their solutions
+- 'anderson': the affine combination of past inputs closest to the new input,
+  applied to their solutions (the secant step with more history)
+
+Extrapolation can hurt, so there's a safeguard. Every `probe_every` calls,
+the plain previous solution is used, to keep a running estimate of its iteration count.
+Extrapolated solves which take clearly more iterations than that estimate, or which don't
+reach 'Solved', count as failures, and extrapolation is turned off for a while
+(doubling each consecutive failure). A solve that doesn't reach 'Solved' is
+redone from the previous solution by `Prox`.
+"""
+from collections import deque
+
+import numpy as np
+
+_strategies = 'previous', 'linear', 'anderson'
+_keys = 'x', 'y', 's'
+
+
+class WarmStarter(object):
+    """ Chooses the SCS warm-start for each prox call.
+
+    Parameters
+    ----------
+    bidx, tauidx: 1D int arrays
+        Where the prox input and tau sit in b and c.
+    strategy: str
+        One of 'previous', 'linear' or 'anderson'.
+    history: int
+        Number of past solutions to keep (at least 2 for extrapolation).
+    probe_every: int
+        Use the previous solution every this many calls to estimate its iterations.
+    max_step: float
+        Bound on the size of the extrapolation coefficients.
+    """
+
+    def __init__(self, bidx, tauidx, strategy='previous', history=3, probe_every=10,
+                 max_step=4.0):
+        if strategy not in _strategies:
+            raise ValueError('Invalid warm-start strategy: {}. Choose from {}.'.format(
+                             strategy, _strategies))
+        self.bidx, self.tauidx = bidx, tauidx
+        self.strategy = strategy
+        self.history = max(int(history), 2)
+        self.probe_every = probe_every
+        self.max_step = max_step
+
+        self.reset()
+
+    def reset(self):
+        """ Forget all past solutions and statistics.
+        """
+        self._hist = deque(maxlen=self.history)
+        self._calls = 0
+        self._backoff = 0
+        self._wait = 0
+        # running estimate of iterations when starting from the previous solution
+        self.baseline = None
+        self.saved = 0.0
+        self.failures = 0
+        self.last = dict(warm_start=None, iter_saved=0.0)
+        self._f = None
+        self._used = None
+
+    def features(self, bc):
+        return np.concatenate([bc['b'][self.bidx], bc['c'][self.tauidx]])
+
+    def guess(self, bc, previous):
+        """ The warm-start for the solve with (restuffed) data `bc`.
+        `previous` is the last SCS solution, or None.
+        """
+        self._calls += 1
+        self._f = self.features(bc)
+
+        used = 'previous' if previous is not None else 'cold'
+        ws = previous
+
+        probe = self.baseline is None or self._calls % self.probe_every == 0
+        if self._wait > 0:
+            self._wait -= 1
+        elif (self.strategy != 'previous' and not probe and
+              previous is not None and len(self._hist) >= 2):
+            ws = self._extrapolate(self._f)
+            if ws is None:
+                ws = previous
+            else:
+                used = self.strategy
+
+        self._used = used
+        return ws
+
+    def _coeffs(self, f):
+        """ Coefficients `beta` with `f - f_k ~ sum_j beta_j (f_j - f_k)`
+        over the stored inputs `f_j`, where `f_k` is the latest.
+        """
+        fk = self._hist[-1][0]
+        if self.strategy == 'linear':
+            past = [self._hist[-2][0]]
+        else:
+            past = [h[0] for h in list(self._hist)[:-1]]
+
+        D = np.column_stack([fj - fk for fj in past])
+        r = f - fk
+
+        G = D.T.dot(D)
+        scale = np.trace(G)
+        if scale == 0:
+            return None
+        G += 1e-10*scale*np.eye(len(past))
+        beta = np.linalg.solve(G, D.T.dot(r))
+
+        if not np.all(np.isfinite(beta)) or np.max(np.abs(beta)) > self.max_step:
+            return None
+        return beta
+
+    def _extrapolate(self, f):
+        beta = self._coeffs(f)
+        if beta is None:
+            return None
+
+        wk = self._hist[-1][1]
+        if self.strategy == 'linear':
+            past = [self._hist[-2][1]]
+        else:
+            past = [h[1] for h in list(self._hist)[:-1]]
+
+        ws = {}
+        for key in _keys:
+            w = wk[key].copy()
+            for b, wj in zip(beta, past):
+                w += b*(wj[key] - wk[key])
+            if not np.all(np.isfinite(w)):
+                return None
+            ws[key] = w
+        return ws
+
+    def rejected(self, scs_sol):
+        """ Whether an extrapolated solve failed and should be redone
+        from the previous solution.
+        """
+        bad = self._used in _strategies[1:] and 'Solved' not in scs_sol['info']['status']
+        if bad:
+            self._fail()
+            # the redo starts from the previous solution
+            self._used = 'previous'
+        return bad
+
+    def _fail(self):
+        self.failures += 1
+        self._backoff = max(2*self._backoff, 1)
+        self._wait = self._backoff
+
+    def update(self, scs_sol):
+        """ Record the solution of the latest solve.
+        """
+        iters = scs_sol['info']['iter']
+        used = self._used
+
+        saved = 0.0
+        if scs_sol['info'].get('cached', False):
+            # returned by the memo without a solve: nothing saved, nothing to learn
+            pass
+        elif used == 'previous':
+            if self.baseline is None:
+                self.baseline = float(iters)
+            else:
+                self.baseline += 0.2*(iters - self.baseline)
+        elif used != 'cold' and self.baseline is not None:
+            saved = self.baseline - iters
+            # allow for some noise in the iteration counts
+            if saved < -max(1.0, 0.1*self.baseline):
+                self._fail()
+            else:
+                self._backoff = 0
+        self.saved += saved
+
+        self.last['warm_start'] = used
+        self.last['iter_saved'] = saved
+
+        self._hist.append((self._f, {k: scs_sol[k] for k in _keys}))
@@ -0,0 +1,91 @@
+""" Sharing CySCS workspaces between Prox objects.
+
+The SCS factorization depends only on the A matrix, the cone dims
+and a few fixed solver settings, not on b or c.
+Prox objects always pass their own b, c and warm-start to
+`Workspace.solve`, so Prox objects with identical A and dims
+can share one workspace, and one factorization.
+Solves on a shared workspace are serialized by its lock,
+which all the sharing Prox objects use.
+"""
+import hashlib
+import json
+import threading
+import weakref
+
+import numpy as np
+import cyscs
+
+# CySCS settings which are fixed at workspace creation
+_fixed_keys = 'use_indirect', 'rho_x', 'normalize', 'scale'
+
+
+def _dims_key(dims):
+    return json.dumps({k: np.asarray(v).tolist() for k, v in dims.items()}, sort_keys=True)
+
+def workspace_key(A, dims, settings):
+    """ Hash of the data which determines the SCS factorization.
+    """
+    h = hashlib.sha1()
+    for arr in A.indptr, A.indices, A.data:
+        h.update(np.ascontiguousarray(arr).view(np.uint8))
+    h.update(str(A.shape).encode('utf-8'))
+    h.update(_dims_key(dims).encode('utf-8'))
+    fixed = {k: settings[k] for k in _fixed_keys if k in settings}
+    h.update(json.dumps(fixed, sort_keys=True).encode('utf-8'))
+    return h.hexdigest()
+
+
+class SharedWorkspace(object):
+    """ A `cyscs.Workspace` along with the A matrix and dims it was built from.
+
+    Prox objects hold on to this; once none of them does,
+    it drops out of the registry.
+    """
+
+    def __init__(self, data, **settings):
+        self.work = cyscs.Workspace(data, data['dims'], **settings)
+        self.A = data['A']
+        self.dims = data['dims']
+        self.lock = threading.RLock()
+
+    def matches(self, A, dims):
+        """ Check for an exact match, in case of a hash collision.
+        """
+        return (A.shape == self.A.shape and
+                np.array_equal(A.indptr, self.A.indptr) and
+                np.array_equal(A.indices, self.A.indices) and
+                np.array_equal(A.data, self.A.data) and
+                _dims_key(dims) == _dims_key(self.dims))
+
+
+class WorkspaceRegistry(object):
+    """ Maps the hash of (A, dims, fixed settings) to live `SharedWorkspace` objects.
+    """
+
+    def __init__(self):
+        self._entries = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, data, **settings):
+        """ Return a `SharedWorkspace` for `data`, reusing an existing one
+        (and its factorization) if possible.
+        """
+        key = workspace_key(data['A'], data['dims'], settings)
+
+        with self._lock:
+            shared = self._entries.get(key)
+            if shared is None or not shared.matches(data['A'], data['dims']):
+                shared = SharedWorkspace(data, **settings)
+                self._entries[key] = shared
+
+        return shared
+
+    def clear(self):
+        self._entries.clear()
+
+
+registry = WorkspaceRegistry()
@@ -21,5 +21,7 @@ setup(
     package_data={'scsprox': ['test/*.py']},
     zip_safe=False, # apparently, this is needed to include the test dir
 
+    python_requires='>=3.8',
     install_requires=['numpy', 'scipy', 'cvxpy', 'cyscs', 'pytest', 'psutil'],
+    extras_require={'backends': ['scs', 'ecos']},
 )
\ No newline at end of file